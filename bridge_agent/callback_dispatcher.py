@@ -0,0 +1,235 @@
+"""
+Django 콜백 전송 큐
+COM 이벤트 스레드는 enqueue만 하고, 별도 워커 스레드가 keep-alive 세션으로 전송합니다.
+Django 스트림 컨슈머가 연결되어 있으면 HTTP POST 대신 이벤트 스트림으로 넘깁니다.
+전송 대기 이벤트는 append-only 스풀 파일에 기록되어 재시작 시 재전송됩니다.
+
+스풀 레코드 (JSON Lines):
+    {"op": "put", "id": "...", "path": "...", "payload": {...}}
+    {"op": "ack", "id": "..."}
+
+이벤트ID는 '<기동ID>-<순번>'으로 기동ID(시작 시각 ms)와 순번 모두 단조 증가하며, 스풀 재전송이나
+스트림→POST 전환에도 바뀌지 않습니다. Django는 X-Bridge-Event-Id 헤더(스트림은 id 필드)로
+중복 수신을 걸러내므로 전송 실패 시 같은 이벤트를 다시 보내도 한 번만 반영됩니다.
+"""
+import os
+import json
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from event_stream import event_type_for
+
+logger = logging.getLogger(__name__)
+
+
+class CallbackDispatcher:
+    """비동기 콜백 전송기 (메모리 큐 + 디스크 스풀)"""
+
+    def __init__(self, server_url, spool_path='callback_spool.jsonl', max_queue=10000,
+                 timeout=(3, 10), backoff=0.5, max_backoff=30.0, compact_bytes=1024 * 1024,
+                 stream=None):
+        self.server_url = server_url.rstrip('/')
+        self.stream = stream
+        self.spool_path = spool_path
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.compact_bytes = compact_bytes
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = deque()
+        self._spool_lock = threading.Lock()
+        self._spilled = False
+        self._boot_id = str(int(time.time() * 1000))
+        self._seq = itertools.count(1)
+        self._thread = None
+
+        self.delivered = 0
+        self.failed = 0
+        # (이벤트 타입, 결과) -> 건수 (결과: delivered/retry/rejected/streamed)
+        self.outcomes = {}
+        self._outcome_lock = threading.Lock()
+
+    # ===== 이벤트 스레드 =====
+
+    def send(self, path, payload):
+        """콜백 등록 (논블로킹)"""
+        item = {'id': f"{self._boot_id}-{next(self._seq)}", 'path': path, 'payload': payload}
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # 메모리 큐 초과분은 스풀에만 기록하고 워커가 나중에 다시 읽음
+            logger.warning("콜백 큐 초과, 스풀에 기록: %s", path)
+            self._spool_write([dict(item, op='put')], spilled=True)
+
+    # ===== 워커 스레드 =====
+
+    def start(self):
+        """스풀 재전송 후 워커 시작"""
+        replayed = self._load_spool()
+        if replayed:
+            logger.info("스풀 미전송 콜백 %d건 재전송", len(replayed))
+        self._pending.extend(replayed)
+        self._rewrite_spool(replayed)
+
+        self._thread = threading.Thread(target=self._run, name='callback-dispatcher', daemon=True)
+        self._thread.start()
+
+    def queue_depth(self):
+        return self._queue.qsize() + len(self._pending)
+
+    def acknowledge(self, items):
+        """스트림으로 전달된 이벤트의 처리 완료 기록 (ack 요청 스레드)"""
+        if items:
+            self._spool_write([{'op': 'ack', 'id': item['id']} for item in items])
+            self.delivered += len(items)
+            for item in items:
+                self._count(item['path'], 'streamed')
+
+    def _run(self):
+        delay = 0
+        retry_at = 0
+        while True:
+            if self.stream:
+                # 컨슈머가 끊긴 채 남은 스트림 이벤트는 콜백 POST로 재전송
+                self._pending.extendleft(reversed(self.stream.take_expired()))
+
+            if not self._pending:
+                if self._spilled:
+                    self._spilled = False
+                    self._pending.extend(self._load_spool())
+                elif self._can_compact():
+                    self._rewrite_spool([])
+
+            wait = retry_at - time.monotonic()
+            if self._pending and wait > 0:
+                self._drain(block=True, timeout=wait)  # 백오프 대기 중에도 큐는 계속 비움
+                continue
+            # 스트림 사용 시 미확인 이벤트 회수를 위해 주기적으로 깨어남
+            self._drain(block=not self._pending, timeout=1.0 if self.stream else None)
+            if not self._pending:
+                continue
+
+            if self.stream and self.stream.active():
+                while self._pending:
+                    self.stream.publish(self._pending.popleft())
+                continue
+
+            item = self._pending[0]
+            if self._deliver(item):
+                self._pending.popleft()
+                self._spool_write([{'op': 'ack', 'id': item['id']}])
+                delay = 0
+            else:
+                delay = min(max(delay * 2, self.backoff), self.max_backoff)
+                retry_at = time.monotonic() + delay
+
+    def _can_compact(self):
+        if self.stream and self.stream.pending_count():
+            return False  # 스트림 미확인 이벤트의 put 레코드 유지
+        return os.path.exists(self.spool_path) and os.path.getsize(self.spool_path) > self.compact_bytes
+
+    def _drain(self, block, timeout=None):
+        """메모리 큐의 이벤트를 스풀에 기록하고 전송 대기열로 이동"""
+        items = []
+        try:
+            if block:
+                items.append(self._queue.get(timeout=timeout))
+            while len(self._pending) + len(items) < self.max_queue:
+                items.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if items:
+            self._spool_write([dict(item, op='put') for item in items])
+            self._pending.extend(items)
+
+    def _deliver(self, item):
+        """1회 전송 시도 - 성공 또는 재시도 불가 오류면 True"""
+        url = f"{self.server_url}{item['path']}"
+        try:
+            response = self.session.post(
+                url, json=item['payload'], timeout=self.timeout,
+                headers={'X-Bridge-Event-Id': item['id']},
+            )
+        except requests.RequestException as e:
+            logger.error("콜백 전송 실패 (재시도 예정): %s - %s", item['path'], e)
+            self.failed += 1
+            self._count(item['path'], 'retry')
+            return False
+
+        if response.status_code >= 500 or response.status_code == 429:
+            logger.error("콜백 서버 오류 (재시도 예정): %s - %d", item['path'], response.status_code)
+            self.failed += 1
+            self._count(item['path'], 'retry')
+            return False
+        if response.status_code >= 400:
+            # 요청 자체가 잘못된 경우 재시도해도 결과가 같으므로 폐기
+            logger.error(
+                "콜백 거부: %s - %d %s", item['path'], response.status_code, response.text[:200]
+            )
+            self.failed += 1
+            self._count(item['path'], 'rejected')
+            return True
+
+        self.delivered += 1
+        self._count(item['path'], 'delivered')
+        return True
+
+    def _count(self, path, outcome):
+        key = (event_type_for(path), outcome)
+        with self._outcome_lock:
+            self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+    # ===== 스풀 =====
+
+    def _spool_write(self, records, spilled=False):
+        lines = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records)
+        with self._spool_lock:
+            with open(self.spool_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            if spilled:
+                self._spilled = True
+
+    def _load_spool(self):
+        """스풀에서 ack되지 않은 put 레코드를 순서대로 반환"""
+        with self._spool_lock:
+            if not os.path.exists(self.spool_path):
+                return []
+            items = {}
+            with open(self.spool_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 비정상 종료로 잘린 마지막 줄
+                    if record.get('op') == 'put':
+                        items[record['id']] = {k: record[k] for k in ('id', 'path', 'payload')}
+                    elif record.get('op') == 'ack':
+                        items.pop(record['id'], None)
+        in_memory = {item['id'] for item in self._pending}
+        return [item for item_id, item in items.items() if item_id not in in_memory]
+
+    def _rewrite_spool(self, items):
+        """스풀 압축 - 미전송 레코드만 남김"""
+        with self._spool_lock:
+            if not items and (self._spilled or not os.path.exists(self.spool_path)):
+                return
+            tmp_path = f"{self.spool_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for item in items:
+                    f.write(json.dumps(dict(item, op='put'), ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.spool_path)
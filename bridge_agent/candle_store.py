@@ -0,0 +1,107 @@
+"""
+과거 캔들(일봉/분봉) 로컬 캐시
+받아 온 봉은 SQLite 파일 하나에 (종목, 주기, 시각) 단위로 저장하고,
+종목/주기별로 연속해서 받아 둔 구간(coverage)을 기록해 그 안의 요청은 키움 조회 없이 응답합니다.
+
+시각 문자열: 일봉 'YYYYMMDD', 분봉 'YYYYMMDDHHMMSS' (문자열 비교 = 시간 순서)
+주기: 'day' 또는 분봉 틱범위 'm1', 'm3', 'm5' ...
+"""
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    code TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    time TEXT NOT NULL,
+    open INTEGER NOT NULL,
+    high INTEGER NOT NULL,
+    low INTEGER NOT NULL,
+    close INTEGER NOT NULL,
+    volume INTEGER NOT NULL,
+    PRIMARY KEY (code, interval, time)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    code TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    PRIMARY KEY (code, interval)
+) WITHOUT ROWID;
+"""
+
+CANDLE_FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+
+class CandleStore:
+    """SQLite 캔들 캐시 (스레드 공용 연결 + 락)"""
+
+    def __init__(self, path='candles.sqlite3'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def coverage(self, code, interval):
+        """연속으로 받아 둔 구간 (start, end) - 없으면 None"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT start, end FROM coverage WHERE code = ? AND interval = ?', (code, interval),
+            ).fetchone()
+
+    def covers(self, code, interval, start, end):
+        covered = self.coverage(code, interval)
+        hit = covered is not None and covered[0] <= start and end <= covered[1]
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return hit
+
+    def load(self, code, interval, start=None, end=None):
+        """구간 내 캔들 (시간 오름차순)"""
+        sql = 'SELECT time, open, high, low, close, volume FROM candles WHERE code = ? AND interval = ?'
+        params = [code, interval]
+        if start:
+            sql += ' AND time >= ?'
+            params.append(start)
+        if end:
+            sql += ' AND time <= ?'
+            params.append(end)
+        with self._lock:
+            rows = self._conn.execute(sql + ' ORDER BY time', params).fetchall()
+        return [dict(zip(CANDLE_FIELDS, row)) for row in rows]
+
+    def save(self, code, interval, candles, start, end):
+        """
+        캔들 저장 후 받아 둔 구간 갱신
+        candles는 CANDLE_FIELDS 순서의 튜플 목록 (TR 스키마 디코딩 결과 그대로)
+        [start, end]는 이번에 빠짐없이 받은 구간이며, 기존 구간과 겹치면 합칩니다.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(code, interval) + tuple(c) for c in candles],
+            )
+            if start is None or end is None or start > end:
+                return
+            row = self._conn.execute(
+                'SELECT start, end FROM coverage WHERE code = ? AND interval = ?', (code, interval),
+            ).fetchone()
+            if row and row[0] <= end and start <= row[1]:
+                start, end = min(start, row[0]), max(end, row[1])
+            elif row and row[1] > end:
+                return  # 더 최근의 연속 구간 유지 (이번 구간 캔들은 저장만)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)', (code, interval, start, end),
+            )
+
+    def stats(self):
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM candles').fetchone()[0]
+        return {'candles': count, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,245 @@
+"""
+체결/잔고(OnReceiveChejanData) 디코딩 및 병합
+gubun '0'(주문접수/체결/확인)과 '1'(잔고변경)을 FID 표로 한 번에 디코딩해
+주문상태 / 체결 / 잔고 이벤트로 나눠 전달합니다.
+
+시장가 주문 한 건이 여러 호가에 나눠 체결되면 체결 이벤트가 수십 건 연달아 들어오므로,
+같은 주문의 체결은 window초 동안 모아 한 건(합계 수량, 가중평균 단가)으로 전달합니다.
+잔고 이벤트도 같은 창 안에서는 종목별 최신값만 전달합니다.
+
+잔고 이벤트는 이미 체결이 반영된 절대값(보유수량/매입단가)이고 Django는 체결마다 잔고를 더하므로,
+잔고를 보낼 때는 같은 종목의 병합 중인 체결을 먼저 보냅니다 (체결이 잔고 뒤에 도착해 이중 반영되지 않도록).
+
+FID 참고 (체결 수량):
+    911 체결량      - 주문의 누적 체결수량
+    915 단위체결량  - 이번 체결 한 건의 수량 (914 단위체결가)
+"""
+import logging
+import threading
+
+from timer_queue import TimerQueue
+from tr_schema import CONVERTERS
+
+logger = logging.getLogger(__name__)
+
+# 주문체결 (gubun '0')
+ORDER_FIDS = {
+    'account_no': (9201, 'str'),
+    'order_no': (9203, 'str'),
+    'stock_code': (9001, 'code'),
+    'stock_name': (302, 'str'),
+    'order_status': (913, 'str'),       # 접수 / 확인 / 체결
+    'order_kind': (905, 'str'),         # +매수, -매도, 매수취소, 매도정정 ...
+    'side': (907, 'str'),               # 1:매도, 2:매수
+    'order_quantity': (900, 'int'),
+    'order_price': (901, 'abs'),
+    'unfilled_quantity': (902, 'int'),
+    'original_order_no': (904, 'str'),
+    'time': (908, 'str'),               # 주문/체결시간 HHMMSS
+    'execution_no': (909, 'str'),
+    'filled_price': (910, 'abs'),
+    'cumulative_quantity': (911, 'int'),
+    'unit_price': (914, 'abs'),
+    'unit_quantity': (915, 'int'),
+    'screen_no': (920, 'str'),
+}
+
+# 잔고변경 (gubun '1')
+BALANCE_FIDS = {
+    'account_no': (9201, 'str'),
+    'stock_code': (9001, 'code'),
+    'stock_name': (302, 'str'),
+    'current_price': (10, 'abs'),
+    'quantity': (930, 'int'),
+    'avg_price': (931, 'abs'),
+    'purchase_amount': (932, 'int'),
+    'tradable_quantity': (933, 'int'),
+    'side': (946, 'str'),
+    'today_profit': (950, 'int'),
+    'profit_rate': (8019, 'float'),
+}
+
+
+_ORDER_FIELDS = tuple((key, fid, CONVERTERS[kind]) for key, (fid, kind) in ORDER_FIDS.items())
+_BALANCE_FIELDS = tuple((key, fid, CONVERTERS[kind]) for key, (fid, kind) in BALANCE_FIDS.items())
+
+
+def decode_chejan(gubun, get_fid):
+    """
+    체잔 데이터 디코딩 (get_fid(fid) -> 문자열)
+    반환: ('order', dict) / ('balance', dict) / (None, None)
+    """
+    gubun = str(gubun)
+    if gubun == '0':
+        fields = _ORDER_FIELDS
+        kind = 'order'
+    elif gubun == '1':
+        fields = _BALANCE_FIELDS
+        kind = 'balance'
+    else:
+        return None, None
+    return kind, {key: convert(get_fid(fid) or '') for key, fid, convert in fields}
+
+
+def order_status_of(event):
+    """주문 이벤트 -> Django 주문상태 (submitted / cancelled / rejected), 체결이면 'filled'"""
+    status, kind = event['order_status'], event['order_kind']
+    if status == '체결':
+        return 'filled'
+    if '거부' in kind or '거부' in status:
+        return 'rejected'
+    if '취소' in kind and status == '확인':
+        return 'cancelled'
+    return 'submitted'
+
+
+class _PendingFill:
+    """병합 중인 주문 체결"""
+
+    __slots__ = ('event', 'quantity', 'amount', 'executions')
+
+    def __init__(self, event):
+        self.event = event
+        self.quantity = 0
+        self.amount = 0
+        self.executions = 0
+
+    def add(self, event, quantity, price):
+        self.event = event
+        self.quantity += quantity
+        self.amount += quantity * price
+        self.executions += 1
+
+    def payload(self):
+        event = self.event
+        return {
+            'order_no': event['order_no'],
+            'stock_code': event['stock_code'],
+            'order_type': 'buy' if event['side'] == '2' else 'sell',
+            'filled_quantity': self.quantity,
+            'filled_price': round(self.amount / self.quantity),
+            'cumulative_quantity': event['cumulative_quantity'],
+            'unfilled_quantity': event['unfilled_quantity'],
+            'order_quantity': event['order_quantity'],
+            'executions': self.executions,
+            'filled_at': event['time'],
+        }
+
+
+class ChejanProcessor:
+    """
+    체잔 이벤트 처리기
+    on_order_status(payload) - 접수/취소확인/거부 (즉시 전달)
+    on_fill(payload)         - 주문별 병합 체결
+    on_balance(payload)      - 종목별 최신 잔고
+    """
+
+    def __init__(self, on_order_status, on_fill, on_balance, window=0.005):
+        self.on_order_status = on_order_status
+        self.on_fill = on_fill
+        self.on_balance = on_balance
+        self.window = window
+
+        self._lock = threading.Lock()
+        self._fills = {}        # 주문번호 -> _PendingFill
+        self._balances = {}     # 종목코드 -> 최신 잔고 이벤트
+        self._queue = TimerQueue(self._flush, name='chejan-coalesce')
+
+        self.events = 0
+        self.executions = 0
+        self.fills_sent = 0
+        self.balances_sent = 0
+
+    def on_event(self, gubun, get_fid):
+        """OnReceiveChejanData 1건 (COM 스레드에서 호출 - 디코딩 후 바로 반환)"""
+        kind, event = decode_chejan(gubun, get_fid)
+        if kind is None:
+            return
+        self.events += 1
+        if kind == 'balance':
+            self._add_balance(event)
+        elif order_status_of(event) == 'filled':
+            self._add_execution(event)
+        else:
+            # 같은 주문의 병합 중인 체결을 먼저 보내 순서 유지
+            self._flush([('fill', event['order_no']), ('fill', event['original_order_no'])])
+            self._emit(self.on_order_status, {
+                'order_no': event['order_no'],
+                'original_order_no': event['original_order_no'],
+                'stock_code': event['stock_code'],
+                'status': order_status_of(event),
+                'order_kind': event['order_kind'],
+                'order_quantity': event['order_quantity'],
+                'unfilled_quantity': event['unfilled_quantity'],
+                'time': event['time'],
+            })
+
+    def _add_execution(self, event):
+        quantity = event['unit_quantity']
+        price = event['unit_price'] or event['filled_price']
+        if quantity <= 0 or price <= 0:
+            return
+        order_no = event['order_no']
+        with self._lock:
+            self.executions += 1
+            pending = self._fills.get(order_no)
+            if pending is None:
+                pending = self._fills[order_no] = _PendingFill(event)
+                schedule = True
+            else:
+                schedule = False
+            pending.add(event, quantity, price)
+        if schedule:
+            self._queue.schedule(self.window, ('fill', order_no))
+
+    def _add_balance(self, event):
+        code = event['stock_code']
+        with self._lock:
+            schedule = code not in self._balances
+            self._balances[code] = event
+        if schedule:
+            self._queue.schedule(self.window, ('balance', code))
+
+    def _flush(self, keys):
+        """만기된 (종류, 키) 묶음 전달 - 이미 보낸 키는 무시"""
+        fills, balances = [], []
+        with self._lock:
+            for kind, key in keys:
+                if kind == 'fill':
+                    pending = self._fills.pop(key, None)
+                    if pending is not None:
+                        fills.append(pending.payload())
+                else:
+                    event = self._balances.pop(key, None)
+                    if event is not None:
+                        fills.extend(self._pop_fills_of(key))
+                        balances.append(event)
+            self.fills_sent += len(fills)
+            self.balances_sent += len(balances)
+        for payload in fills:
+            self._emit(self.on_fill, payload)
+        for event in balances:
+            self._emit(self.on_balance, event)
+
+    def _pop_fills_of(self, stock_code):
+        """종목의 병합 중인 체결 꺼내기 (self._lock 안에서 호출) - 전달 payload 목록"""
+        order_nos = [no for no, pending in self._fills.items() if pending.event['stock_code'] == stock_code]
+        return [self._fills.pop(no).payload() for no in order_nos]
+
+    @staticmethod
+    def _emit(callback, payload):
+        try:
+            callback(payload)
+        except Exception as e:
+            logger.error("체잔 이벤트 전달 실패 [%s]: %s", payload.get('order_no') or payload.get('stock_code'), e)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'events': self.events,
+                'executions': self.executions,
+                'fills_sent': self.fills_sent,
+                'balances_sent': self.balances_sent,
+                'pending_fills': len(self._fills),
+                'pending_balances': len(self._balances),
+            }
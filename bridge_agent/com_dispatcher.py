@@ -0,0 +1,116 @@
+"""
+COM 디스패처 스레드
+키움 OCX는 STA COM 컨트롤이라 생성한 스레드에서만 호출하고 그 스레드에서 메시지를 펌핑해야
+이벤트가 들어옵니다. OCX 생성/호출/메시지 펌프를 전용 스레드 하나에서 처리하고,
+다른 스레드(HTTP 핸들러, 스케줄러)의 호출은 명령 큐로 넘겨 결과를 기다립니다.
+"""
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class ComDispatcher:
+    """OCX 전용 스레드 + 명령 큐"""
+
+    def __init__(self, factory, pump_interval=0.005, name='com-dispatcher'):
+        """factory()는 COM 스레드에서 호출되어 OCX 객체를 반환"""
+        self.factory = factory
+        self.pump_interval = pump_interval
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.ocx = None
+        self.error = None
+        self.calls = 0
+
+    def start(self, timeout=30):
+        """스레드 시작 후 OCX 생성 완료까지 대기"""
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError('COM 디스패처 초기화 시간 초과')
+        if self.error:
+            raise self.error
+        return self.ocx
+
+    def in_com_thread(self):
+        return threading.current_thread() is self._thread
+
+    def call(self, fn, *args):
+        """COM 스레드에서 fn(*args) 실행 후 결과 반환 (COM 스레드에서 호출 시 바로 실행)"""
+        if self.in_com_thread():
+            return fn(*args)
+        future = Future()
+        self._queue.put((future, fn, args))
+        return future.result()
+
+    def post(self, fn, *args):
+        """결과를 기다리지 않고 COM 스레드에 실행 요청 (락을 쥔 채 호출해도 교착되지 않도록)"""
+        if self.in_com_thread():
+            return self._execute(None, fn, args)
+        self._queue.put((None, fn, args))
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        import pythoncom
+        pythoncom.CoInitialize()
+        try:
+            self.ocx = self.factory()
+        except Exception as e:
+            logger.error("OCX 생성 실패: %s", e)
+            self.error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        while True:
+            # 대기중인 명령을 모두 처리한 뒤 메시지 펌프 (이벤트 핸들러는 여기서 호출됨)
+            try:
+                item = self._queue.get(timeout=self.pump_interval)
+            except queue.Empty:
+                item = None
+            while item is not None:
+                self._execute(*item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            pythoncom.PumpWaitingMessages()
+
+    def _execute(self, future, fn, args):
+        if future is not None and not future.set_running_or_notify_cancel():
+            return
+        self.calls += 1
+        try:
+            result = fn(*args)
+        except Exception as e:
+            if future is None:
+                logger.error("COM 호출 실패 [%s]: %s", getattr(fn, '__name__', fn), e)
+            else:
+                future.set_exception(e)
+        else:
+            if future is not None:
+                future.set_result(result)
+
+
+class ComProxy:
+    """OCX 메서드 호출을 COM 디스패처 스레드로 넘기는 프록시"""
+
+    def __init__(self, dispatcher):
+        self._dispatcher = dispatcher
+
+    def __getattr__(self, name):
+        # 동적 디스패치의 이름 조회도 COM 호출이므로 COM 스레드에서 수행
+        def invoke(*args):
+            return self._dispatcher.call(lambda: getattr(self._dispatcher.ocx, name)(*args))
+
+        invoke.__name__ = name
+        return invoke
+
+    def post(self, name, *args):
+        """OCX 메서드를 결과 대기 없이 호출 (SetRealReg 등 반환값을 쓰지 않는 호출)"""
+        self._dispatcher.post(lambda: getattr(self._dispatcher.ocx, name)(*args))
@@ -0,0 +1,192 @@
+"""
+브릿지 이벤트 저널 (기록 / 재생)
+OCX에서 들어온 이벤트(조건검색 결과/편입·이탈, 체잔, 실시간 체결, TR 응답)를 수신 시각과 함께
+한 줄씩 기록하고, 기록한 세션을 원래 이벤트 경로(핸들러 → 콜백 전송)로 실시간 또는 N배속으로 다시 흘려보냅니다.
+장 시작 직후 같은 부하 구간을 Linux에서 그대로 재현하는 용도입니다.
+
+저널 형식 (JSON Lines, 경로가 .gz로 끝나면 gzip):
+    {"journal": 1, "started_at": "2026-10-17T09:00:00"}     - 헤더
+    [경과ms, 종류, 인자...]                                   - 이벤트
+종류:
+    tc  조건검색 결과 (화면번호, 종목코드 목록 ';', 조건명, 조건식인덱스)  - 연속조회 병합 후
+    rc  조건검색 편입/이탈 (종목코드, I/D, 조건명, 조건식인덱스)
+    cj  체잔 (gubun, {FID: 값})
+    rt  실시간 체결 (종목코드, 실시간타입, {FID: 값})
+    tr  TR 응답 (화면번호, 요청명, TR코드, prev_next)  - 조회 응답은 요청에 대한 것이므로 재생하지 않음
+"""
+import gzip
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def recording_getter(get_fid, fields):
+    """FID 조회 함수를 감싸 읽은 값을 fields에 모음 (디코딩하면서 추가 COM 호출 없이 원본 기록)"""
+    def get(fid):
+        value = get_fid(fid)
+        fields[fid] = value
+        return value
+    return get
+
+
+class EventJournal:
+    """이벤트 기록기 - record()는 큐에 넣기만 하고 파일 쓰기는 별도 스레드에서"""
+
+    def __init__(self, path, flush_interval=0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._started = time.monotonic()
+        self.recorded = 0
+        self.counts = {}
+
+        self._file = _open(path, 'a')
+        self._file.write(json.dumps({
+            'journal': JOURNAL_VERSION, 'started_at': datetime.now().isoformat(timespec='seconds'),
+        }) + '\n')
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='event-journal', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, kind, *args):
+        self._queue.put((round((time.monotonic() - self._started) * 1000, 1), kind, args))
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._write()
+
+    def close(self):
+        """남은 이벤트 기록 후 파일 닫기 (gzip 종료 블록 기록)"""
+        self._write()
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _write(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            lines = []
+            try:
+                while True:
+                    elapsed, kind, args = self._queue.get_nowait()
+                    lines.append(json.dumps([elapsed, kind, *args], ensure_ascii=False, separators=(',', ':')))
+                    self.counts[kind] = self.counts.get(kind, 0) + 1
+            except queue.Empty:
+                pass
+            if not lines:
+                return
+            try:
+                self._file.write('\n'.join(lines) + '\n')
+                self._file.flush()
+            except OSError as e:
+                logger.error("이벤트 저널 기록 실패 (%d건): %s", len(lines), e)
+                return
+            self.recorded += len(lines)
+
+    def stats(self):
+        return {'path': self.path, 'recorded': self.recorded, 'pending': self._queue.qsize(), 'counts': dict(self.counts)}
+
+
+def read_journal(path):
+    """저널 이벤트 순회 - (경과초, 종류, 인자 목록), 헤더/잘린 줄은 건너뜀"""
+    with _open(path, 'r') as f:
+        try:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 비정상 종료로 잘린 마지막 줄
+                if isinstance(record, list) and len(record) >= 2:
+                    yield record[0] / 1000, record[1], record[2:]
+        except EOFError:
+            pass  # 닫히지 않은 gzip (기록 중 종료) - 플러시된 곳까지만 재생
+
+
+class JournalReplayer:
+    """
+    저널 재생기
+    handlers는 종류 -> 함수(*인자) 매핑이며, speed배속으로 기록 시각 간격을 맞춰 호출합니다 (0이면 대기 없이).
+    기록 중 여러 번 시작한 세션이 이어붙은 파일은 경과 시각이 되돌아가는 지점부터 새 구간으로 이어서 재생합니다.
+    """
+
+    def __init__(self, path, handlers, speed=1.0):
+        self.path = path
+        self.handlers = handlers
+        self.speed = speed
+        self.replayed = 0
+        self.skipped = 0
+        self.lag_ms = 0.0
+        self.running = False
+        self.finished_at = None
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name='journal-replay', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        logger.info("이벤트 저널 재생 시작: %s (%s배속)", self.path, self.speed or '최대')
+        base = time.monotonic()
+        offset = 0.0
+        last = 0.0
+        try:
+            for elapsed, kind, args in read_journal(self.path):
+                if elapsed < last:
+                    offset += last   # 이어붙은 다음 세션
+                last = elapsed
+                if self.speed:
+                    due = base + (offset + elapsed) / self.speed
+                    wait = due - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                    else:
+                        self.lag_ms = max(self.lag_ms, -wait * 1000)
+
+                handler = self.handlers.get(kind)
+                if handler is None:
+                    self.skipped += 1
+                    continue
+                try:
+                    handler(*args)
+                except Exception as e:
+                    logger.error("저널 이벤트 재생 실패 [%s]: %s", kind, e)
+                self.replayed += 1
+        except OSError as e:
+            logger.error("이벤트 저널 읽기 실패: %s", e)
+        finally:
+            self.running = False
+            self.finished_at = datetime.now().isoformat(timespec='seconds')
+            logger.info(
+                "이벤트 저널 재생 완료: %d건 재생, %d건 건너뜀 (%.1f초)",
+                self.replayed, self.skipped, time.monotonic() - base,
+            )
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'speed': self.speed,
+            'running': self.running,
+            'replayed': self.replayed,
+            'skipped': self.skipped,
+            'max_lag_ms': round(self.lag_ms, 1),
+            'finished_at': self.finished_at,
+        }
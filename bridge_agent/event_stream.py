@@ -0,0 +1,107 @@
+"""
+브릿지 → Django 이벤트 스트림
+Django 컨슈머가 /api/stream/events 에 장기 연결을 열면 콜백 이벤트를 HTTP POST 대신
+NDJSON 청크로 순번(seq)과 함께 흘려보내고, 컨슈머는 /api/stream/ack 로 처리 완료를 알립니다.
+컨슈머가 끊긴 채 유예시간이 지나면 미확인 이벤트는 기존 콜백 POST 경로로 되돌립니다.
+
+이벤트 한 줄:
+    {"seq": 12, "type": "order-filled", "id": "...", "payload": {...}}
+"""
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CALLBACK_PREFIX = '/api/callback/'
+
+
+def event_type_for(path):
+    """콜백 경로 -> 이벤트 타입 ('/api/callback/condition-match/bulk/' -> 'condition-match-bulk')"""
+    if path.startswith(CALLBACK_PREFIX):
+        path = path[len(CALLBACK_PREFIX):]
+    return path.strip('/').replace('/', '-')
+
+
+class EventStream:
+    """순번이 매겨진 이벤트 버퍼 + 스트리밍 컨슈머 관리"""
+
+    def __init__(self, grace_period=5.0, heartbeat_interval=5.0):
+        self.grace_period = grace_period
+        self.heartbeat_interval = heartbeat_interval
+        self._cond = threading.Condition()
+        self._events = OrderedDict()   # seq -> (이벤트 dict, 콜백 item)
+        self._seq = 0
+        self._consumers = 0
+        self._disconnected_at = time.monotonic()
+
+    def active(self):
+        with self._cond:
+            return self._consumers > 0
+
+    def publish(self, item):
+        """콜백 item을 스트림 이벤트로 등록 - 순번 반환"""
+        with self._cond:
+            self._seq += 1
+            event = {
+                'seq': self._seq,
+                'type': event_type_for(item['path']),
+                'id': item['id'],
+                'payload': item['payload'],
+            }
+            self._events[self._seq] = (event, item)
+            self._cond.notify_all()
+            return self._seq
+
+    def ack(self, seq):
+        """seq 이하 이벤트 처리 완료 - 확인된 콜백 item 목록 반환"""
+        acked = []
+        with self._cond:
+            while self._events:
+                first = next(iter(self._events))
+                if first > seq:
+                    break
+                acked.append(self._events.pop(first)[1])
+        return acked
+
+    def take_expired(self):
+        """컨슈머 없이 유예시간이 지난 미확인 이벤트를 회수 (콜백 POST로 재전송용)"""
+        with self._cond:
+            if self._consumers > 0 or not self._events:
+                return []
+            if time.monotonic() - self._disconnected_at < self.grace_period:
+                return []
+            items = [item for _, item in self._events.values()]
+            self._events.clear()
+        logger.warning("스트림 컨슈머 없음, 미확인 이벤트 %d건 콜백으로 전환", len(items))
+        return items
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._events)
+
+    def iter_events(self, after=0):
+        """컨슈머용 NDJSON 제너레이터 (after 이후 미확인 이벤트부터 전송)"""
+        with self._cond:
+            self._consumers += 1
+        cursor = after
+        try:
+            while True:
+                with self._cond:
+                    batch = [event for seq, (event, _) in self._events.items() if seq > cursor]
+                    if not batch:
+                        self._cond.wait(self.heartbeat_interval)
+                        batch = [event for seq, (event, _) in self._events.items() if seq > cursor]
+                if not batch:
+                    yield json.dumps({'type': 'heartbeat', 'seq': cursor}) + '\n'
+                    continue
+                cursor = batch[-1]['seq']
+                yield ''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in batch)
+        finally:
+            with self._cond:
+                self._consumers -= 1
+                if self._consumers == 0:
+                    self._disconnected_at = time.monotonic()
+            logger.info("스트림 컨슈머 연결 종료 (마지막 전송 seq=%d)", cursor)
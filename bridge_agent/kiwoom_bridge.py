@@ -9,13 +9,34 @@ Django 서버와 HTTP로 통신하며, 키움 OpenAPI+ COM을 직접 제어합
 
 주의: 이 파일은 반드시 Windows에서 32bit Python으로 실행해야 합니다.
 """
+import os
 import sys
-import time
 import json
+import time
 import logging
 import argparse
+import functools
 import threading
-from flask import Flask, request, jsonify
+from datetime import datetime
+from contextlib import contextmanager
+from concurrent.futures import CancelledError, TimeoutError as FutureTimeoutError
+from flask import Flask, Response, request, jsonify, stream_with_context
+
+from tr_engine import TrRequestEngine, TrRequestError, TrTimeoutError
+from tr_scheduler import TrScheduler, PRIORITY_ORDER, PRIORITY_QUERY
+from screen_pool import ScreenPool, ScreenPoolExhausted
+from realtime import RealtimeManager
+from master_table import MasterTable, simulation_stocks
+from market_simulator import MarketSimulator
+from com_dispatcher import ComDispatcher, ComProxy
+from metrics import Registry, CONTENT_TYPE
+from candle_store import CandleStore
+from chejan import ChejanProcessor
+from quote_cache import QuoteCache
+from event_journal import EventJournal, JournalReplayer, recording_getter
+from tr_schema import TR_SCHEMAS
+from callback_dispatcher import CallbackDispatcher
+from event_stream import EventStream
 
 logging.basicConfig(
     level=logging.INFO,
@@ -25,20 +46,134 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# CommKwRqData 1회 최대 종목수
+KW_MAX_CODES = 100
+
+# 캔들 연속조회 최대 페이지 (일봉 600건, 분봉 900건/페이지)
+CANDLE_MAX_PAGES = 20
+# 분봉 틱범위
+MINUTE_INTERVALS = (1, 3, 5, 10, 15, 30, 45, 60)
+
+# opw00018 연속조회 최대 페이지 (페이지당 20종목)
+BALANCE_MAX_PAGES = 50
+
+# opt10075 미체결 연속조회 최대 페이지
+OPEN_ORDER_MAX_PAGES = 20
+
 # 키움 API 인스턴스 (전역)
 kiwoom = None
 django_server_url = 'http://localhost:8000'
+# Django 콜백 전송기 / 이벤트 스트림 (전역)
+dispatcher = None
+event_stream = None
+
+# ===== 메트릭 =====
+
+metrics = Registry()
+tr_latency = metrics.histogram(
+    'kiwoom_tr_latency_seconds', 'TR 요청부터 응답까지 소요시간', ['tr_code', 'result'])
+order_latency = metrics.histogram(
+    'kiwoom_order_latency_seconds', '주문 등록부터 SendOrder 완료까지 소요시간 (스케줄러 대기 포함)', ['result'])
+condition_latency = metrics.histogram(
+    'kiwoom_condition_latency_seconds', 'SendCondition부터 조건검색 결과 수신까지 소요시간', ['result'])
+com_events = metrics.counter('kiwoom_com_events_total', 'OCX 이벤트 수신 건수', ['event'])
+
+# 스크레이프 시점에 읽는 대기/처리 현황 (kiwoom, dispatcher 전역이 준비되기 전에는 생략)
+metrics.gauge_callback(
+    'kiwoom_tr_pending', '응답 대기중인 TR 요청 수',
+    lambda: kiwoom.tr.pending_count() if kiwoom else None)
+
+
+def _scheduler_depths():
+    if not kiwoom:
+        return None
+    stats = kiwoom.scheduler.stats()
+    return {('order',): stats['pending_orders'], ('query',): stats['pending_queries']}
+
+
+metrics.gauge_callback(
+    'kiwoom_scheduler_queue_depth', '스케줄러 대기 작업 수', _scheduler_depths, ['priority'])
+metrics.counter_callback(
+    'kiwoom_scheduler_dispatched_total', '스케줄러가 실행한 작업 수',
+    lambda: kiwoom.scheduler.dispatched if kiwoom else None)
+metrics.counter_callback(
+    'kiwoom_scheduler_merged_total', '대기중 동일 요청에 병합된 요청 수',
+    lambda: kiwoom.scheduler.merged if kiwoom else None)
+metrics.gauge_callback(
+    'kiwoom_com_queue_depth', 'COM 디스패처 명령 대기 수',
+    lambda: kiwoom.com.qsize() if kiwoom and kiwoom.com else None)
+metrics.gauge_callback(
+    'kiwoom_screens_in_use', '사용중인 화면번호 수',
+    lambda: {(kind,): n for kind, n in kiwoom.screens.stats()['by_kind'].items()} if kiwoom else None,
+    ['kind'])
+metrics.gauge_callback(
+    'kiwoom_realtime_codes', '실시간 등록 종목 수',
+    lambda: kiwoom.realtime.subscriptions()['codes'] if kiwoom else None)
+metrics.counter_callback(
+    'kiwoom_realtime_ticks_total', '수신한 실시간 체결 건수',
+    lambda: kiwoom.realtime.ticks_received if kiwoom else None)
+metrics.gauge_callback(
+    'kiwoom_callback_queue_depth', 'Django 전송 대기 콜백 수',
+    lambda: dispatcher.queue_depth() if dispatcher else None)
+metrics.counter_callback(
+    'kiwoom_callback_total', 'Django 콜백 전송 결과 (delivered/retry/rejected/streamed)',
+    lambda: dict(dispatcher.outcomes) if dispatcher else None,
+    ['type', 'outcome'])
+metrics.counter_callback(
+    'kiwoom_quote_cache_total', '현재가 조회 결과 (hit/merged/miss/tick_updates)',
+    lambda: {(k,): v for k, v in kiwoom.quotes.stats().items()
+             if k in ('hits', 'merged', 'misses', 'tick_updates')} if kiwoom else None,
+    ['result'])
+metrics.counter_callback(
+    'kiwoom_chejan_total', '체잔 처리 건수 (events/executions/fills_sent/balances_sent)',
+    lambda: {(k,): v for k, v in kiwoom.chejan.stats().items() if not k.startswith('pending')} if kiwoom else None,
+    ['kind'])
+metrics.gauge_callback(
+    'kiwoom_stream_pending', '스트림 컨슈머 확인 대기 이벤트 수',
+    lambda: event_stream.pending_count() if event_stream else None)
 
 
 class KiwoomAPI:
     """키움 OpenAPI+ COM 래퍼"""
 
-    def __init__(self):
+    def __init__(self, tick_flush_interval=0.2, master_cache_dir='master_cache', sim_options=None,
+                 candle_db='candles.sqlite3', chejan_window=0.005, quote_ttl=1.0, journal_path=None):
         self.connected = False
         self.ocx = None
+        self.com = None
         self.account_no = ''
         self.condition_list = {}
         self._event_handlers = {}
+        self.tr = TrRequestEngine(
+            on_complete=lambda tr_code, elapsed, result: tr_latency.observe(elapsed, tr_code=tr_code, result=result),
+        )
+        self.scheduler = TrScheduler()
+        self.screens = ScreenPool(on_release=self._on_screen_release)
+        self.master = MasterTable(cache_dir=master_cache_dir)
+        self.candles = CandleStore(candle_db)
+        # 연속조회 직렬화: 화면키 -> [락, 사용자 수] (같은 키의 연속조회가 한 화면에서 섞이지 않도록)
+        self._paging_locks = {}
+        self._paging_guard = threading.Lock()
+        # 조건검색 연속조회 결과 병합 버퍼: (화면번호, 조건식인덱스) -> 종목코드 목록
+        self._condition_pages = {}
+        # 일회성 조건검색 (결과 수신 후 화면번호 반납)
+        self._oneshot_conditions = set()
+        # 조건검색 요청 시각 (결과 수신 지연 측정): (화면번호, 조건식인덱스) -> monotonic
+        self._condition_started = {}
+        # Django 초기편입 작업ID (결과 콜백에 실어 보냄): 조건식인덱스 -> 작업ID
+        self._condition_jobs = {}
+        # 이벤트 저널 (기록 / 재생)
+        self.journal = EventJournal(journal_path) if journal_path else None
+        self.replayer = None
+        # 현재가 캐시 (종목별 조회 병합, 실시간 체결로 갱신)
+        self.quotes = QuoteCache(ttl=quote_ttl)
+        # 체잔 이벤트 디코딩 + 주문별 체결 병합
+        self.chejan = ChejanProcessor(
+            on_order_status=lambda payload: dispatcher.send('/api/callback/order-status/', payload),
+            on_fill=lambda payload: dispatcher.send('/api/callback/order-filled/', payload),
+            on_balance=self._on_balance_event,
+            window=chejan_window,
+        )
 
         try:
             import pythoncom
@@ -50,27 +185,91 @@ class KiwoomAPI:
             logger.warning("pywin32를 찾을 수 없습니다. 시뮬레이션 모드로 실행합니다.")
             self.simulation_mode = True
 
+        self.simulator = None
+        if self.simulation_mode:
+            self._init_simulator(sim_options or {})
+
+        self.realtime = RealtimeManager(
+            self.screens,
+            register=self._set_real_reg,
+            remove=self._set_real_remove,
+            on_flush=lambda ticks: dispatcher.send('/api/callback/ticks/', {'ticks': ticks}),
+            flush_interval=tick_flush_interval,
+        )
+
     def _init_ocx(self):
-        """키움 OpenAPI OCX 초기화"""
+        """
+        키움 OpenAPI OCX 초기화
+        OCX 생성/호출/이벤트는 모두 COM 디스패처 스레드에서 처리하고,
+        self.ocx는 다른 스레드의 호출을 그 스레드로 넘기는 프록시입니다.
+        """
         try:
-            self.ocx = self.win32com.client.Dispatch("KHOPENAPI.KHOpenAPICtrl.1")
+            self.com = ComDispatcher(self._create_ocx)
+            self.com.start()
+            self.ocx = ComProxy(self.com)
             self.simulation_mode = False
-            self._connect_events()
             logger.info("키움 OpenAPI OCX 초기화 완료")
         except Exception as e:
             logger.error("키움 OpenAPI OCX 초기화 실패: %s", e)
+            self.com = None
             self.simulation_mode = True
 
-    def _connect_events(self):
-        """이벤트 핸들러 연결"""
-        if self.simulation_mode:
-            return
+    def _create_ocx(self):
+        """OCX 생성 및 이벤트 핸들러 연결 (COM 디스패처 스레드에서 호출)"""
+        ocx = self.win32com.client.Dispatch("KHOPENAPI.KHOpenAPICtrl.1")
         try:
-            import win32com.client
-            handler = win32com.client.WithEvents(self.ocx, KiwoomEventHandler)
+            handler = self.win32com.client.WithEvents(ocx, KiwoomEventHandler)
             handler.api = self
         except Exception as e:
             logger.error("이벤트 핸들러 연결 실패: %s", e)
+        return ocx
+
+    def _com_call(self, fn, *args):
+        """COM 스레드에서 실행 (시뮬레이션 모드는 호출 스레드에서 바로 실행)"""
+        if self.com is None:
+            return fn(*args)
+        return self.com.call(fn, *args)
+
+    def _init_simulator(self, options):
+        """
+        시뮬레이션 시장 - 이벤트는 실제 OCX 이벤트 핸들러로 전달
+        조건검색 종목은 시뮬레이션 종목 마스터(로그인 시 로드)와 같은 목록을 씁니다.
+        """
+        options = dict(options)
+        self.sim_symbols = options.pop('symbols', 200)
+        events = KiwoomEventHandler()
+        events.api = self
+        self.simulator = MarketSimulator(
+            universe=[s['code'] for s in simulation_stocks(self.sim_symbols)],
+            on_tick=lambda code, get_fid: self.on_real_data(code, '주식체결', get_fid),
+            on_chejan=self.on_chejan,
+            on_condition_result=lambda screen_no, codes, name, index: events.OnReceiveTrCondition(
+                screen_no, ';'.join(codes), name, index, '0',
+            ),
+            on_condition_event=events.OnReceiveRealCondition,
+            reference_price=lambda code: (self.master.get(code) or {}).get('base_price'),
+            **options
+        )
+
+    def _on_screen_release(self, kind, screen_no):
+        """반납된 TR 화면의 암묵적 실시간 등록 해제"""
+        if kind == 'tr' and not self.simulation_mode:
+            self.ocx.post('DisconnectRealData', screen_no)
+
+    def _set_real_reg(self, screen_no, codes, fids, opt_type):
+        if self.simulation_mode:
+            if not self.replaying:  # 재생 중에는 기록된 체결만 흘려보냄
+                self.simulator.register(screen_no, codes.split(';'), opt_type)
+        else:
+            # 실시간 구독 관리자가 락을 쥔 채 호출하므로 결과를 기다리지 않음
+            self.ocx.post('SetRealReg', screen_no, codes, fids, opt_type)
+
+    def _set_real_remove(self, screen_no, code):
+        if self.simulation_mode:
+            if not self.replaying:
+                self.simulator.remove(screen_no, code)
+        else:
+            self.ocx.post('SetRealRemove', screen_no, code)
 
     # ===== 접속 =====
 
@@ -78,6 +277,7 @@ class KiwoomAPI:
         """로그인"""
         if self.simulation_mode:
             self.connected = True
+            self.load_master()
             return {'success': True, 'message': '시뮬레이션 모드 접속'}
 
         # 모의투자 서버 설정
@@ -86,12 +286,23 @@ class KiwoomAPI:
         else:
             self.ocx.KOA_Functions("SetServerGubun", "0")
 
+        # 로그인 결과와 종목 마스터 로드는 OnEventConnect에서 처리
         ret = self.ocx.CommConnect()
         if ret == 0:
             self.connected = True
             return {'success': True}
         return {'success': False, 'error': f'로그인 실패 (코드: {ret})'}
 
+    def load_master(self):
+        """종목 마스터 로드 (로그인 완료 후)"""
+        try:
+            if self.simulation_mode:
+                self.master.load(simulation_symbols=self.sim_symbols)
+            else:
+                self.master.load(self.ocx)
+        except Exception as e:
+            logger.error("종목 마스터 로드 실패: %s", e)
+
     def get_connect_state(self):
         """접속 상태"""
         if self.simulation_mode:
@@ -126,180 +337,559 @@ class KiwoomAPI:
 
         return {'conditions': conditions}
 
-    def send_condition(self, screen_no, condition_name, condition_index, is_realtime=True):
-        """조건검색 실행"""
-        if self.simulation_mode:
-            return {
-                'stocks': ['005930', '000660', '035420'],
-                'message': f'조건검색 실행: {condition_name}'
-            }
+    def send_condition(self, condition_name, condition_index, is_realtime=True, job_id=None):
+        """조건검색 실행 (조건식별 화면번호 자동 할당, job_id는 결과 일괄 콜백에 그대로 전달)"""
+        try:
+            screen_no = self.screens.lease('condition', condition_index)
+        except ScreenPoolExhausted as e:
+            return {'error': str(e)}
+
+        if not is_realtime:
+            self._oneshot_conditions.add(condition_index)
 
         search_type = 1 if is_realtime else 0
-        ret = self.ocx.SendCondition(screen_no, condition_name, condition_index, search_type)
+        self._condition_started[(screen_no, condition_index)] = time.monotonic()
+        # 결과 이벤트가 SendCondition 반환보다 먼저 올 수 있으므로 요청 전에 등록
+        self._condition_jobs[condition_index] = job_id
+        if self.simulation_mode:
+            ret = self.simulator.send_condition(screen_no, condition_name, condition_index, search_type)
+        else:
+            ret = self.ocx.SendCondition(screen_no, condition_name, condition_index, search_type)
 
         if ret == 1:
-            return {'message': f'조건검색 실행 성공: {condition_name}', 'stocks': []}
+            # 편입 종목은 OnReceiveTrCondition에서 조건검색 결과 일괄 콜백으로 전달
+            return {'message': f'조건검색 실행 성공: {condition_name}', 'screen_no': screen_no}
+        self._oneshot_conditions.discard(condition_index)
+        self._condition_jobs.pop(condition_index, None)
+        started = self._condition_started.pop((screen_no, condition_index), None)
+        if started is not None:
+            condition_latency.observe(time.monotonic() - started, result='error')
+        self.screens.release(screen_no)
         return {'error': f'조건검색 실행 실패: {condition_name}'}
 
-    def stop_condition(self, screen_no, condition_name, condition_index):
+    def stop_condition(self, condition_name, condition_index):
         """실시간 조건검색 중지"""
-        if self.simulation_mode:
-            return {'message': f'조건검색 중지: {condition_name}'}
+        self.realtime.unsubscribe_owner(f'condition:{condition_index}')
+        screen_no = self.screens.get('condition', condition_index)
+        if screen_no is None:
+            return {'message': f'실행중인 조건검색 없음: {condition_name}'}
 
-        self.ocx.SendConditionStop(screen_no, condition_name, condition_index)
+        if self.simulation_mode:
+            self.simulator.stop_condition(condition_index)
+        else:
+            self.ocx.SendConditionStop(screen_no, condition_name, condition_index)
+        # 같은 조건식을 여러 번 실행했더라도 중지 시 한번에 반납
+        self.screens.release(screen_no, force=True)
         return {'message': f'조건검색 중지: {condition_name}'}
 
-    # ===== 시세 =====
+    # ===== TR 공통 =====
+
+    def _schedule_tr(self, submit, key=None, screen_key=None):
+        """
+        TR 작업을 스케줄러에 등록
+        submit(screen_no, future)가 실제 요청을 전송하며, 화면번호는 전송 시점에 임대하고
+        응답/실패 시 반납합니다. key가 같은 대기중 요청은 병합됩니다.
+        screen_key를 주면 같은 키의 화면번호를 공유합니다 (연속조회).
+        """
+        def dispatch(future):
+            screen_no = self.screens.lease('tr', screen_key)
+            future.add_done_callback(lambda _: self.screens.release(screen_no))
+            # SetInputValue ~ CommRqData를 COM 스레드에서 한번에 실행
+            return self._com_call(submit, screen_no, future)
+
+        return self.scheduler.submit(dispatch, priority=PRIORITY_QUERY, key=key)
+
+    def _wait_tr(self, job, timeout=None):
+        """스케줄된 TR 응답 대기"""
+        try:
+            return self.tr.wait(job.future, timeout)
+        except TrTimeoutError:
+            self.scheduler.abandon(job)
+            raise
+        except CancelledError:
+            raise TrRequestError('TR 요청 취소됨 (대기자 없음)')
+
+    def _request_tr(self, tr_code, rq_name, inputs, decoder, timeout=None, key=None,
+                    prev_next=0, screen_key=None):
+        """TR 조회 (스케줄러 경유, 응답까지 대기) - 결과에 스케줄러 대기정보 포함"""
+        job = self._schedule_tr(
+            lambda screen_no, future: self.tr.submit(
+                self.ocx, tr_code, rq_name, screen_no, inputs, decoder, prev_next, future=future,
+            ),
+            key=key,
+            screen_key=screen_key,
+        )
+        result = self._wait_tr(job, timeout)
+        return dict(result, scheduler=job.info(self.scheduler.queue_depth()))
+
+    def _request_schema(self, schema, timeout=None, key=None, **values):
+        """스키마 TR 조회 - {'single', 'rows', 'next', 'scheduler'}"""
+        return self._request_tr(
+            schema.tr_code, schema.rq_name, schema.input_values(**values), schema.decoder(self.ocx),
+            timeout=timeout, key=key,
+        )
 
-    def get_stock_price(self, stock_code):
-        """현재가 조회"""
-        if self.simulation_mode:
-            return {
-                'stock_code': stock_code,
-                'current_price': 50000,
-                'open_price': 49500,
-                'high_price': 51000,
-                'low_price': 49000,
-                'volume': 1234567,
-                'change_rate': 1.01,
-            }
+    def _request_schema_pages(self, schema, timeout=None, key=None, max_pages=50, **values):
+        """
+        스키마 TR 연속조회 (페이지 generator)
+        응답의 'next'가 True인 동안 prev_next=2로 다음 페이지를 요청하며,
+        마지막 페이지까지 같은 화면번호를 유지합니다. 호출측이 중간에 멈추면 거기서 종료합니다.
+        연속조회 상태는 화면번호에 묶여 있으므로 같은 키의 연속조회는 첫 페이지부터 마지막 페이지까지
+        통째로 직렬화합니다 (동시에 들어온 호출은 앞 호출이 끝난 뒤 처음부터 조회).
+        """
+        tr_code, rq_name = schema.tr_code, schema.rq_name
+        inputs, decoder = schema.input_values(**values), schema.decoder(self.ocx)
+        screen_key = (tr_code, key or rq_name)
+        with self._paging(screen_key, (timeout or self.tr.default_timeout) * max_pages):
+            screen_no = self.screens.lease('tr', screen_key)
+            try:
+                for n in range(max_pages):
+                    page = self._request_tr(
+                        tr_code, rq_name, inputs, decoder,
+                        timeout=timeout,
+                        prev_next=2 if n > 0 else 0,
+                        screen_key=screen_key,
+                    )
+                    yield page
+                    if not page['next']:
+                        return
+                logger.warning("%s 연속조회 최대 페이지 도달 (%d페이지)", tr_code, max_pages)
+            finally:
+                self.screens.release(screen_no)
+
+    @contextmanager
+    def _paging(self, screen_key, timeout):
+        """화면키별 연속조회 락 (timeout초 안에 차례가 오지 않으면 TrTimeoutError)"""
+        with self._paging_guard:
+            entry = self._paging_locks.setdefault(screen_key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            if not entry[0].acquire(timeout=timeout):
+                raise TrTimeoutError(f'연속조회 대기 시간 초과 ({timeout}초): {screen_key[0]}')
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            with self._paging_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._paging_locks[screen_key]
 
-        self.ocx.SetInputValue("종목코드", stock_code)
-        self.ocx.CommRqData("주식기본정보요청", "opt10001", 0, "0101")
+    # ===== 시세 =====
+
+    def get_stock_price(self, stock_code, timeout=None):
+        """
+        현재가 조회 (OnReceiveTrData 응답까지 대기)
+        캐시(TTL 내 조회/실시간 체결)에 있으면 TR 없이 응답하고, 같은 종목을 조회중이면 그 결과를 기다립니다.
+        """
+        scheduler = {}
 
-        # 동기 대기 (실제로는 이벤트 기반)
-        time.sleep(0.5)
+        def load(code):
+            quote, scheduler['info'] = self._load_stock_price(code, timeout)
+            return quote
 
-        current_price = abs(int(self.ocx.GetCommData("opt10001", "주식기본정보요청", 0, "현재가").strip()))
-        open_price = abs(int(self.ocx.GetCommData("opt10001", "주식기본정보요청", 0, "시가").strip()))
-        high_price = abs(int(self.ocx.GetCommData("opt10001", "주식기본정보요청", 0, "고가").strip()))
-        low_price = abs(int(self.ocx.GetCommData("opt10001", "주식기본정보요청", 0, "저가").strip()))
-        volume = abs(int(self.ocx.GetCommData("opt10001", "주식기본정보요청", 0, "거래량").strip()))
+        try:
+            quote, cache, age = self.quotes.fetch(stock_code, load, timeout=timeout)
+        except FutureTimeoutError:
+            return {'error': f'현재가 조회 대기 시간 초과 ({timeout}초)'}
+        except CancelledError:
+            return {'error': '현재가 조회 취소됨'}
+        if 'error' in quote:
+            return quote
+        return dict(quote, cache=cache, age_ms=round(age * 1000, 1), scheduler=scheduler.get('info'))
+
+    def _load_stock_price(self, stock_code, timeout=None):
+        """현재가 TR (opt10001) - (시세, 스케줄러 대기정보)"""
+        if self.simulation_mode:
+            return self.simulator.quote(stock_code), None
 
+        try:
+            result = self._request_schema(
+                TR_SCHEMAS['opt10001'], timeout=timeout, key=("opt10001", stock_code), stock_code=stock_code,
+            )
+        except (TrRequestError, ScreenPoolExhausted) as e:
+            logger.error("현재가 조회 실패 [%s]: %s", stock_code, e)
+            return {'error': str(e)}, None
+        return result['single'], result['scheduler']
+
+    def get_stock_prices(self, stock_codes, timeout=None):
+        """복수종목 현재가 조회 (캐시에 없는 종목만 CommKwRqData, 100종목 단위로 분할)"""
+        codes = list(dict.fromkeys(c for c in stock_codes if c))
+        cached, codes = self.quotes.split(codes)
+        if self.simulation_mode:
+            prices = self.simulator.quotes(codes)
+            for price in prices:
+                self.quotes.put(price['stock_code'], price)
+            return {'prices': list(cached.values()) + prices, 'tr_count': 0, 'cached': len(cached)}
+
+        schema = TR_SCHEMAS['OPTKWFID']
+        decode = schema.decoder(self.ocx)
+        jobs = []
+        for i in range(0, len(codes), KW_MAX_CODES):
+            chunk = codes[i:i + KW_MAX_CODES]
+            jobs.append(self._schedule_tr(
+                lambda screen_no, future, chunk=chunk: self.tr.submit_kw(
+                    self.ocx, chunk, schema.rq_name, screen_no, decode, future=future,
+                ),
+                key=("OPTKWFID", tuple(chunk)),
+            ))
+
+        prices = []
+        try:
+            for job in jobs:
+                prices.extend(schema.row_dicts(self._wait_tr(job, timeout)['rows']))
+        except (TrRequestError, ScreenPoolExhausted) as e:
+            logger.error("복수종목 현재가 조회 실패 (%d종목): %s", len(codes), e)
+            return {'error': str(e)}
+
+        for price in prices:
+            self.quotes.put(price['stock_code'], price)
         return {
-            'stock_code': stock_code,
-            'current_price': current_price,
-            'open_price': open_price,
-            'high_price': high_price,
-            'low_price': low_price,
-            'volume': volume,
+            'prices': list(cached.values()) + prices,
+            'tr_count': len(jobs),
+            'cached': len(cached),
+            'scheduler': jobs[-1].info(self.scheduler.queue_depth()) if jobs else None,
         }
 
     def get_stock_info(self, stock_code):
-        """종목 기본정보"""
+        """
+        종목 기본정보 (종목 마스터에서 조회)
+        마스터는 GetCodeListByMarket의 KOSPI/KOSDAQ 전 종목이므로, 마스터에 없는 종목(ETN, ELW, 코넥스 등)은
+        시장을 추정하지 않고 오류로 응답합니다.
+        """
+        if not self.master.loaded:
+            return {'error': '종목 마스터 미로드 (로그인 필요)'}
+        info = self.master.get(stock_code)
+        if not info:
+            return {'error': f'KOSPI/KOSDAQ 종목 마스터에 없는 종목: {stock_code}'}
+        return info
+
+    def get_stock_master(self, market=None):
+        """종목 마스터 전체 덤프"""
+        if not self.master.loaded:
+            return {'error': '종목 마스터 미로드 (로그인 필요)'}
+        stocks = self.master.dump(market)
+        return {'trading_day': self.master.trading_day, 'count': len(stocks), 'stocks': stocks}
+
+    def get_candles(self, stock_code, interval='day', start=None, end=None, timeout=None):
+        """
+        과거 캔들 조회 (일봉 opt10081 / 분봉 opt10080)
+        interval: 'day' 또는 분봉 틱범위(1, 3, 5 ...), start/end: 'YYYYMMDD' 또는 'YYYYMMDDHHMMSS'
+        로컬 캐시가 구간을 모두 가지고 있으면 TR 없이 응답하고, 아니면 최신 봉부터 연속조회로
+        start(또는 캐시된 구간)에 닿을 때까지 받아 캐시에 합칩니다. start가 없으면 한 페이지만 조회합니다.
+        """
+        if interval == 'day':
+            interval_key, tr_kind = 'day', 'day'
+        elif str(interval).isdigit() and int(interval) in MINUTE_INTERVALS:
+            interval_key, tr_kind = f'm{int(interval)}', 'minute'
+        else:
+            return {'error': f'지원하지 않는 분봉 주기: {interval}'}
+
+        response = {'stock_code': stock_code, 'interval': interval_key}
+        if start and end and self.candles.covers(stock_code, interval_key, start, end):
+            candles = self.candles.load(stock_code, interval_key, start, end)
+            return dict(response, candles=candles, tr_count=0, cached=True)
+
         if self.simulation_mode:
-            return {
-                'code': stock_code,
-                'name': f'시뮬종목_{stock_code}',
-                'market': 'KOSPI',
-            }
+            candles = self.simulator.candles(stock_code, interval_key, start, end)
+            return dict(response, candles=candles, tr_count=0, cached=False)
 
-        name = self.ocx.GetMasterCodeName(stock_code)
-        market_code = self.ocx.GetMasterStockState(stock_code)
-        market = 'KOSDAQ' if '코스닥' in market_code else 'KOSPI'
+        if tr_kind == 'day':
+            schema = TR_SCHEMAS['opt10081']
+            values = {'base_date': (end or datetime.now().strftime('%Y%m%d'))[:8]}
+        else:
+            # 분봉은 기준시각 입력이 없어 항상 최신 봉부터 조회
+            schema = TR_SCHEMAS['opt10080']
+            values = {'tick_range': str(int(interval))}
 
-        return {'code': stock_code, 'name': name, 'market': market}
+        covered = self.candles.coverage(stock_code, interval_key)
+        fetched, tr_count = [], 0
+        try:
+            for page in self._request_schema_pages(
+                schema, timeout=timeout, key=(schema.tr_code, stock_code, interval_key, values.get('base_date')),
+                max_pages=CANDLE_MAX_PAGES if start else 1, stock_code=stock_code, **values
+            ):
+                tr_count += 1
+                fetched.extend(page['rows'])   # 최신 봉부터 내림차순 (time, open, high, low, close, volume)
+                oldest = fetched[-1][0] if fetched else None
+                if not oldest or (start and oldest <= start) or (covered and oldest <= covered[1]):
+                    break
+        except (TrRequestError, ScreenPoolExhausted) as e:
+            logger.error("캔들 조회 실패 [%s %s]: %s", stock_code, interval_key, e)
+            return {'error': str(e)}
+
+        if fetched:
+            # 오늘 날짜의 가장 최근 봉은 아직 확정되지 않았으므로 캐시 구간에서 제외
+            final = fetched[1:] if fetched[0][0][:8] == datetime.now().strftime('%Y%m%d') else fetched
+            self.candles.save(
+                stock_code, interval_key, fetched,
+                fetched[-1][0], final[0][0] if final else None,
+            )
+
+        candles = self.candles.load(stock_code, interval_key, start or (fetched[-1][0] if fetched else None), end)
+        return dict(response, candles=candles, tr_count=tr_count, cached=False)
 
     # ===== 주문 =====
 
-    def send_order(self, order_type, stock_code, quantity, price, price_type, account_no):
-        """주문 전송"""
+    def send_order(self, order_type, stock_code, quantity, price, price_type, account_no, timeout=10):
+        """주문 전송 (스케줄러에서 조회보다 먼저 처리)"""
         if self.simulation_mode:
-            import random
-            order_no = str(random.randint(100000, 999999))
-            logger.info(
+            # 시뮬레이션: 호가잔량 소진 방식으로 지연 체결 (부분체결마다 콜백)
+            order_no = self.simulator.submit_order(
+                order_type, stock_code, quantity, price, is_market=price_type == '03',
+            )
+            logger.debug(
                 "시뮬레이션 주문: %s %s %d주 @ %d (주문번호: %s)",
                 '매수' if order_type == 1 else '매도',
                 stock_code, quantity, price, order_no
             )
-            # 시뮬레이션: 바로 체결 콜백 전송
-            threading.Timer(1.0, self._sim_fill_callback, args=(order_no, quantity, price, stock_code)).start()
             return {'order_no': order_no}
 
-        ret = self.ocx.SendOrder(
-            "주문",        # 사용자구분명
-            "0101",       # 화면번호
-            account_no,
-            order_type,   # 1:매수, 2:매도
-            stock_code,
-            quantity,
-            price,
-            price_type,   # 00:지정가, 03:시장가
-            ""            # 원주문번호
-        )
+        def dispatch(future):
+            screen_no = self.screens.lease('order')
+            try:
+                return self.ocx.SendOrder(
+                    "주문",        # 사용자구분명
+                    screen_no,    # 화면번호
+                    account_no,
+                    order_type,   # 1:매수, 2:매도
+                    stock_code,
+                    quantity,
+                    price,
+                    price_type,   # 00:지정가, 03:시장가
+                    ""            # 원주문번호
+                )
+            finally:
+                self.screens.release(screen_no)
 
+        started = time.monotonic()
+        job = self.scheduler.submit(dispatch, priority=PRIORITY_ORDER)
+        try:
+            ret = job.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.scheduler.abandon(job)
+            order_latency.observe(time.monotonic() - started, result='timeout')
+            return {'error': f'주문 대기 시간 초과 ({timeout}초)'}
+        except CancelledError:
+            order_latency.observe(time.monotonic() - started, result='error')
+            return {'error': '주문 취소됨'}
+        except ScreenPoolExhausted as e:
+            order_latency.observe(time.monotonic() - started, result='error')
+            return {'error': str(e)}
+
+        order_latency.observe(time.monotonic() - started, result='ok' if ret == 0 else 'error')
+        scheduler_info = job.info(self.scheduler.queue_depth())
         if ret == 0:
-            return {'message': '주문 접수 성공'}
-        return {'error': f'주문 실패 (코드: {ret})'}
+            return {'message': '주문 접수 성공', 'scheduler': scheduler_info}
+        return {'error': f'주문 실패 (코드: {ret})', 'scheduler': scheduler_info}
 
-    def _sim_fill_callback(self, order_no, quantity, price, stock_code):
-        """시뮬레이션 체결 콜백"""
-        import requests as req
+    def get_open_orders(self, account_no, stock_code='', timeout=None):
+        """미체결 조회 (opt10075, 연속조회로 끝까지)"""
+        if self.simulation_mode:
+            orders = self.simulator.open_orders()
+            if stock_code:
+                orders = [o for o in orders if o['stock_code'] == stock_code]
+            return {'orders': orders, 'count': len(orders), 'pages': 0}
+
+        schema = TR_SCHEMAS['opt10075']
+        orders, pages, page = [], 0, None
         try:
-            if price <= 0:
-                price = 50000
-            req.post(
-                f"{django_server_url}/api/callback/order-filled/",
-                json={
-                    'order_no': order_no,
-                    'filled_quantity': quantity,
-                    'filled_price': price,
-                },
-                timeout=5,
+            for page in self._request_schema_pages(
+                schema, timeout=timeout, key=("opt10075", account_no, stock_code),
+                max_pages=OPEN_ORDER_MAX_PAGES,
+                account_no=account_no, stock_code=stock_code, all_stocks='1' if stock_code else '0',
+            ):
+                pages += 1
+                orders.extend(schema.row_dicts(page['rows']))
+        except (TrRequestError, ScreenPoolExhausted) as e:
+            logger.error("미체결 조회 실패 (%d건 수신 후): %s", len(orders), e)
+            return {'error': str(e)}
+
+        return {'orders': orders, 'count': len(orders), 'pages': pages, 'scheduler': page['scheduler']}
+
+    def on_real_data(self, stock_code, real_type, get_fid):
+        """실시간 시세 - 체결 묶음 전달 대기열과 현재가 캐시에 반영"""
+        fields = {}
+        if self.journal:
+            get_fid = recording_getter(get_fid, fields)
+        tick = self.realtime.on_real_data(stock_code, real_type, get_fid)
+        if tick is not None:
+            self.quotes.update_from_tick(tick)
+            if self.journal:
+                self.journal.record('rt', stock_code, real_type, fields)
+
+    def on_chejan(self, gubun, get_fid):
+        """체잔 데이터 - 디코딩/병합 후 전달 (저널 기록 시 읽은 FID 원본도 기록)"""
+        fields = {}
+        if self.journal:
+            get_fid = recording_getter(get_fid, fields)
+        self.chejan.on_event(gubun, get_fid)
+        if self.journal:
+            self.journal.record('cj', str(gubun), fields)
+
+    def journal_record(self, kind, *args):
+        if self.journal:
+            self.journal.record(kind, *args)
+
+    @property
+    def replaying(self):
+        return self.replayer is not None and self.replayer.running
+
+    def start_replay(self, path, speed=1.0):
+        """
+        저널 재생 (시뮬레이션 모드 전용)
+        기록된 이벤트를 OCX 이벤트 핸들러와 같은 경로로 넣어 Django까지 평소처럼 전달합니다.
+        """
+        if not self.simulation_mode:
+            return {'error': '저널 재생은 시뮬레이션 모드에서만 가능합니다.'}
+        if self.replaying:
+            return {'error': '이미 재생중입니다.', 'replay': self.replayer.stats()}
+        if not os.path.exists(path):
+            return {'error': f'저널 파일 없음: {path}'}
+
+        events = KiwoomEventHandler()
+        events.api = self
+
+        def fid_getter(fields):
+            fields = {int(fid): value for fid, value in fields.items()}
+            return lambda fid: fields.get(fid, '')
+
+        self.replayer = JournalReplayer(path, {
+            'tc': lambda screen_no, codes, name, index: events.OnReceiveTrCondition(screen_no, codes, name, index, '0'),
+            'rc': events.OnReceiveRealCondition,
+            'cj': lambda gubun, fields: self.on_chejan(gubun, fid_getter(fields)),
+            'rt': lambda code, real_type, fields: self.on_real_data(code, real_type, fid_getter(fields)),
+        }, speed=speed).start()
+        return {'message': '저널 재생 시작', 'replay': self.replayer.stats()}
+
+    def _on_balance_event(self, event):
+        """잔고변경 - 보유종목 실시간 시세 구독 갱신 후 Django에 전달"""
+        try:
+            if event['quantity'] > 0:
+                self.realtime.subscribe([event['stock_code']], 'position')
+            else:
+                self.realtime.unsubscribe([event['stock_code']], 'position')
+        except ScreenPoolExhausted as e:
+            logger.error("보유종목 실시간 등록 실패 [%s]: %s", event['stock_code'], e)
+        dispatcher.send('/api/callback/balance/', {
+            key: event[key] for key in (
+                'stock_code', 'stock_name', 'quantity', 'tradable_quantity',
+                'avg_price', 'current_price', 'profit_rate',
             )
-        except Exception as e:
-            logger.error("시뮬레이션 체결 콜백 실패: %s", e)
+        })
 
     # ===== 잔고 =====
 
-    def get_balance(self, account_no):
-        """잔고 조회"""
+    def get_balance(self, account_no, timeout=None):
+        """
+        잔고 조회 (opw00018)
+        보유종목이 한 페이지(20건)를 넘으면 연속조회(prev_next=2)로 끝까지 받아 합쳐서 반환합니다.
+        timeout은 페이지당 응답 대기시간입니다.
+        """
+        schema = TR_SCHEMAS['opw00018']
         if self.simulation_mode:
-            return {'items': []}
+            return {'items': [], 'totals': dict.fromkeys(schema.single_keys, 0), 'count': 0, 'pages': 0}
+
+        items, totals, pages, page = [], None, 0, None
+        try:
+            for page in self._request_schema_pages(
+                schema, timeout=timeout, key=("opw00018", account_no), max_pages=BALANCE_MAX_PAGES,
+                account_no=account_no,
+            ):
+                pages += 1
+                items.extend(schema.row_dicts(page['rows']))
+                totals = totals or page['single']
+        except (TrRequestError, ScreenPoolExhausted) as e:
+            logger.error("잔고 조회 실패 (%d건 수신 후): %s", len(items), e)
+            return {'error': str(e)}
+
+        return {
+            'items': items,
+            'totals': totals,
+            'count': len(items),
+            'pages': pages,
+            'scheduler': page['scheduler'],
+        }
 
-        self.ocx.SetInputValue("계좌번호", account_no)
-        self.ocx.SetInputValue("비밀번호", "")
-        self.ocx.SetInputValue("비밀번호입력매체구분", "00")
-        self.ocx.SetInputValue("조회구분", "1")
-        self.ocx.CommRqData("계좌평가잔고내역요청", "opw00018", 0, "0102")
 
-        time.sleep(0.5)
-        # 실제 구현에서는 OnReceiveTrData 이벤트에서 데이터 수집
-        return {'items': []}
+def _counted(handler):
+    """OCX 이벤트 수신 건수 집계"""
+    @functools.wraps(handler)
+    def wrapper(self, *args):
+        com_events.inc(event=handler.__name__)
+        return handler(self, *args)
+    return wrapper
 
 
 class KiwoomEventHandler:
     """키움 OpenAPI 이벤트 핸들러"""
     api = None
 
+    @_counted
+    def OnEventConnect(self, err_code):
+        """로그인 결과 - 성공 시 종목 마스터 로드"""
+        if err_code != 0:
+            logger.error("로그인 실패 (코드: %s)", err_code)
+            self.api.connected = False
+            return
+        logger.info("로그인 완료")
+        self.api.load_master()
+
+    @_counted
     def OnReceiveConditionVer(self, ret, msg):
         """조건검색식 로드 완료"""
         logger.info("조건검색식 로드: ret=%d, msg=%s", ret, msg)
 
+    @_counted
+    def OnReceiveTrData(self, screen_no, rq_name, tr_code, record_name, prev_next,
+                        data_len=None, error_code=None, message=None, splm_msg=None):
+        """TR 조회 응답 수신"""
+        self.api.journal_record('tr', screen_no, rq_name, tr_code, str(prev_next))
+        self.api.tr.on_receive(screen_no, rq_name, tr_code, prev_next)
+
+    @_counted
     def OnReceiveTrCondition(self, screen_no, code_list, condition_name, condition_index, next_flag):
-        """조건검색 결과 수신"""
-        import requests as req
-        codes = [c for c in code_list.split(';') if c]
-        logger.info("조건검색 결과 [%s]: %d종목", condition_name, len(codes))
+        """조건검색 결과 수신 (연속조회 페이지는 병합 후 한번에 전달)"""
+        condition_index = int(condition_index)
+        key = (screen_no, condition_index)
+        codes = self.api._condition_pages.pop(key, [])
+        codes.extend(c for c in code_list.split(';') if c)
+
+        if str(next_flag) == '2':
+            # 연속조회: 다음 페이지 요청 후 누적
+            self.api._condition_pages[key] = codes
+            self.api.ocx.SendCondition(screen_no, condition_name, condition_index, 2)
+            return
 
-        # Django 서버에 편입 알림
-        for code in codes:
+        self.api.journal_record('tc', screen_no, ';'.join(codes), condition_name, condition_index)
+        logger.info("조건검색 결과 [%s]: %d종목", condition_name, len(codes))
+        started = self.api._condition_started.pop(key, None)
+        if started is not None:
+            condition_latency.observe(time.monotonic() - started, result='ok')
+        if condition_index in self.api._oneshot_conditions:
+            self.api._oneshot_conditions.discard(condition_index)
+            self.api.screens.release(screen_no)
+        else:
+            # 실시간 조건검색 편입 종목은 실시간 시세 구독 (실패해도 편입 결과는 전달)
             try:
-                req.post(
-                    f"{django_server_url}/api/callback/condition-match/",
-                    json={
-                        'condition_id': condition_index,
-                        'stock_code': code,
-                        'match_type': 'I',
-                    },
-                    timeout=5,
-                )
-            except Exception as e:
-                logger.error("조건검색 콜백 실패: %s", e)
-
+                self.api.realtime.set_owner_codes(f'condition:{condition_index}', codes)
+            except ScreenPoolExhausted as e:
+                logger.error("조건검색 편입 종목 실시간 등록 실패 [%s]: %s", condition_name, e)
+
+        # Django 서버에 편입 종목 일괄 알림
+        dispatcher.send('/api/callback/condition-match/bulk/', {
+            'condition_index': condition_index,
+            'condition_name': condition_name,
+            'stock_codes': codes,
+            'match_type': 'I',
+            'job_id': self.api._condition_jobs.pop(condition_index, None),
+        })
+
+    @_counted
     def OnReceiveRealCondition(self, stock_code, event_type, condition_name, condition_index):
         """실시간 조건검색 편입/이탈"""
-        import requests as req
+        self.api.journal_record('rc', stock_code, event_type, condition_name, condition_index)
         match_type = 'I' if event_type == 'I' else 'D'
         logger.info(
             "실시간 조건검색 %s: [%s] %s",
@@ -307,40 +897,35 @@ class KiwoomEventHandler:
             condition_name, stock_code
         )
 
+        owner = f'condition:{int(condition_index)}'
         try:
-            req.post(
-                f"{django_server_url}/api/callback/condition-match/",
-                json={
-                    'condition_id': int(condition_index),
-                    'stock_code': stock_code,
-                    'match_type': match_type,
-                },
-                timeout=5,
-            )
-        except Exception as e:
-            logger.error("실시간 조건검색 콜백 실패: %s", e)
+            if match_type == 'I':
+                self.api.realtime.subscribe([stock_code], owner)
+            else:
+                self.api.realtime.unsubscribe([stock_code], owner)
+        except ScreenPoolExhausted as e:
+            # 실시간 시세 등록에 실패해도 편입/이탈 이벤트는 전달
+            logger.error("조건검색 편입 종목 실시간 등록 실패 [%s] %s: %s", condition_name, stock_code, e)
+
+        dispatcher.send('/api/callback/condition-match/', {
+            'condition_index': int(condition_index),
+            'condition_name': condition_name,
+            'stock_code': stock_code,
+            'match_type': match_type,
+        })
 
+    @_counted
     def OnReceiveChejanData(self, gubun, item_cnt, fid_list):
-        """체결/잔고 변경"""
-        import requests as req
-        if gubun == '0':  # 주문체결
-            order_no = self.api.ocx.GetChejanData(9203).strip()
-            filled_qty = abs(int(self.api.ocx.GetChejanData(911).strip() or '0'))
-            filled_price = abs(int(self.api.ocx.GetChejanData(910).strip() or '0'))
-
-            if filled_qty > 0 and filled_price > 0:
-                try:
-                    req.post(
-                        f"{django_server_url}/api/callback/order-filled/",
-                        json={
-                            'order_no': order_no,
-                            'filled_quantity': filled_qty,
-                            'filled_price': filled_price,
-                        },
-                        timeout=5,
-                    )
-                except Exception as e:
-                    logger.error("체결 콜백 실패: %s", e)
+        """주문접수/체결('0') / 잔고변경('1') - 디코딩 후 병합은 체잔 처리기에서"""
+        self.api.on_chejan(gubun, self.api.ocx.GetChejanData)
+
+    @_counted
+    def OnReceiveRealData(self, stock_code, real_type, real_data):
+        """실시간 시세 수신"""
+        self.api.on_real_data(
+            stock_code, real_type,
+            lambda fid: self.api.ocx.GetCommRealData(stock_code, fid),
+        )
 
 
 # ===== Flask API 엔드포인트 =====
@@ -366,10 +951,10 @@ def condition_list():
 def condition_search():
     data = request.get_json()
     result = kiwoom.send_condition(
-        screen_no=data['screen_no'],
         condition_name=data['condition_name'],
         condition_index=data['condition_index'],
         is_realtime=data.get('is_realtime', True),
+        job_id=data.get('job_id'),
     )
     return jsonify(result)
 
@@ -378,7 +963,6 @@ def condition_search():
 def condition_stop():
     data = request.get_json()
     result = kiwoom.stop_condition(
-        screen_no=data['screen_no'],
         condition_name=data['condition_name'],
         condition_index=data['condition_index'],
     )
@@ -388,7 +972,20 @@ def condition_stop():
 @app.route('/api/stock/price', methods=['GET'])
 def stock_price():
     code = request.args.get('code')
-    return jsonify(kiwoom.get_stock_price(code))
+    timeout = request.args.get('timeout', type=float)
+    return jsonify(kiwoom.get_stock_price(code, timeout=timeout))
+
+
+@app.route('/api/stock/prices', methods=['GET', 'POST'])
+def stock_prices():
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        codes = data.get('codes', [])
+        timeout = data.get('timeout')
+    else:
+        codes = request.args.get('codes', '').split(',')
+        timeout = request.args.get('timeout', type=float)
+    return jsonify(kiwoom.get_stock_prices(codes, timeout=timeout))
 
 
 @app.route('/api/stock/info', methods=['GET'])
@@ -397,6 +994,50 @@ def stock_info():
     return jsonify(kiwoom.get_stock_info(code))
 
 
+@app.route('/api/stock/candles', methods=['GET'])
+def stock_candles():
+    """과거 캔들 (interval=day|1|3|5..., start/end=YYYYMMDD[HHMMSS])"""
+    return jsonify(kiwoom.get_candles(
+        request.args.get('code'),
+        interval=request.args.get('interval', 'day'),
+        start=request.args.get('start'),
+        end=request.args.get('end'),
+        timeout=request.args.get('timeout', type=float),
+    ))
+
+
+@app.route('/api/stock/master', methods=['GET'])
+def stock_master():
+    """종목 마스터 일괄 조회 (market=KOSPI|KOSDAQ 선택)"""
+    return jsonify(kiwoom.get_stock_master(request.args.get('market')))
+
+
+@app.route('/api/realtime/subscribe', methods=['POST'])
+def realtime_subscribe():
+    data = request.get_json()
+    owner = data.get('owner', 'api')
+    try:
+        if data.get('replace'):
+            added, removed = kiwoom.realtime.set_owner_codes(owner, data.get('codes', []))
+        else:
+            added, removed = kiwoom.realtime.subscribe(data.get('codes', []), owner), []
+    except ScreenPoolExhausted as e:
+        return jsonify({'error': str(e)})
+    return jsonify({'added': added, 'removed': removed})
+
+
+@app.route('/api/realtime/unsubscribe', methods=['POST'])
+def realtime_unsubscribe():
+    data = request.get_json()
+    removed = kiwoom.realtime.unsubscribe(data.get('codes', []), data.get('owner', 'api'))
+    return jsonify({'removed': removed})
+
+
+@app.route('/api/realtime/subscriptions', methods=['GET'])
+def realtime_subscriptions():
+    return jsonify(kiwoom.realtime.subscriptions())
+
+
 @app.route('/api/order', methods=['POST'])
 def order():
     data = request.get_json()
@@ -419,12 +1060,52 @@ def order_cancel():
 @app.route('/api/balance', methods=['GET'])
 def balance():
     account_no = request.args.get('account_no', '')
-    return jsonify(kiwoom.get_balance(account_no))
+    timeout = request.args.get('timeout', type=float)
+    return jsonify(kiwoom.get_balance(account_no, timeout=timeout))
 
 
 @app.route('/api/orders', methods=['GET'])
 def orders():
-    return jsonify({'orders': []})
+    account_no = request.args.get('account_no', '')
+    stock_code = request.args.get('stock_code', '')
+    timeout = request.args.get('timeout', type=float)
+    return jsonify(kiwoom.get_open_orders(account_no, stock_code, timeout=timeout))
+
+
+@app.route('/api/stream/events', methods=['GET'])
+def stream_events():
+    """Django 컨슈머용 이벤트 스트림 (NDJSON, 장기 연결)"""
+    after = request.args.get('after', 0, type=int)
+    return Response(
+        stream_with_context(event_stream.iter_events(after)),
+        mimetype='application/x-ndjson',
+    )
+
+
+@app.route('/api/journal/replay', methods=['GET', 'POST'])
+def journal_replay():
+    """이벤트 저널 재생 시작 (POST {path, speed}) / 재생 상태 조회 (GET)"""
+    if request.method == 'GET':
+        return jsonify({'replay': kiwoom.replayer.stats() if kiwoom.replayer else None})
+    data = request.get_json() or {}
+    if not data.get('path'):
+        return jsonify({'error': 'path 필수'})
+    return jsonify(kiwoom.start_replay(data['path'], float(data.get('speed', 1.0))))
+
+
+@app.route('/api/stream/ack', methods=['POST'])
+def stream_ack():
+    """컨슈머 처리 완료 확인 (seq 이하 전체)"""
+    data = request.get_json()
+    acked = event_stream.ack(int(data['seq']))
+    dispatcher.acknowledge(acked)
+    return jsonify({'acked': len(acked), 'pending': event_stream.pending_count()})
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus 스크레이프 엔드포인트"""
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
 
 
 @app.route('/api/health', methods=['GET'])
@@ -433,6 +1114,16 @@ def health():
         'status': 'running',
         'connected': kiwoom.connected if kiwoom else False,
         'simulation_mode': getattr(kiwoom, 'simulation_mode', True),
+        'scheduler': kiwoom.scheduler.stats() if kiwoom else None,
+        'screens': kiwoom.screens.stats() if kiwoom else None,
+        'com': {'queue': kiwoom.com.qsize(), 'calls': kiwoom.com.calls} if kiwoom and kiwoom.com else None,
+        'candles': kiwoom.candles.stats() if kiwoom else None,
+        'chejan': kiwoom.chejan.stats() if kiwoom else None,
+        'quotes': kiwoom.quotes.stats() if kiwoom else None,
+        'journal': kiwoom.journal.stats() if kiwoom and kiwoom.journal else None,
+        'replay': kiwoom.replayer.stats() if kiwoom and kiwoom.replayer else None,
+        'simulator': kiwoom.simulator.stats() if kiwoom and kiwoom.simulator else None,
+        'master': {'trading_day': kiwoom.master.trading_day, 'count': len(kiwoom.master)} if kiwoom else None,
     })
 
 
@@ -441,13 +1132,60 @@ if __name__ == '__main__':
     parser.add_argument('--host', default='0.0.0.0', help='바인드 호스트')
     parser.add_argument('--port', type=int, default=5000, help='바인드 포트')
     parser.add_argument('--server-url', default='http://localhost:8000', help='Django 서버 URL')
+    parser.add_argument('--spool-path', default='callback_spool.jsonl', help='미전송 콜백 스풀 파일')
+    parser.add_argument('--threads', type=int, default=16, help='HTTP 작업 스레드 수')
+    parser.add_argument('--dev-server', action='store_true', help='Flask 개발 서버로 실행')
+    parser.add_argument('--tick-flush-ms', type=int, default=200, help='실시간 체결 전달 주기 (ms)')
+    parser.add_argument('--master-cache-dir', default='master_cache', help='종목 마스터 캐시 디렉토리')
+    parser.add_argument('--candle-db', default='candles.sqlite3', help='과거 캔들 캐시 파일')
+    parser.add_argument('--journal', default=None, help='OCX 이벤트 저널 기록 파일 (.gz면 압축)')
+    parser.add_argument('--replay', default=None, help='시작 시 재생할 이벤트 저널 파일 (시뮬레이션 모드)')
+    parser.add_argument('--replay-speed', type=float, default=1.0, help='저널 재생 배속 (0이면 대기 없이)')
+    parser.add_argument('--quote-ttl-ms', type=int, default=1000, help='현재가 캐시 유효시간 (ms)')
+    parser.add_argument('--chejan-window-ms', type=float, default=5, help='같은 주문 체결 병합 시간 (ms)')
+    parser.add_argument('--sim-symbols', type=int, default=200, help='시뮬레이션 종목 마스터/조건검색 종목 수')
+    parser.add_argument('--sim-volatility', type=float, default=0.002, help='시뮬레이션 시세 변동성 (스텝당)')
+    parser.add_argument('--sim-fill-latency-ms', type=int, default=50, help='시뮬레이션 체결 지연 (ms)')
+    parser.add_argument('--sim-condition-rate', type=float, default=1.0, help='시뮬레이션 조건검색 편입/이탈 (초당 건수)')
+    parser.add_argument('--sim-seed', type=int, default=None, help='시뮬레이션 난수 시드')
     args = parser.parse_args()
 
     django_server_url = args.server_url
-    kiwoom = KiwoomAPI()
+    event_stream = EventStream()
+    dispatcher = CallbackDispatcher(django_server_url, spool_path=args.spool_path, stream=event_stream)
+    dispatcher.start()
+    kiwoom = KiwoomAPI(
+        tick_flush_interval=args.tick_flush_ms / 1000,
+        master_cache_dir=args.master_cache_dir,
+        candle_db=args.candle_db,
+        chejan_window=args.chejan_window_ms / 1000,
+        quote_ttl=args.quote_ttl_ms / 1000,
+        journal_path=args.journal,
+        sim_options={
+            'symbols': args.sim_symbols,
+            'volatility': args.sim_volatility,
+            'fill_latency': args.sim_fill_latency_ms / 1000,
+            'fill_jitter': args.sim_fill_latency_ms / 1000,
+            'condition_rate': args.sim_condition_rate,
+            'seed': args.sim_seed,
+        },
+    )
 
     logger.info("키움 브릿지 에이전트 시작")
     logger.info("Django 서버: %s", django_server_url)
     logger.info("시뮬레이션 모드: %s", getattr(kiwoom, 'simulation_mode', True))
+    if args.replay:
+        logger.info("이벤트 저널 재생: %s", kiwoom.start_replay(args.replay, args.replay_speed))
+
+    serve = None
+    if not args.dev_server:
+        try:
+            from waitress import serve
+        except ImportError:
+            logger.warning("waitress를 찾을 수 없습니다. Flask 개발 서버로 실행합니다.")
 
-    app.run(host=args.host, port=args.port, debug=False)
+    if serve:
+        # 이벤트 스트림 장기 연결이 작업 스레드 하나를 계속 점유
+        serve(app, host=args.host, port=args.port, threads=args.threads, ident='kiwoom-bridge')
+    else:
+        app.run(host=args.host, port=args.port, debug=False, threaded=True)
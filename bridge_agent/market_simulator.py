@@ -0,0 +1,479 @@
+"""
+시뮬레이션 모드 시장 엔진
+Windows/키움 없이 부하·지연 테스트를 할 수 있도록 종목별 랜덤워크 시세, 호가잔량을 소진하는
+체결(부분체결/슬리피지), 체결 지연, 실시간 조건검색 편입/이탈 이벤트를 만들어 냅니다.
+이벤트는 실제 OCX 이벤트와 같은 경로로 흘려보낼 수 있도록 콜백으로 전달합니다.
+"""
+import math
+import time
+import random
+import logging
+import itertools
+import threading
+from datetime import datetime, timedelta
+
+from master_table import tick_size, price_limits, simulation_stocks
+from realtime import TICK_FIDS
+from chejan import ORDER_FIDS, BALANCE_FIDS
+from timer_queue import TimerQueue
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolState:
+    """종목별 시세 상태"""
+
+    def __init__(self, code, base_price):
+        self.code = code
+        self.prev_close = base_price
+        self.price = base_price
+        self.open_price = base_price
+        self.high_price = base_price
+        self.low_price = base_price
+        self.volume = 0
+        self.last_volume = 0
+        self.upper_limit, self.lower_limit = price_limits(base_price)
+
+    def move_to(self, price, volume=0):
+        price = max(self.lower_limit, min(self.upper_limit, price))
+        self.price = price
+        self.high_price = max(self.high_price, price)
+        self.low_price = min(self.low_price, price)
+        self.last_volume = volume
+        self.volume += volume
+
+    def quote(self):
+        change = self.price - self.prev_close
+        return {
+            'stock_code': self.code,
+            'current_price': self.price,
+            'open_price': self.open_price,
+            'high_price': self.high_price,
+            'low_price': self.low_price,
+            'volume': self.volume,
+            'change_rate': round(change / self.prev_close * 100, 2) if self.prev_close else 0.0,
+        }
+
+    def real_fields(self):
+        """주식체결 실시간 FID 값 (OCX GetCommRealData 형식의 문자열)"""
+        change = self.price - self.prev_close
+        sign = '+' if change >= 0 else '-'
+        values = {
+            'traded_at': datetime.now().strftime('%H%M%S'),
+            'current_price': f'{sign}{self.price}',
+            'change': str(change),
+            'change_rate': f'{change / self.prev_close * 100:.2f}' if self.prev_close else '0',
+            'trade_volume': str(self.last_volume),
+            'volume': str(self.volume),
+            'open_price': str(self.open_price),
+            'high_price': str(self.high_price),
+            'low_price': str(self.low_price),
+        }
+        return {TICK_FIDS[name]: value for name, value in values.items()}
+
+
+class SimOrder:
+    """미체결 시뮬레이션 주문"""
+
+    def __init__(self, order_no, side, stock_code, quantity, price, is_market):
+        self.order_no = order_no
+        self.side = side            # 1:매수, 2:매도
+        self.stock_code = stock_code
+        self.quantity = quantity
+        self.remaining = quantity
+        self.price = price
+        self.is_market = is_market
+
+
+class MarketSimulator:
+    """
+    시뮬레이션 시장
+    콜백:
+        on_tick(stock_code, get_fid)                         - 실시간 등록 종목 체결
+        on_chejan(gubun, get_fid)                             - 주문접수/체결('0'), 잔고변경('1') FID 데이터
+        on_condition_result(screen_no, codes, name, index)    - 조건검색 초기 결과
+        on_condition_event(stock_code, event_type, name, index) - 실시간 편입(I)/이탈(D)
+    universe: 조건검색 편입 후보 종목코드 (기본: 시뮬레이션 종목 마스터 200종목)
+    """
+
+    def __init__(self, on_tick=None, on_chejan=None, on_condition_result=None, on_condition_event=None,
+                 reference_price=None, universe=None, volatility=0.002, step_interval=0.1,
+                 book_depth=5, level_quantity=300, fill_latency=0.05, fill_jitter=0.05,
+                 condition_rate=1.0, condition_size=20, seed=None):
+        self.on_tick = on_tick
+        self.on_chejan = on_chejan
+        self.on_condition_result = on_condition_result
+        self.on_condition_event = on_condition_event
+        self.reference_price = reference_price
+        self.volatility = volatility
+        self.step_interval = step_interval
+        self.book_depth = book_depth
+        self.level_quantity = level_quantity
+        self.fill_latency = fill_latency
+        self.fill_jitter = fill_jitter
+        self.condition_rate = condition_rate
+        self.condition_size = condition_size
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._symbols = {}
+        # 조건검색 편입 후보 (종목 마스터에 있는 종목코드)
+        self._universe = list(universe) if universe is not None else [s['code'] for s in simulation_stocks(200)]
+        self._real_screens = {}     # 화면번호 -> 실시간 등록 종목 집합
+        self._resting = {}          # 주문번호 -> 미체결 지정가 주문
+        self._positions = {}        # 종목코드 -> [보유수량, 매입단가]
+        self._conditions = {}       # 조건식 인덱스 -> (화면번호, 조건명, 편입종목 집합)
+        self._order_seq = itertools.count(100001)
+        self._next_condition_at = None
+
+        self.orders = 0
+        self.fills = 0
+        self.condition_events = 0
+
+        # 체결 지연은 주문별 타이머 스레드 대신 단일 스레드 힙으로 처리
+        self._fill_queue = TimerQueue(self._execute, name='sim-fills')
+        self._thread = threading.Thread(target=self._run, name='market-sim', daemon=True)
+        self._thread.start()
+
+    # ===== 시세 =====
+
+    def _symbol(self, stock_code):
+        """종목 상태 (처음 조회 시 기준가로 생성) - self._lock 안에서 호출"""
+        state = self._symbols.get(stock_code)
+        if state is None:
+            base_price = self.reference_price(stock_code) if self.reference_price else None
+            if not base_price:
+                base_price = self._round(self._random.uniform(2000, 200000))
+            state = self._symbols[stock_code] = SymbolState(stock_code, base_price)
+        return state
+
+    @staticmethod
+    def _round(price):
+        tick = tick_size(price)
+        return max(tick, int(round(price / tick)) * tick)
+
+    def quote(self, stock_code):
+        with self._lock:
+            return self._symbol(stock_code).quote()
+
+    def quotes(self, stock_codes):
+        with self._lock:
+            return [self._symbol(code).quote() for code in stock_codes]
+
+    def order_book(self, stock_code):
+        """현재가 기준 호가 (매도호가는 현재가 위, 매수호가는 현재가부터)"""
+        with self._lock:
+            return self._book(self._symbol(stock_code))
+
+    def _book(self, state):
+        asks, bids = [], []
+        ask = bid = state.price
+        for _ in range(self.book_depth):
+            ask += tick_size(ask)
+            asks.append([ask, self._level_quantity()])
+            bids.append([bid, self._level_quantity()])
+            bid -= tick_size(bid - 1)
+        return {'asks': asks, 'bids': bids}
+
+    def _level_quantity(self):
+        return max(1, int(self._random.lognormvariate(math.log(self.level_quantity), 0.5)))
+
+    def candles(self, stock_code, interval, start=None, end=None, limit=900):
+        """
+        과거 캔들 생성 (현재가에서 거꾸로 랜덤워크, 시간 오름차순)
+        interval: 'day' 또는 'm{분}', 시각은 키움 TR과 같은 문자열 형식
+        """
+        with self._lock:
+            close = self._symbol(stock_code).price
+        rnd = random.Random(f'{stock_code}:{interval}')
+        candles = []
+        for time_str in self._candle_times(interval, start, end, limit):
+            open_price = self._round(close * (1 + rnd.gauss(0, self.volatility * 3)))
+            spread = tick_size(close) * rnd.randint(0, 5)
+            candles.append({
+                'time': time_str,
+                'open': open_price,
+                'high': max(open_price, close) + spread,
+                'low': max(1, min(open_price, close) - spread),
+                'close': close,
+                'volume': rnd.randint(1, 100) * self.level_quantity,
+            })
+            close = open_price
+        return candles[::-1]
+
+    @staticmethod
+    def _candle_times(interval, start, end, limit):
+        """end부터 거꾸로 장중 시각 (주말 제외, 분봉은 09:00~15:30)"""
+        if interval == 'day':
+            current = datetime.strptime(end[:8], '%Y%m%d') if end else datetime.now()
+            step, fmt = timedelta(days=1), '%Y%m%d'
+        else:
+            minutes = int(interval[1:])
+            current = datetime.strptime(end, '%Y%m%d%H%M%S') if end else datetime.now()
+            current = current.replace(minute=current.minute - current.minute % minutes, second=0, microsecond=0)
+            step, fmt = timedelta(minutes=minutes), '%Y%m%d%H%M%S'
+
+        count = 0
+        while count < limit:
+            time_str = current.strftime(fmt)
+            if start and time_str < start:
+                return
+            in_session = interval == 'day' or (9, 0) <= (current.hour, current.minute) <= (15, 30)
+            if current.weekday() < 5 and in_session:
+                yield time_str
+                count += 1
+            current -= step
+
+    # ===== 실시간 등록 =====
+
+    def register(self, screen_no, codes, opt_type='0'):
+        """SetRealReg 대응 - opt_type "0"은 화면 등록 교체, "1"은 추가"""
+        codes = {c for c in codes if c}
+        with self._lock:
+            if opt_type == '0':
+                self._real_screens[screen_no] = codes
+            else:
+                self._real_screens.setdefault(screen_no, set()).update(codes)
+            for code in codes:
+                self._symbol(code)
+
+    def remove(self, screen_no, code):
+        """SetRealRemove 대응"""
+        with self._lock:
+            codes = self._real_screens.get(screen_no)
+            if codes is not None:
+                codes.discard(code)
+                if not codes:
+                    del self._real_screens[screen_no]
+
+    # ===== 주문 =====
+
+    def submit_order(self, side, stock_code, quantity, price=0, is_market=True):
+        """주문 접수 - 주문번호 반환 (체결은 지연 후 콜백)"""
+        order = SimOrder(str(next(self._order_seq)), side, stock_code, quantity, price, is_market)
+        with self._lock:
+            delay = max(0.0, self._random.gauss(self.fill_latency, self.fill_jitter))
+            self.orders += 1
+        self._fill_queue.schedule(delay, order)
+        return order.order_no
+
+    def open_orders(self):
+        """미체결 지정가 주문 (opt10075 응답 형식)"""
+        with self._lock:
+            resting = list(self._resting.values())
+        return [
+            {
+                'order_no': order.order_no,
+                'stock_code': order.stock_code,
+                'order_type': '매수' if order.side == 1 else '매도',
+                'quantity': order.quantity,
+                'price': order.price,
+                'unfilled_quantity': order.remaining,
+                'filled_quantity': order.quantity - order.remaining,
+            }
+            for order in resting
+        ]
+
+    def _execute(self, orders):
+        """만기된 주문을 묶어서 체결 - 호가잔량을 소진하고 지정가 잔량은 미체결로 대기"""
+        events = []
+        with self._lock:
+            for order in orders:
+                events.append(('0', self._order_fields(order, '접수')))
+                events.extend(self._fill_events(order, self._match(order)))
+                if order.remaining > 0 and not order.is_market:
+                    self._resting[order.order_no] = order
+        self._emit_chejan(events)
+
+    def _match(self, order):
+        """self._lock 안에서 호출 - [(수량, 가격)]"""
+        state = self._symbol(order.stock_code)
+        book = self._book(state)
+        levels = book['asks'] if order.side == 1 else book['bids']
+        fills = []
+        for level_price, level_qty in levels:
+            if order.remaining <= 0:
+                break
+            if not order.is_market:
+                if order.side == 1 and level_price > order.price:
+                    break
+                if order.side == 2 and level_price < order.price:
+                    break
+            qty = min(order.remaining, level_qty)
+            fills.append((qty, level_price))
+            order.remaining -= qty
+
+        if order.is_market and order.remaining > 0 and fills:
+            # 호가 소진 시 마지막 호가에 잔량 체결
+            fills.append((order.remaining, fills[-1][1]))
+            order.remaining = 0
+
+        if fills:
+            # 체결 가격으로 시세 이동 (시장 충격)
+            state.move_to(fills[-1][1], sum(qty for qty, _ in fills))
+        self.fills += len(fills)
+        return fills
+
+    def _order_fields(self, order, status, qty=0, price=0):
+        """주문접수/체결 체잔 FID 데이터 (실제 이벤트처럼 문자열)"""
+        values = {
+            'order_no': order.order_no,
+            'stock_code': 'A' + order.stock_code,
+            'order_status': status,
+            'order_kind': '+매수' if order.side == 1 else '-매도',
+            'side': '2' if order.side == 1 else '1',
+            'order_quantity': order.quantity,
+            'order_price': order.price,
+            'unfilled_quantity': order.remaining,
+            'time': datetime.now().strftime('%H%M%S'),
+            'filled_price': price,
+            'cumulative_quantity': order.quantity - order.remaining,
+            'unit_price': price,
+            'unit_quantity': qty,
+        }
+        return {ORDER_FIDS[key][0]: str(value) for key, value in values.items()}
+
+    def _fill_events(self, order, fills):
+        """self._lock 안에서 호출 - 체결마다 주문체결 이벤트, 마지막에 잔고변경 이벤트"""
+        if not fills:
+            return []
+        events = []
+        remaining = order.remaining
+        order.remaining += sum(qty for qty, _ in fills)
+        position = self._positions.setdefault(order.stock_code, [0, 0])
+        for qty, price in fills:
+            order.remaining -= qty
+            events.append(('0', self._order_fields(order, '체결', qty, price)))
+            if order.side == 1:
+                position[1] = (position[0] * position[1] + qty * price) // (position[0] + qty)
+                position[0] += qty
+            else:
+                position[0] = max(0, position[0] - qty)
+        order.remaining = remaining
+
+        price = fills[-1][1]
+        values = {
+            'stock_code': 'A' + order.stock_code,
+            'current_price': price,
+            'quantity': position[0],
+            'avg_price': position[1],
+            'purchase_amount': position[0] * position[1],
+            'tradable_quantity': position[0],
+            'side': '2' if order.side == 1 else '1',
+            'profit_rate': round((price - position[1]) / position[1] * 100, 2) if position[1] else 0,
+        }
+        if not position[0]:
+            del self._positions[order.stock_code]
+        events.append(('1', {BALANCE_FIDS[key][0]: str(value) for key, value in values.items()}))
+        return events
+
+    def _emit_chejan(self, events):
+        if not self.on_chejan:
+            return
+        for gubun, fields in events:
+            try:
+                self.on_chejan(gubun, lambda fid, fields=fields: fields.get(fid, ''))
+            except Exception as e:
+                logger.error("시뮬레이션 체잔 전달 실패: %s", e)
+
+    # ===== 조건검색 =====
+
+    def send_condition(self, screen_no, condition_name, condition_index, search_type):
+        """SendCondition 대응 - 초기 결과는 별도 스레드에서 전달 (실제 이벤트처럼 비동기)"""
+        with self._lock:
+            codes = set(self._random.sample(self._universe, min(self.condition_size, len(self._universe))))
+            if search_type == 1:
+                self._conditions[condition_index] = (screen_no, condition_name, codes)
+        if self.on_condition_result:
+            threading.Thread(
+                target=self.on_condition_result,
+                args=(screen_no, sorted(codes), condition_name, condition_index),
+                daemon=True,
+            ).start()
+        return 1
+
+    def stop_condition(self, condition_index):
+        with self._lock:
+            self._conditions.pop(condition_index, None)
+
+    def _condition_events(self, now):
+        """초당 condition_rate건 (포아송)으로 편입/이탈 이벤트 생성 - self._lock 안에서 호출"""
+        if not self._conditions or self.condition_rate <= 0:
+            self._next_condition_at = None
+            return []
+        if self._next_condition_at is None:
+            self._next_condition_at = now + self._random.expovariate(self.condition_rate)
+
+        events = []
+        while self._next_condition_at <= now:
+            self._next_condition_at += self._random.expovariate(self.condition_rate)
+            index = self._random.choice(list(self._conditions))
+            _, name, members = self._conditions[index]
+            outsiders = [c for c in self._universe if c not in members]
+            if members and (not outsiders or self._random.random() < 0.5):
+                code = self._random.choice(sorted(members))
+                members.discard(code)
+                events.append((code, 'D', name, index))
+            elif outsiders:
+                code = self._random.choice(outsiders)
+                members.add(code)
+                events.append((code, 'I', name, index))
+        self.condition_events += len(events)
+        return events
+
+    # ===== 시뮬레이션 루프 =====
+
+    def _run(self):
+        while True:
+            time.sleep(self.step_interval)
+            try:
+                self._step()
+            except Exception as e:
+                logger.error("시뮬레이션 처리 실패: %s", e)
+
+    def _step(self):
+        with self._lock:
+            # 실시간 등록 종목 + 미체결 주문 종목만 시세 변동
+            registered = self._real_screens_codes()
+            codes = registered | {order.stock_code for order in self._resting.values()}
+            for code in codes:
+                state = self._symbol(code)
+                drift = self._random.gauss(0, self.volatility)
+                state.move_to(self._round(state.price * (1 + drift)), self._random.randint(1, self.level_quantity))
+            ticks = [(code, self._symbols[code].real_fields()) for code in registered]
+
+            chejan = []
+            for order in list(self._resting.values()):
+                chejan.extend(self._fill_events(order, self._match(order)))
+                if order.remaining <= 0:
+                    del self._resting[order.order_no]
+
+            events = self._condition_events(time.monotonic())
+
+        if self.on_tick:
+            for code, fields in ticks:
+                self.on_tick(code, lambda fid, fields=fields: fields.get(fid, ''))
+        self._emit_chejan(chejan)
+        if self.on_condition_event:
+            for event in events:
+                self.on_condition_event(*event)
+
+    def _real_screens_codes(self):
+        codes = set()
+        for screen_codes in self._real_screens.values():
+            codes |= screen_codes
+        return codes
+
+    def stats(self):
+        with self._lock:
+            return {
+                'symbols': len(self._symbols),
+                'realtime_codes': len(self._real_screens_codes()),
+                'resting_orders': len(self._resting),
+                'positions': len(self._positions),
+                'running_conditions': len(self._conditions),
+                'orders': self.orders,
+                'fills': self.fills,
+                'condition_events': self.condition_events,
+                'fill_queue': self._fill_queue.stats(),
+            }
@@ -0,0 +1,216 @@
+"""
+종목 마스터 테이블
+로그인 직후 코스피/코스닥 전체 종목의 마스터 정보(종목명, 종목상태, 상장주식수, 기준가, 상/하한가)를
+한번에 읽어 메모리에 보관하고, 거래일별 파일로 캐시해 같은 날 재시작 시 COM 호출 없이 복원합니다.
+"""
+import os
+import json
+import random
+import logging
+import threading
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+# GetCodeListByMarket 시장구분
+MARKETS = {
+    'KOSPI': '0',
+    'KOSDAQ': '10',
+}
+
+# 가격제한폭 (기준가 대비)
+PRICE_LIMIT_RATE = 0.30
+
+# 시뮬레이션 모드 종목 (코드, 종목명, 시장, 기준가)
+SIMULATION_STOCKS = [
+    ('005930', '삼성전자', 'KOSPI', 70000),
+    ('000660', 'SK하이닉스', 'KOSPI', 180000),
+    ('035420', 'NAVER', 'KOSPI', 190000),
+    ('005380', '현대차', 'KOSPI', 240000),
+    ('051910', 'LG화학', 'KOSPI', 380000),
+    ('247540', '에코프로비엠', 'KOSDAQ', 250000),
+    ('086520', '에코프로', 'KOSDAQ', 600000),
+    ('091990', '셀트리온헬스케어', 'KOSDAQ', 60000),
+]
+# 시뮬레이션 가상 종목 코드 시작값 (SIMULATION_STOCKS 이후 종목은 900000부터 차례로)
+SIMULATION_BASE_CODE = 900000
+
+
+def tick_size(price):
+    """호가단위 (코스피/코스닥 공통)"""
+    if price < 2000:
+        return 1
+    if price < 5000:
+        return 5
+    if price < 20000:
+        return 10
+    if price < 50000:
+        return 50
+    if price < 200000:
+        return 100
+    if price < 500000:
+        return 500
+    return 1000
+
+
+def price_limits(base_price):
+    """기준가로 상한가/하한가 계산 (호가단위로 절사/절상)"""
+    if base_price <= 0:
+        return 0, 0
+    upper = base_price * (1 + PRICE_LIMIT_RATE)
+    lower = base_price * (1 - PRICE_LIMIT_RATE)
+    upper_tick = tick_size(upper)
+    lower_tick = tick_size(lower)
+    upper = int(upper // upper_tick * upper_tick)
+    lower = int(-(-lower // lower_tick) * lower_tick)
+    return upper, lower
+
+
+def simulation_stocks(symbols=0):
+    """
+    시뮬레이션 모드 종목 마스터 - SIMULATION_STOCKS에 가상 종목을 더해 symbols개 (기준가는 종목코드별 고정)
+    시뮬레이터의 조건검색 종목도 이 목록에서 뽑으므로 편입 종목은 모두 마스터에 있습니다.
+    """
+    rows = list(SIMULATION_STOCKS)
+    rnd = random.Random(SIMULATION_BASE_CODE)
+    for i in range(max(0, symbols - len(rows))):
+        price = rnd.uniform(2000, 200000)
+        rows.append((
+            f'{SIMULATION_BASE_CODE + i:06d}', f'시뮬종목{i:03d}',
+            'KOSPI' if i % 2 == 0 else 'KOSDAQ', int(price // tick_size(price) * tick_size(price)),
+        ))
+
+    stocks = []
+    for code, name, market, base_price in rows:
+        upper, lower = price_limits(base_price)
+        stocks.append({
+            'code': code,
+            'name': name,
+            'market': market,
+            'state': '정상',
+            'listed_shares': 0,
+            'base_price': base_price,
+            'upper_limit': upper,
+            'lower_limit': lower,
+        })
+    return stocks
+
+
+def _to_int(value):
+    try:
+        return abs(int(str(value).strip() or '0'))
+    except ValueError:
+        return 0
+
+
+class MasterTable:
+    """종목코드 -> 마스터 정보 (메모리 + 거래일별 디스크 캐시)"""
+
+    def __init__(self, cache_dir='master_cache'):
+        self.cache_dir = cache_dir
+        self.trading_day = None
+        self._stocks = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._stocks)
+
+    @property
+    def loaded(self):
+        return self.trading_day is not None
+
+    def get(self, stock_code):
+        with self._lock:
+            return self._stocks.get(stock_code)
+
+    def put(self, info):
+        with self._lock:
+            self._stocks[info['code']] = info
+
+    def dump(self, market=None):
+        """전체 (또는 시장별) 마스터 목록"""
+        with self._lock:
+            stocks = list(self._stocks.values())
+        if market:
+            stocks = [s for s in stocks if s['market'] == market]
+        return stocks
+
+    # ===== 로드 =====
+
+    def load(self, ocx=None, trading_day=None, simulation_symbols=0):
+        """
+        마스터 로드 - 오늘자 캐시가 있으면 캐시에서, 없으면 OCX에서 읽어 캐시 저장
+        ocx가 None이면 디스크 캐시 없이 시뮬레이션 종목(simulation_symbols개)으로 채웁니다.
+        """
+        trading_day = trading_day or date.today().strftime('%Y%m%d')
+        if ocx is None:
+            stocks = simulation_stocks(simulation_symbols)
+        else:
+            stocks = self._read_cache(trading_day)
+            if stocks is None:
+                stocks = self._fetch(ocx)
+                self._write_cache(trading_day, stocks)
+
+        with self._lock:
+            self._stocks = {s['code']: s for s in stocks}
+            self.trading_day = trading_day
+        logger.info("종목 마스터 로드 완료 (%s): %d종목", trading_day, len(stocks))
+        return len(stocks)
+
+    def _fetch(self, ocx):
+        stocks = []
+        for market, market_code in MARKETS.items():
+            codes = [c for c in ocx.GetCodeListByMarket(market_code).split(';') if c]
+            for code in codes:
+                stocks.append(self.fetch_one(ocx, code, market))
+        return stocks
+
+    @staticmethod
+    def fetch_one(ocx, stock_code, market):
+        """OCX에서 한 종목 마스터 조회"""
+        base_price = _to_int(ocx.GetMasterLastPrice(stock_code))
+        upper, lower = price_limits(base_price)
+        # GetMasterListedStockCnt는 21억주 이상에서 overflow 되므로 Ex 함수 사용
+        listed_shares = _to_int(ocx.KOA_Functions('GetMasterListedStockCntEx', stock_code))
+        return {
+            'code': stock_code,
+            'name': ocx.GetMasterCodeName(stock_code).strip(),
+            'market': market,
+            'state': ocx.GetMasterStockState(stock_code).strip(),
+            'listed_shares': listed_shares,
+            'base_price': base_price,
+            'upper_limit': upper,
+            'lower_limit': lower,
+        }
+
+    # ===== 디스크 캐시 =====
+
+    def _cache_path(self, trading_day):
+        return os.path.join(self.cache_dir, f'master_{trading_day}.json')
+
+    def _read_cache(self, trading_day):
+        path = self._cache_path(trading_day)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("종목 마스터 캐시 읽기 실패 [%s]: %s", path, e)
+            return None
+
+    def _write_cache(self, trading_day, stocks):
+        path = self._cache_path(trading_day)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(stocks, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            # 지난 거래일 캐시 정리
+            for name in os.listdir(self.cache_dir):
+                if name.startswith('master_') and name != os.path.basename(path):
+                    os.remove(os.path.join(self.cache_dir, name))
+        except OSError as e:
+            logger.warning("종목 마스터 캐시 저장 실패 [%s]: %s", path, e)
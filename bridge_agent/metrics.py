@@ -0,0 +1,161 @@
+"""
+Prometheus 텍스트 형식 메트릭
+외부 의존성 없이 카운터/히스토그램과 스크레이프 시점에 값을 읽는 콜백 메트릭을 제공합니다.
+관측(observe/inc)은 락 한번으로 끝나고, 렌더링도 라벨 조합 수에 비례하므로 초 단위 스크레이프가 가능합니다.
+"""
+import bisect
+import threading
+
+# 초 단위 지연 버킷 (TR 응답은 수십~수백 ms, 타임아웃은 수 초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in labels
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple((name, labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type}']
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        return []
+
+
+class Counter(Metric):
+    """누적 카운터"""
+    type = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f'{self.name}{_format_labels(key)} {_format_value(v)}' for key, v in values]
+
+
+class Histogram(Metric):
+    """누적 버킷 히스토그램"""
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}   # 라벨 -> [버킷별 개수..., 합계, 개수]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def _samples(self):
+        with self._lock:
+            values = [(key, list(data)) for key, data in self._values.items()]
+        lines = []
+        for key, data in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, data):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels(key + (("le", _format_value(float(bound))),))} {cumulative}')
+            lines.append(f'{self.name}_bucket{_format_labels(key + (("le", "+Inf"),))} {data[-1]}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {_format_value(float(data[-2]))}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {data[-1]}')
+        return lines
+
+
+class CallbackMetric(Metric):
+    """
+    스크레이프 시점에 값을 읽는 메트릭 (기존 통계 속성/큐 깊이 노출용)
+    fn()은 숫자 하나 또는 {라벨값 튜플: 숫자}를 반환하고, None이면 생략합니다.
+    """
+
+    def __init__(self, name, documentation, fn, labelnames=(), type='gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+        self.type = type
+
+    def _samples(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        if not isinstance(value, dict):
+            return [f'{self.name} {_format_value(value)}']
+        return [
+            f'{self.name}{_format_labels(tuple(zip(self.labelnames, key)))} {_format_value(v)}'
+            for key, v in value.items()
+        ]
+
+
+class Registry:
+    """메트릭 모음"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name, documentation, fn, labelnames=()):
+        return self.register(CallbackMetric(name, documentation, fn, labelnames, 'gauge'))
+
+    def counter_callback(self, name, documentation, fn, labelnames=()):
+        return self.register(CallbackMetric(name, documentation, fn, labelnames, 'counter'))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
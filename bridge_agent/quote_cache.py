@@ -0,0 +1,130 @@
+"""
+현재가 캐시 + 동일 종목 조회 병합
+여러 조건식이 같은 종목을 동시에 편입하면 자동매수마다 같은 종목의 현재가 TR을 요청하게 되므로,
+종목별로 진행중인 TR은 하나만 두고 나머지 호출은 그 결과를 기다립니다.
+받은 시세는 ttl초 동안 재사용하고, 실시간 체결이 들어오는 종목은 체결값으로 계속 갱신합니다.
+"""
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# 실시간 체결로 갱신하는 시세 필드 (realtime.decode_tick 결과)
+TICK_QUOTE_FIELDS = (
+    'current_price', 'open_price', 'high_price', 'low_price', 'prev_close', 'volume', 'change_rate',
+)
+
+
+class QuoteCache:
+    """종목별 현재가 캐시 (LRU, TTL)"""
+
+    def __init__(self, ttl=1.0, max_entries=5000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._quotes = OrderedDict()   # 종목코드 -> (갱신시각 monotonic, 시세 dict)
+        self._inflight = {}            # 종목코드 -> Future (진행중인 조회)
+
+        self.hits = 0
+        self.merged = 0
+        self.misses = 0
+        self.tick_updates = 0
+
+    def get(self, code):
+        """TTL 내 시세 (없으면 None) - (시세, 경과초)"""
+        with self._lock:
+            return self._get(code)
+
+    def _get(self, code):
+        entry = self._quotes.get(code)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age > self.ttl:
+            return None
+        self._quotes.move_to_end(code)
+        return entry[1], age
+
+    def put(self, code, quote):
+        with self._lock:
+            self._put(code, quote)
+
+    def _put(self, code, quote):
+        self._quotes[code] = (time.monotonic(), quote)
+        self._quotes.move_to_end(code)
+        while len(self._quotes) > self.max_entries:
+            self._quotes.popitem(last=False)
+
+    def update_from_tick(self, tick):
+        """실시간 체결 반영 - 기존 시세(종목명/상하한가 등)는 유지하고 체결 필드만 덮어씀"""
+        code = tick['stock_code']
+        with self._lock:
+            entry = self._quotes.get(code)
+            quote = dict(entry[1]) if entry else {'stock_code': code}
+            for field in TICK_QUOTE_FIELDS:
+                quote[field] = tick[field]
+            self._put(code, quote)
+            self.tick_updates += 1
+
+    def fetch(self, code, loader, timeout=None):
+        """
+        캐시 조회 후 없으면 loader(code)로 조회 - (시세, 'hit'/'merged'/'miss', 경과초)
+        같은 종목을 조회중인 호출이 있으면 그 결과를 기다립니다.
+        loader가 {'error': ...}를 반환하면 캐시하지 않고 대기중인 호출에도 그대로 전달합니다.
+        """
+        with self._lock:
+            cached = self._get(code)
+            if cached is not None:
+                self.hits += 1
+                return cached[0], 'hit', cached[1]
+            future = self._inflight.get(code)
+            if future is not None:
+                self.merged += 1
+                owner = False
+            else:
+                future = self._inflight[code] = Future()
+                self.misses += 1
+                owner = True
+
+        if not owner:
+            return future.result(timeout), 'merged', 0.0
+
+        try:
+            quote = loader(code)
+        except Exception as e:
+            with self._lock:
+                self._inflight.pop(code, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(code, None)
+            if 'error' not in quote:
+                self._put(code, quote)
+        future.set_result(quote)
+        return quote, 'miss', 0.0
+
+    def split(self, codes):
+        """캐시에 있는 종목 시세와 조회가 필요한 종목으로 분리 - ({코드: 시세}, [코드])"""
+        found, missing = {}, []
+        with self._lock:
+            for code in codes:
+                cached = self._get(code)
+                if cached is None:
+                    missing.append(code)
+                else:
+                    found[code] = cached[0]
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._quotes),
+                'inflight': len(self._inflight),
+                'ttl_ms': round(self.ttl * 1000),
+                'hits': self.hits,
+                'merged': self.merged,
+                'misses': self.misses,
+                'tick_updates': self.tick_updates,
+            }
@@ -0,0 +1,199 @@
+"""
+실시간 시세 구독 관리
+SetRealReg 등록을 종목별 참조(구독자)로 관리하고, 화면당 종목 수 제한에 맞춰 화면을 나눠 씁니다.
+OnReceiveRealData 체결 데이터는 종목별 최신값만 남겨 일정 주기로 묶어서 전달합니다.
+"""
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 화면당 최대 등록 종목수
+MAX_CODES_PER_SCREEN = 100
+
+# 주식체결 FID: 체결시간, 현재가, 전일대비, 등락율, 거래량, 누적거래량, 시가, 고가, 저가
+TICK_FIDS = {
+    'traded_at': 20,
+    'current_price': 10,
+    'change': 11,
+    'change_rate': 12,
+    'trade_volume': 15,
+    'volume': 13,
+    'open_price': 16,
+    'high_price': 17,
+    'low_price': 18,
+}
+REAL_FID_LIST = ';'.join(str(fid) for fid in TICK_FIDS.values())
+
+
+def decode_tick(stock_code, get_fid):
+    """주식체결 실시간 데이터 디코딩 (get_fid(fid) -> 문자열)"""
+    raw = {name: get_fid(fid).strip() for name, fid in TICK_FIDS.items()}
+    current_price = abs(int(raw['current_price'] or '0'))
+    change = int(raw['change'] or '0')
+    return {
+        'stock_code': stock_code,
+        'current_price': current_price,
+        'open_price': abs(int(raw['open_price'] or '0')),
+        'high_price': abs(int(raw['high_price'] or '0')),
+        'low_price': abs(int(raw['low_price'] or '0')),
+        'prev_close': current_price - change,
+        'volume': abs(int(raw['volume'] or '0')),
+        'change_rate': float(raw['change_rate'] or '0'),
+        'traded_at': raw['traded_at'],
+    }
+
+
+class RealtimeManager:
+    """
+    실시간 구독 관리자
+    register(screen_no, codes, fids, opt_type) / remove(screen_no, code)는 OCX 호출을 감싼 함수,
+    on_flush(ticks)는 묶인 체결 목록을 받는 함수입니다.
+    """
+
+    def __init__(self, screens, register, remove, on_flush,
+                 max_codes_per_screen=MAX_CODES_PER_SCREEN, flush_interval=0.2):
+        self.screens = screens
+        self.register = register
+        self.remove = remove
+        self.on_flush = on_flush
+        self.max_codes_per_screen = max_codes_per_screen
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._owners = {}         # 종목코드 -> 구독자 집합
+        self._code_screen = {}    # 종목코드 -> 화면번호
+        self._screen_codes = {}   # 화면번호 -> 종목코드 집합
+        self._latest = {}         # 종목코드 -> 최신 체결 (flush 전까지 덮어씀)
+        self.ticks_received = 0
+        self.ticks_flushed = 0
+
+        self._thread = threading.Thread(target=self._flush_loop, name='realtime-flush', daemon=True)
+        self._thread.start()
+
+    # ===== 구독 =====
+
+    def subscribe(self, codes, owner):
+        """
+        종목 구독 - 새로 등록된 종목 목록 반환
+        화면번호 부족 등으로 등록하지 못하면 그 종목들의 구독자 추가를 되돌리고 예외를 다시 냅니다
+        (구독자만 남고 시세는 오지 않는 상태가 되지 않도록).
+        """
+        added = []
+        with self._lock:
+            for code in dict.fromkeys(codes):
+                owners = self._owners.setdefault(code, set())
+                if not owners:
+                    added.append(code)
+                owners.add(owner)
+            try:
+                self._register(added)
+            except Exception:
+                for code in added:
+                    if code not in self._code_screen:
+                        del self._owners[code]
+                raise
+        return added
+
+    def unsubscribe(self, codes, owner):
+        """구독 해지 - 구독자가 없어진 종목은 실시간 등록 해제"""
+        removed = []
+        with self._lock:
+            for code in dict.fromkeys(codes):
+                owners = self._owners.get(code)
+                if not owners or owner not in owners:
+                    continue
+                owners.discard(owner)
+                if not owners:
+                    del self._owners[code]
+                    self._unregister(code)
+                    removed.append(code)
+        return removed
+
+    def set_owner_codes(self, owner, codes):
+        """구독자의 종목 목록을 주어진 목록으로 교체"""
+        codes = set(codes)
+        with self._lock:
+            current = {code for code, owners in self._owners.items() if owner in owners}
+        removed = self.unsubscribe(current - codes, owner)
+        added = self.subscribe(codes - current, owner)
+        return added, removed
+
+    def unsubscribe_owner(self, owner):
+        with self._lock:
+            codes = [code for code, owners in self._owners.items() if owner in owners]
+        return self.unsubscribe(codes, owner)
+
+    def subscriptions(self):
+        with self._lock:
+            return {
+                'codes': len(self._owners),
+                'screens': {screen: len(codes) for screen, codes in self._screen_codes.items()},
+                'owners': self._owner_counts(),
+            }
+
+    def _owner_counts(self):
+        counts = {}
+        for owners in self._owners.values():
+            for owner in owners:
+                counts[owner] = counts.get(owner, 0) + 1
+        return counts
+
+    def _register(self, codes):
+        """여유 있는 화면부터 채워서 SetRealReg 등록"""
+        while codes:
+            screen_no = next(
+                (s for s, c in self._screen_codes.items() if len(c) < self.max_codes_per_screen),
+                None,
+            )
+            if screen_no is None:
+                screen_no = self.screens.lease('real')
+                self._screen_codes[screen_no] = set()
+
+            screen_codes = self._screen_codes[screen_no]
+            room = self.max_codes_per_screen - len(screen_codes)
+            batch, codes = codes[:room], codes[room:]
+            # 화면의 첫 등록은 "0"(교체), 이후는 "1"(추가)
+            opt_type = '1' if screen_codes else '0'
+            self.register(screen_no, ';'.join(batch), REAL_FID_LIST, opt_type)
+            for code in batch:
+                screen_codes.add(code)
+                self._code_screen[code] = screen_no
+
+    def _unregister(self, code):
+        screen_no = self._code_screen.pop(code, None)
+        if screen_no is None:
+            return
+        self.remove(screen_no, code)
+        self._latest.pop(code, None)
+        screen_codes = self._screen_codes[screen_no]
+        screen_codes.discard(code)
+        if not screen_codes:
+            del self._screen_codes[screen_no]
+            self.screens.release(screen_no)
+
+    # ===== 실시간 데이터 =====
+
+    def on_real_data(self, stock_code, real_type, get_fid):
+        """OnReceiveRealData 처리 - 종목별 최신 체결만 보관"""
+        if real_type != '주식체결':
+            return None
+        tick = decode_tick(stock_code, get_fid)
+        with self._lock:
+            self._latest[stock_code] = tick
+            self.ticks_received += 1
+        return tick
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            with self._lock:
+                if not self._latest:
+                    continue
+                ticks, self._latest = list(self._latest.values()), {}
+                self.ticks_flushed += len(ticks)
+            try:
+                self.on_flush(ticks)
+            except Exception as e:
+                logger.error("실시간 체결 전달 실패: %s", e)
@@ -0,0 +1,98 @@
+"""
+화면번호 풀
+키움 OpenAPI는 화면번호를 최대 200개까지 동시에 사용할 수 있습니다.
+요청 종류별 대역에서 화면번호를 빌려주고, 같은 키로 다시 빌리면 참조 카운트만 올려 재사용합니다.
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+MAX_SCREENS = 200
+
+# 종류별 화면번호 대역 (시작, 끝)
+SCREEN_RANGES = {
+    'tr': (1000, 1999),
+    'order': (2000, 2099),
+    'condition': (3000, 3099),
+    'real': (4000, 4999),
+}
+
+
+class ScreenPoolExhausted(Exception):
+    """사용 가능한 화면번호 없음"""
+
+
+class ScreenPool:
+    """종류별 화면번호 임대/반납 (참조 카운트)"""
+
+    def __init__(self, ranges=None, max_screens=MAX_SCREENS, on_release=None):
+        self.ranges = ranges or SCREEN_RANGES
+        self.max_screens = max_screens
+        self.on_release = on_release
+        self._lock = threading.Lock()
+        self._free = {kind: list(range(end, start - 1, -1)) for kind, (start, end) in self.ranges.items()}
+        self._refs = {}     # 화면번호 -> 참조 카운트
+        self._keys = {}     # (종류, 키) -> 화면번호
+        self._owners = {}   # 화면번호 -> (종류, 키)
+
+    def lease(self, kind, key=None):
+        """화면번호 임대 - 같은 (종류, 키)는 같은 화면번호를 공유"""
+        with self._lock:
+            if key is not None and (kind, key) in self._keys:
+                screen_no = self._keys[(kind, key)]
+                self._refs[screen_no] += 1
+                return screen_no
+
+            if len(self._refs) >= self.max_screens or not self._free[kind]:
+                raise ScreenPoolExhausted(f'화면번호 부족: {kind} (사용중 {len(self._refs)}개)')
+
+            screen_no = f"{self._free[kind].pop():04d}"
+            self._refs[screen_no] = 1
+            self._owners[screen_no] = (kind, key)
+            if key is not None:
+                self._keys[(kind, key)] = screen_no
+            return screen_no
+
+    def release(self, screen_no, force=False):
+        """화면번호 반납 - 참조 카운트가 0이 되면 (force면 즉시) 풀로 복귀"""
+        with self._lock:
+            if screen_no not in self._refs:
+                return False
+            self._refs[screen_no] = 0 if force else self._refs[screen_no] - 1
+            if self._refs[screen_no] > 0:
+                return False
+
+            del self._refs[screen_no]
+            kind, key = self._owners.pop(screen_no)
+            if key is not None:
+                self._keys.pop((kind, key), None)
+            # 가장 최근 반납된 번호를 먼저 재사용
+            self._free[kind].append(int(screen_no))
+
+        if self.on_release:
+            try:
+                self.on_release(kind, screen_no)
+            except Exception as e:
+                logger.error("화면번호 반납 처리 실패 [%s]: %s", screen_no, e)
+        return True
+
+    def release_key(self, kind, key, force=False):
+        """키로 화면번호 반납"""
+        screen_no = self.get(kind, key)
+        if screen_no is None:
+            return None
+        self.release(screen_no, force=force)
+        return screen_no
+
+    def get(self, kind, key):
+        """키에 임대된 화면번호 조회 (없으면 None)"""
+        with self._lock:
+            return self._keys.get((kind, key))
+
+    def stats(self):
+        with self._lock:
+            in_use = {kind: 0 for kind in self.ranges}
+            for kind, _ in self._owners.values():
+                in_use[kind] += 1
+            return {'in_use': len(self._refs), 'max': self.max_screens, 'by_kind': in_use}
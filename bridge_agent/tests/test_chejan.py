@@ -0,0 +1,118 @@
+"""체잔 이벤트 디코딩 / 병합"""
+import threading
+import unittest
+
+from chejan import ChejanProcessor, ORDER_FIDS, BALANCE_FIDS
+
+
+def order_event(order_no, status='체결', stock_code='005930', side='2', quantity=10,
+                unit_quantity=0, unit_price=0, cumulative=0):
+    values = {
+        'order_no': order_no,
+        'stock_code': 'A' + stock_code,
+        'order_status': status,
+        'order_kind': '+매수' if side == '2' else '-매도',
+        'side': side,
+        'order_quantity': quantity,
+        'unfilled_quantity': quantity - cumulative,
+        'cumulative_quantity': cumulative,
+        'filled_price': unit_price,
+        'unit_price': unit_price,
+        'unit_quantity': unit_quantity,
+        'time': '090000',
+    }
+    fields = {ORDER_FIDS[key][0]: str(value) for key, value in values.items()}
+    return lambda fid: fields.get(fid, '')
+
+
+def balance_event(stock_code, quantity, avg_price):
+    values = {'stock_code': 'A' + stock_code, 'quantity': quantity, 'avg_price': avg_price, 'current_price': avg_price}
+    fields = {BALANCE_FIDS[key][0]: str(value) for key, value in values.items()}
+    return lambda fid: fields.get(fid, '')
+
+
+class ChejanTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sent = []
+        # 창을 길게 두고 _flush를 직접 호출해 만기 순서를 정함
+        self.processor = ChejanProcessor(
+            on_order_status=lambda payload: self.sent.append(('status', payload)),
+            on_fill=lambda payload: self.sent.append(('fill', payload)),
+            on_balance=lambda payload: self.sent.append(('balance', payload)),
+            window=60,
+        )
+
+
+class ChejanOrderingTests(ChejanTestCase):
+
+    def test_balance_flush_sends_pending_fills_of_stock_first(self):
+        self.processor.on_event('0', order_event('0001', unit_quantity=3, unit_price=70000, cumulative=3))
+        self.processor.on_event('0', order_event('0002', stock_code='000660', unit_quantity=1, unit_price=180000, cumulative=1))
+        # 잔고는 0001 체결이 반영된 절대값
+        self.processor.on_event('1', balance_event('005930', 3, 70000))
+
+        self.processor._flush([('balance', '005930')])
+
+        self.assertEqual([(kind, p['stock_code']) for kind, p in self.sent], [('fill', '005930'), ('balance', '005930')])
+        self.assertEqual(self.sent[0][1]['filled_quantity'], 3)
+        self.assertEqual(self.sent[1][1]['quantity'], 3)
+
+        # 병합 타이머가 나중에 만기되어도 다시 보내지 않음
+        self.processor._flush([('fill', '0001')])
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(self.processor.stats()['pending_fills'], 1)   # 다른 종목 체결은 그대로
+
+
+class ChejanCoalescingTests(ChejanTestCase):
+
+    def test_executions_of_order_are_merged_into_one_fill(self):
+        self.processor.on_event('0', order_event('0001', unit_quantity=3, unit_price=70000, cumulative=3))
+        self.processor.on_event('0', order_event('0001', unit_quantity=7, unit_price=70100, cumulative=10))
+
+        self.processor._flush([('fill', '0001')])
+
+        self.assertEqual(len(self.sent), 1)
+        kind, fill = self.sent[0]
+        self.assertEqual(kind, 'fill')
+        self.assertEqual(fill['filled_quantity'], 10)
+        self.assertEqual(fill['filled_price'], 70070)   # (3*70000 + 7*70100) / 10
+        self.assertEqual(fill['executions'], 2)
+        self.assertEqual(fill['cumulative_quantity'], 10)
+        self.assertEqual(fill['unfilled_quantity'], 0)
+
+    def test_only_latest_balance_of_stock_is_sent(self):
+        self.processor.on_event('1', balance_event('005930', 3, 70000))
+        self.processor.on_event('1', balance_event('005930', 10, 70070))
+
+        self.processor._flush([('balance', '005930')])
+
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.sent[0][1]['quantity'], 10)
+        self.assertEqual(self.processor.stats()['balances_sent'], 1)
+
+    def test_order_status_flushes_pending_fill_first(self):
+        self.processor.on_event('0', order_event('0001', unit_quantity=3, unit_price=70000, cumulative=3))
+        self.processor.on_event('0', order_event('0001', status='확인'))
+
+        self.assertEqual([kind for kind, _ in self.sent], ['fill', 'status'])
+        self.assertEqual(self.processor.stats()['pending_fills'], 0)
+
+    def test_window_expiry_sends_merged_fill(self):
+        done = threading.Event()
+        processor = ChejanProcessor(
+            on_order_status=lambda payload: None,
+            on_fill=lambda payload: (self.sent.append(('fill', payload)), done.set()),
+            on_balance=lambda payload: None,
+            window=0.01,
+        )
+        processor.on_event('0', order_event('0001', unit_quantity=2, unit_price=70000, cumulative=2))
+        processor.on_event('0', order_event('0001', unit_quantity=2, unit_price=70000, cumulative=4))
+
+        self.assertTrue(done.wait(2))
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.sent[0][1]['filled_quantity'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
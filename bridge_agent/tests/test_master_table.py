@@ -0,0 +1,28 @@
+"""종목 마스터 (시뮬레이션 종목)"""
+import tempfile
+import unittest
+
+from master_table import MasterTable, SIMULATION_STOCKS, simulation_stocks
+
+
+class SimulationMasterTests(unittest.TestCase):
+
+    def test_simulation_master_has_requested_symbols(self):
+        stocks = simulation_stocks(200)
+        codes = [s['code'] for s in stocks]
+        self.assertEqual(len(set(codes)), 200)
+        self.assertEqual(codes[:len(SIMULATION_STOCKS)], [row[0] for row in SIMULATION_STOCKS])
+        self.assertTrue(all(s['name'] and s['base_price'] > 0 for s in stocks))
+        # 기준가는 실행마다 같아야 함 (재시작해도 가격이 튀지 않도록)
+        self.assertEqual(stocks, simulation_stocks(200))
+
+    def test_simulated_condition_codes_resolve_in_master(self):
+        master = MasterTable(cache_dir=tempfile.mkdtemp())
+        master.load(simulation_symbols=200)
+        universe = [s['code'] for s in simulation_stocks(200)]
+        self.assertEqual([code for code in universe if master.get(code) is None], [])
+        self.assertEqual(master.get('900003')['market'], 'KOSDAQ')
+
+
+if __name__ == '__main__':
+    unittest.main()
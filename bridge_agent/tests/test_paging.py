@@ -0,0 +1,79 @@
+"""TR 연속조회 (같은 키의 연속조회 직렬화)"""
+import time
+import threading
+import unittest
+
+from kiwoom_bridge import KiwoomAPI
+from screen_pool import ScreenPool
+from tr_engine import TrRequestEngine, TrTimeoutError
+from tr_schema import TR_SCHEMAS
+
+
+class FakePagingAPI(KiwoomAPI):
+    """OCX 없이 연속조회 흐름만 확인 - TR 요청은 (호출자, 화면번호, prev_next)로 기록"""
+
+    def __init__(self, pages=3, delay=0.01):
+        self.ocx = None
+        self.screens = ScreenPool()
+        self.tr = TrRequestEngine(default_timeout=1.0)
+        self._paging_locks = {}
+        self._paging_guard = threading.Lock()
+        self.pages = pages
+        self.delay = delay
+        self.requests = []
+        self._served = {}
+
+    def _request_tr(self, tr_code, rq_name, inputs, decoder, timeout=None, key=None,
+                    prev_next=0, screen_key=None):
+        caller = threading.current_thread().name
+        screen_no = self.screens.get('tr', screen_key)
+        self.requests.append((caller, screen_no, prev_next))
+        time.sleep(self.delay)
+        served = self._served[caller] = 1 if prev_next == 0 else self._served[caller] + 1
+        return {'single': {}, 'rows': [(caller, served)], 'next': served < self.pages, 'scheduler': None}
+
+
+class PagingTests(unittest.TestCase):
+
+    def _collect(self, api, results, **kwargs):
+        pages = api._request_schema_pages(TR_SCHEMAS['opw00018'], key=('opw00018', '1234'), account_no='1234', **kwargs)
+        results[threading.current_thread().name] = [page['rows'][0] for page in pages]
+
+    def test_concurrent_callers_for_same_key_do_not_interleave(self):
+        api, results = FakePagingAPI(), {}
+        threads = [threading.Thread(target=self._collect, args=(api, results), name=f'caller{i}') for i in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        # 각 호출은 자기 페이지 1~3을 빠짐없이 받고, 요청은 호출 단위로 이어짐 (0, 2, 2, 0, 2, 2)
+        for name, rows in results.items():
+            self.assertEqual(rows, [(name, 1), (name, 2), (name, 3)])
+        self.assertEqual([prev_next for _, _, prev_next in api.requests], [0, 2, 2, 0, 2, 2])
+        callers = [caller for caller, _, _ in api.requests]
+        self.assertEqual(callers[:3], [callers[0]] * 3)
+        self.assertEqual(api._paging_locks, {})
+        self.assertEqual(api.screens.stats()['in_use'], 0)
+
+    def test_stopping_early_releases_lock_and_screen(self):
+        api = FakePagingAPI()
+        for page in api._request_schema_pages(TR_SCHEMAS['opw00018'], key=('opw00018', '1234'), account_no='1234'):
+            break
+        self.assertEqual(api._paging_locks, {})
+        self.assertEqual(api.screens.stats()['in_use'], 0)
+
+    def test_waiting_caller_times_out(self):
+        api = FakePagingAPI(pages=1)
+        first = api._request_schema_pages(TR_SCHEMAS['opw00018'], key=('opw00018', '1234'), account_no='1234')
+        next(first)     # 첫 호출이 연속조회 중 (락 보유)
+        with self.assertRaises(TrTimeoutError):
+            list(api._request_schema_pages(
+                TR_SCHEMAS['opw00018'], timeout=0.01, key=('opw00018', '1234'), max_pages=1, account_no='1234',
+            ))
+        first.close()
+        self.assertEqual(api._paging_locks, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""현재가 캐시 (TTL / 동일 종목 조회 병합)"""
+import threading
+import unittest
+
+from quote_cache import QuoteCache
+from tests.test_tr_scheduler import wait_until
+
+
+class QuoteCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = QuoteCache(ttl=60)
+        self.loads = []
+
+    def loader(self, code):
+        self.loads.append(code)
+        return {'stock_code': code, 'current_price': 70000}
+
+    def test_miss_then_hit_within_ttl(self):
+        quote, source, _ = self.cache.fetch('005930', self.loader)
+        self.assertEqual((quote['current_price'], source), (70000, 'miss'))
+
+        quote, source, _ = self.cache.fetch('005930', self.loader)
+        self.assertEqual(source, 'hit')
+        self.assertEqual(self.loads, ['005930'])
+
+    def test_expired_quote_is_reloaded(self):
+        cache = QuoteCache(ttl=0)
+        cache.fetch('005930', self.loader)
+        _, source, _ = cache.fetch('005930', self.loader)
+        self.assertEqual(source, 'miss')
+        self.assertEqual(len(self.loads), 2)
+
+    def test_concurrent_fetch_of_same_code_is_merged(self):
+        gate = threading.Event()
+
+        def slow_loader(code):
+            gate.wait(5)
+            return self.loader(code)
+
+        results = {}
+        owner = threading.Thread(target=lambda: results.setdefault('owner', self.cache.fetch('005930', slow_loader)))
+        owner.start()
+        wait_until(lambda: self.cache.stats()['inflight'] == 1)
+
+        waiter = threading.Thread(target=lambda: results.setdefault('waiter', self.cache.fetch('005930', slow_loader, 5)))
+        waiter.start()
+        wait_until(lambda: self.cache.stats()['merged'] == 1)
+
+        gate.set()
+        owner.join(5)
+        waiter.join(5)
+        self.assertEqual(results['owner'][1], 'miss')
+        self.assertEqual(results['waiter'][1], 'merged')
+        self.assertEqual(results['waiter'][0], results['owner'][0])
+        self.assertEqual(self.loads, ['005930'])
+
+    def test_error_quote_is_not_cached(self):
+        quote, source, _ = self.cache.fetch('005930', lambda code: {'error': 'TR 요청 시간 초과'})
+        self.assertEqual((quote, source), ({'error': 'TR 요청 시간 초과'}, 'miss'))
+
+        _, source, _ = self.cache.fetch('005930', self.loader)
+        self.assertEqual(source, 'miss')
+        self.assertEqual(self.loads, ['005930'])
+
+    def test_loader_exception_clears_inflight(self):
+        def failing(code):
+            raise RuntimeError('OCX 오류')
+
+        with self.assertRaises(RuntimeError):
+            self.cache.fetch('005930', failing)
+        self.assertEqual(self.cache.stats()['inflight'], 0)
+        _, source, _ = self.cache.fetch('005930', self.loader)
+        self.assertEqual(source, 'miss')
+
+    def test_tick_updates_price_fields_and_keeps_others(self):
+        self.cache.put('005930', {'stock_code': '005930', 'stock_name': '삼성전자', 'current_price': 70000})
+        tick = {'stock_code': '005930', 'current_price': 70500, 'open_price': 70000, 'high_price': 70600,
+                'low_price': 69900, 'prev_close': 69800, 'volume': 1000, 'change_rate': 1.0}
+        self.cache.update_from_tick(tick)
+
+        quote, age = self.cache.get('005930')
+        self.assertEqual(quote['current_price'], 70500)
+        self.assertEqual(quote['stock_name'], '삼성전자')
+
+    def test_split(self):
+        self.cache.put('005930', {'stock_code': '005930', 'current_price': 70000})
+        found, missing = self.cache.split(['005930', '000660'])
+        self.assertEqual(list(found), ['005930'])
+        self.assertEqual(missing, ['000660'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""실시간 시세 구독 관리"""
+import unittest
+from unittest import mock
+
+import kiwoom_bridge
+from realtime import RealtimeManager
+from screen_pool import ScreenPool, ScreenPoolExhausted
+
+
+class RealtimeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # 실시간 화면 1개, 화면당 2종목
+        self.screens = ScreenPool(ranges={'real': (4000, 4000)})
+        self.registered = []
+        self.realtime = RealtimeManager(
+            self.screens,
+            register=lambda screen_no, codes, fids, opt_type: self.registered.append((screen_no, codes, opt_type)),
+            remove=lambda screen_no, code: None,
+            on_flush=lambda ticks: None,
+            max_codes_per_screen=2,
+            flush_interval=60,
+        )
+
+
+class RealtimeSubscribeTests(RealtimeTestCase):
+
+    def test_screen_exhaustion_rolls_back_unregistered_owners(self):
+        with self.assertRaises(ScreenPoolExhausted):
+            self.realtime.subscribe(['005930', '000660', '035420'], 'condition:0')
+
+        # 화면에 들어간 두 종목만 구독 상태로 남음
+        self.assertEqual(self.registered, [('4000', '005930;000660', '0')])
+        self.assertEqual(self.realtime.subscriptions()['owners'], {'condition:0': 2})
+
+        # 자리가 나면 다시 구독 가능
+        self.assertEqual(self.realtime.unsubscribe(['000660'], 'condition:0'), ['000660'])
+        self.assertEqual(self.realtime.subscribe(['035420'], 'condition:0'), ['035420'])
+
+
+class ConditionEventTests(unittest.TestCase):
+
+    def test_condition_event_is_sent_when_realtime_registration_fails(self):
+        handler = kiwoom_bridge.KiwoomEventHandler()
+        handler.api = mock.Mock()
+        handler.api.realtime.subscribe.side_effect = ScreenPoolExhausted('화면번호 부족: real')
+
+        with mock.patch.object(kiwoom_bridge, 'dispatcher') as dispatcher:
+            handler.OnReceiveRealCondition('005930', 'I', '테스트조건1', '0')
+
+        dispatcher.send.assert_called_once_with('/api/callback/condition-match/', {
+            'condition_index': 0,
+            'condition_name': '테스트조건1',
+            'stock_code': '005930',
+            'match_type': 'I',
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""화면번호 풀 (참조 카운트 / 반납)"""
+import unittest
+
+from screen_pool import ScreenPool, ScreenPoolExhausted
+
+
+class ScreenPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        self.released = []
+        self.pool = ScreenPool(
+            ranges={'tr': (1000, 1002), 'real': (4000, 4001)},
+            on_release=lambda kind, screen_no: self.released.append((kind, screen_no)),
+        )
+
+    def test_same_key_shares_screen_until_last_release(self):
+        screen_no = self.pool.lease('real', '005930')
+        self.assertEqual(self.pool.lease('real', '005930'), screen_no)
+        self.assertEqual(self.pool.stats()['in_use'], 1)
+
+        self.assertFalse(self.pool.release(screen_no))
+        self.assertEqual(self.released, [])
+        self.assertEqual(self.pool.get('real', '005930'), screen_no)
+
+        self.assertTrue(self.pool.release(screen_no))
+        self.assertEqual(self.released, [('real', screen_no)])
+        self.assertIsNone(self.pool.get('real', '005930'))
+        self.assertEqual(self.pool.stats()['in_use'], 0)
+
+    def test_force_release_ignores_refcount(self):
+        screen_no = self.pool.lease('real', '005930')
+        self.pool.lease('real', '005930')
+
+        self.assertTrue(self.pool.release(screen_no, force=True))
+        self.assertFalse(self.pool.release(screen_no))   # 이미 반납됨
+        self.assertEqual(self.released, [('real', screen_no)])
+
+    def test_release_key(self):
+        screen_no = self.pool.lease('real', '005930')
+        self.assertEqual(self.pool.release_key('real', '005930'), screen_no)
+        self.assertIsNone(self.pool.release_key('real', '005930'))
+
+    def test_keyless_leases_get_distinct_screens(self):
+        screens = {self.pool.lease('tr') for _ in range(3)}
+        self.assertEqual(screens, {'1000', '1001', '1002'})
+
+    def test_exhausted_per_kind(self):
+        self.pool.lease('real', '005930')
+        self.pool.lease('real', '000660')
+        with self.assertRaises(ScreenPoolExhausted):
+            self.pool.lease('real', '035720')
+        # 다른 종류 대역은 영향 없음
+        self.assertEqual(self.pool.lease('tr'), '1000')
+        self.assertEqual(self.pool.stats()['by_kind'], {'tr': 1, 'real': 2})
+
+    def test_exhausted_by_max_screens(self):
+        pool = ScreenPool(ranges={'tr': (1000, 1009)}, max_screens=2)
+        pool.lease('tr')
+        pool.lease('tr')
+        with self.assertRaises(ScreenPoolExhausted):
+            pool.lease('tr')
+
+    def test_last_released_screen_is_reused_first(self):
+        first = self.pool.lease('tr')
+        second = self.pool.lease('tr')
+        self.pool.release(first)
+        self.pool.release(second)
+        self.assertEqual(self.pool.lease('tr'), second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""TR 요청/응답 엔진 (요청 매칭 / 타임아웃)"""
+import unittest
+
+from tr_engine import TrRequestEngine, TrRequestError, TrTimeoutError
+
+
+class FakeOcx:
+    """CommRqData 호출만 기록하는 OCX"""
+
+    def __init__(self, ret=0):
+        self.ret = ret
+        self.inputs = {}
+        self.requests = []   # (rq_name, tr_code, prev_next, screen_no, 입력값)
+
+    def SetInputValue(self, key, value):
+        self.inputs[key] = value
+
+    def CommRqData(self, rq_name, tr_code, prev_next, screen_no):
+        self.requests.append((rq_name, tr_code, prev_next, screen_no, dict(self.inputs)))
+        self.inputs = {}
+        return self.ret
+
+
+class TrEngineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.completed = []
+        self.engine = TrRequestEngine(
+            default_timeout=0.05,
+            on_complete=lambda tr_code, elapsed, result: self.completed.append((tr_code, result)),
+        )
+        self.ocx = FakeOcx()
+
+    def submit(self, code, screen_no):
+        return self.engine.submit(
+            self.ocx, 'opt10001', '주식기본정보', screen_no, {'종목코드': code},
+            lambda rq_name, tr_code, prev_next: {'code': code, 'next': prev_next},
+        )
+
+
+class TrMatchingTests(TrEngineTestCase):
+
+    def test_responses_complete_their_own_request(self):
+        first = self.submit('005930', '1000')
+        second = self.submit('000660', '1001')
+        (rq1, _, _, screen1, inputs1), (rq2, _, _, screen2, _) = self.ocx.requests
+
+        # 같은 TR도 요청명에 일련번호가 붙어 구분되고, 응답 순서가 바뀌어도 제 요청을 완료
+        self.assertNotEqual(rq1, rq2)
+        self.assertEqual(inputs1, {'종목코드': '005930'})
+        self.assertTrue(self.engine.on_receive(screen2, rq2, 'opt10001', '2'))
+        self.assertTrue(self.engine.on_receive(screen1, rq1, 'opt10001', '0'))
+
+        self.assertEqual(first.result(0), {'code': '005930', 'next': '0'})
+        self.assertEqual(second.result(0), {'code': '000660', 'next': '2'})
+        self.assertEqual(self.engine.pending_count(), 0)
+        self.assertEqual(self.completed, [('opt10001', 'ok'), ('opt10001', 'ok')])
+
+    def test_unknown_response_is_ignored(self):
+        future = self.submit('005930', '1000')
+        rq_name = self.ocx.requests[0][0]
+        self.assertFalse(self.engine.on_receive('1001', rq_name, 'opt10001', '0'))
+        self.assertFalse(future.done())
+
+    def test_comm_rq_data_error_fails_request(self):
+        self.ocx.ret = -200
+        future = self.submit('005930', '1000')
+        with self.assertRaises(TrRequestError):
+            future.result(0)
+        self.assertEqual(self.engine.pending_count(), 0)
+        self.assertEqual(self.completed, [('opt10001', 'error')])
+
+    def test_decoder_error_fails_request(self):
+        future = self.engine.submit(self.ocx, 'opt10001', '주식기본정보', '1000', {}, lambda *args: 1 / 0)
+        rq_name = self.ocx.requests[0][0]
+        self.engine.on_receive('1000', rq_name, 'opt10001', '0')
+        with self.assertRaises(TrRequestError):
+            future.result(0)
+
+
+class TrTimeoutTests(TrEngineTestCase):
+
+    def test_timeout_expires_request_and_ignores_late_response(self):
+        future = self.submit('005930', '1000')
+        rq_name = self.ocx.requests[0][0]
+
+        with self.assertRaises(TrTimeoutError):
+            self.engine.wait(future, timeout=0.01)
+        self.assertEqual(self.engine.pending_count(), 0)
+        self.assertEqual(self.completed, [('opt10001', 'timeout')])
+
+        self.assertFalse(self.engine.on_receive('1000', rq_name, 'opt10001', '0'))
+        self.assertIsInstance(future.exception(0), TrTimeoutError)
+
+    def test_call_uses_default_timeout(self):
+        with self.assertRaises(TrTimeoutError):
+            self.engine.call(self.ocx, 'opt10001', '주식기본정보', '1000', {}, lambda *args: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""TR 스케줄러 (우선순위 / 병합 / 취소)"""
+import time
+import threading
+import unittest
+
+from tr_scheduler import TrScheduler, PRIORITY_ORDER, PRIORITY_QUERY
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError('조건 대기 시간 초과')
+        time.sleep(0.001)
+
+
+class TrSchedulerTestCase(unittest.TestCase):
+    """스케줄러 스레드를 막는 작업을 먼저 실행시켜 두고, 대기열을 쌓은 뒤 풀어주는 테스트 기반"""
+
+    def setUp(self):
+        self.scheduler = TrScheduler(rate=1000, burst=1000)
+        self.gate = threading.Event()
+        self.blocker = self.scheduler.submit(lambda future: self.gate.wait(5))
+        wait_until(self.blocker.future.running)
+
+    def tearDown(self):
+        self.gate.set()
+
+
+class TrSchedulerCancelTests(TrSchedulerTestCase):
+
+    def test_submit_after_abandon_does_not_merge_into_cancelled_job(self):
+        job = self.scheduler.submit(lambda future: 'first', key='opt10001:005930')
+        self.scheduler.abandon(job)
+        self.assertTrue(job.future.cancelled())
+
+        retry = self.scheduler.submit(lambda future: 'second', key='opt10001:005930')
+        self.assertIsNot(retry, job)
+        self.assertEqual(self.scheduler.merged, 0)
+
+        self.gate.set()
+        self.assertEqual(retry.future.result(timeout=1), 'second')
+
+    def test_cancelled_job_is_skipped_and_not_counted(self):
+        job = self.scheduler.submit(lambda future: self.fail('취소된 작업 실행'), key='k')
+        self.scheduler.abandon(job)
+        self.assertEqual(self.scheduler.queue_depth(), 0)
+
+        after = self.scheduler.submit(lambda future: 'ok')
+        self.gate.set()
+        self.assertEqual(after.future.result(timeout=1), 'ok')
+        self.assertEqual(self.scheduler.dispatched, 2)   # blocker + after
+
+
+class TrSchedulerPriorityTests(TrSchedulerTestCase):
+
+    def test_order_runs_before_queued_queries(self):
+        ran = []
+        query = self.scheduler.submit(lambda future: ran.append('query'), priority=PRIORITY_QUERY)
+        order = self.scheduler.submit(lambda future: ran.append('order'), priority=PRIORITY_ORDER)
+
+        self.gate.set()
+        query.future.result(timeout=1)
+        order.future.result(timeout=1)
+        self.assertEqual(ran, ['order', 'query'])
+
+    def test_same_priority_runs_in_submit_order(self):
+        ran = []
+        jobs = [self.scheduler.submit(lambda future, i=i: ran.append(i)) for i in range(3)]
+
+        self.gate.set()
+        for job in jobs:
+            job.future.result(timeout=1)
+        self.assertEqual(ran, [0, 1, 2])
+
+
+class TrSchedulerMergeTests(TrSchedulerTestCase):
+
+    def test_same_key_is_merged_and_run_once(self):
+        calls = []
+        first = self.scheduler.submit(lambda future: calls.append(1) or 'price', key='opt10001:005930')
+        second = self.scheduler.submit(lambda future: calls.append(2) or 'other', key='opt10001:005930')
+
+        self.assertIs(second, first)
+        self.assertEqual(self.scheduler.merged, 1)
+        self.assertEqual(self.scheduler.queue_depth(), 1)
+
+        self.gate.set()
+        self.assertEqual(first.future.result(timeout=1), 'price')
+        self.assertEqual(calls, [1])
+
+    def test_different_keys_are_not_merged(self):
+        first = self.scheduler.submit(lambda future: 'a', key='opt10001:005930')
+        second = self.scheduler.submit(lambda future: 'b', key='opt10001:000660')
+
+        self.assertIsNot(second, first)
+        self.gate.set()
+        self.assertEqual(second.future.result(timeout=1), 'b')
+
+    def test_abandon_keeps_job_while_other_waiter_remains(self):
+        job = self.scheduler.submit(lambda future: 'price', key='opt10001:005930')
+        self.scheduler.submit(lambda future: 'price', key='opt10001:005930')
+
+        self.scheduler.abandon(job)
+        self.assertFalse(job.future.cancelled())
+
+        self.gate.set()
+        self.assertEqual(job.future.result(timeout=1), 'price')
+
+
+if __name__ == '__main__':
+    unittest.main()
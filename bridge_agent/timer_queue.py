@@ -0,0 +1,79 @@
+"""
+지연 실행 큐
+주문마다 threading.Timer 스레드를 만드는 대신 스레드 하나가 힙으로 만기 시각을 관리하고,
+만기된 항목을 한번에 모아 handler(items)로 넘깁니다.
+"""
+import time
+import heapq
+import logging
+import itertools
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TimerQueue:
+    """만기 시각 힙 + 단일 디스패치 스레드"""
+
+    def __init__(self, handler, name='timer-queue', max_batch=1000):
+        self.handler = handler
+        self.max_batch = max_batch
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        self.scheduled = 0
+        self.dispatched = 0
+        self.batches = 0
+        self.max_lag_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def schedule(self, delay, item):
+        """delay초 후 handler로 전달"""
+        due = time.monotonic() + max(0.0, delay)
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), item))
+            self.scheduled += 1
+            # 가장 이른 만기가 바뀐 경우에만 깨움
+            if self._heap[0][2] is item:
+                self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'pending': len(self._heap),
+                'scheduled': self.scheduled,
+                'dispatched': self.dispatched,
+                'batches': self.batches,
+                'max_lag_ms': round(self.max_lag_ms, 1),
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                now = time.monotonic()
+                due = self._heap[0][0]
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+
+                # 가장 오래 밀린 항목 기준 지연
+                self.max_lag_ms = max(self.max_lag_ms, (now - due) * 1000)
+                batch = []
+                while self._heap and self._heap[0][0] <= now and len(batch) < self.max_batch:
+                    batch.append(heapq.heappop(self._heap)[2])
+                self.dispatched += len(batch)
+                self.batches += 1
+
+            try:
+                self.handler(batch)
+            except Exception as e:
+                logger.error("지연 실행 처리 실패 (%d건): %s", len(batch), e)
@@ -0,0 +1,155 @@
+"""
+TR 요청/응답 엔진
+CommRqData 요청을 (요청명, 화면번호)로 등록하고 OnReceiveTrData 이벤트에서 완료합니다.
+각 요청은 Future로 반환되어 Flask 핸들러가 타임아웃과 함께 대기할 수 있습니다.
+"""
+import time
+import logging
+import itertools
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+
+class TrRequestError(Exception):
+    """TR 요청 실패 (CommRqData 에러 또는 응답 디코딩 실패)"""
+
+
+class TrTimeoutError(TrRequestError):
+    """TR 응답 시간 초과"""
+
+
+class TrRequest:
+    """대기중인 TR 요청"""
+
+    def __init__(self, rq_name, tr_code, screen_no, decoder, future=None):
+        self.rq_name = rq_name
+        self.tr_code = tr_code
+        self.screen_no = screen_no
+        self.decoder = decoder
+        self.future = future or Future()
+        self.started_at = time.monotonic()
+
+    @property
+    def key(self):
+        return (self.rq_name, self.screen_no)
+
+
+class TrRequestEngine:
+    """
+    TR 요청/응답 매칭 엔진
+    요청명에 일련번호를 붙여 동일 TR을 여러 건 동시에 요청할 수 있습니다.
+    """
+
+    def __init__(self, default_timeout=5.0, on_complete=None):
+        """on_complete(tr_code, 소요시간(초), 결과)는 요청 완료마다 호출 (결과: ok/error/timeout)"""
+        self.default_timeout = default_timeout
+        self.on_complete = on_complete
+        self._pending = {}
+        self._lock = threading.Lock()
+        # SetInputValue ~ CommRqData 구간은 OCX 전역 상태를 쓰므로 직렬화
+        self._rq_lock = threading.Lock()
+        self._seq = itertools.count(1)
+
+    def submit(self, ocx, tr_code, rq_name, screen_no, inputs, decoder, prev_next=0, future=None):
+        """
+        TR 요청 전송
+        decoder(rq_name, tr_code, prev_next)는 OnReceiveTrData 안에서 호출되어 결과를 반환
+        future를 넘기면 해당 Future를 완료 (스케줄러 연동)
+        Returns: Future
+        """
+        def send(req):
+            for key, value in inputs.items():
+                ocx.SetInputValue(key, value)
+            return ocx.CommRqData(req.rq_name, tr_code, prev_next, screen_no)
+
+        return self._send(TrRequest(f"{rq_name}#{next(self._seq)}", tr_code, screen_no, decoder, future), send)
+
+    def submit_kw(self, ocx, codes, rq_name, screen_no, decoder, future=None):
+        """
+        관심종목 복수 조회 (CommKwRqData, 최대 100종목)
+        응답은 OPTKWFID TR로 수신됩니다.
+        """
+        def send(req):
+            return ocx.CommKwRqData(';'.join(codes), 0, len(codes), 0, req.rq_name, screen_no)
+
+        return self._send(TrRequest(f"{rq_name}#{next(self._seq)}", 'OPTKWFID', screen_no, decoder, future), send)
+
+    def _send(self, req, send):
+        with self._lock:
+            self._pending[req.key] = req
+
+        with self._rq_lock:
+            ret = send(req)
+
+        if ret != 0:
+            self._discard(req)
+            self._complete(req, 'error')
+            req.future.set_exception(TrRequestError(f'TR 요청 실패: {req.tr_code} (코드: {ret})'))
+        return req.future
+
+    def call(self, ocx, tr_code, rq_name, screen_no, inputs, decoder, timeout=None, prev_next=0):
+        """TR 요청 후 응답까지 대기 (타임아웃 시 TrTimeoutError)"""
+        future = self.submit(ocx, tr_code, rq_name, screen_no, inputs, decoder, prev_next)
+        return self.wait(future, timeout)
+
+    def wait(self, future, timeout=None):
+        """Future 결과 대기"""
+        timeout = timeout or self.default_timeout
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            error = TrTimeoutError(f'TR 응답 시간 초과 ({timeout}초)')
+            self._expire(future, error)
+            raise error
+
+    def on_receive(self, screen_no, rq_name, tr_code, prev_next):
+        """OnReceiveTrData 이벤트 처리 - 대기중인 요청을 찾아 완료"""
+        with self._lock:
+            req = self._pending.pop((rq_name, screen_no), None)
+        if req is None:
+            logger.debug("매칭되는 TR 요청 없음: %s (%s)", rq_name, screen_no)
+            return False
+
+        try:
+            result = req.decoder(rq_name, tr_code, prev_next)
+        except Exception as e:
+            logger.error("TR 응답 처리 실패 [%s]: %s", tr_code, e)
+            self._complete(req, 'error')
+            req.future.set_exception(TrRequestError(f'TR 응답 처리 실패: {e}'))
+        else:
+            elapsed = self._complete(req, 'ok')
+            req.future.set_result(result)
+            logger.debug("TR 응답 [%s] %.1fms", tr_code, elapsed * 1000)
+        return True
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _complete(self, req, result):
+        elapsed = time.monotonic() - req.started_at
+        if self.on_complete:
+            try:
+                self.on_complete(req.tr_code, elapsed, result)
+            except Exception as e:
+                logger.error("TR 완료 처리 실패: %s", e)
+        return elapsed
+
+    def _discard(self, req):
+        with self._lock:
+            self._pending.pop(req.key, None)
+
+    def _expire(self, future, error):
+        """타임아웃된 요청 제거 후 실패 처리 (늦게 도착한 응답은 무시)"""
+        with self._lock:
+            for key, req in list(self._pending.items()):
+                if req.future is future:
+                    del self._pending[key]
+                    break
+            else:
+                return
+        self._complete(req, 'timeout')
+        if not future.done():
+            future.set_exception(error)
@@ -0,0 +1,178 @@
+"""
+TR/주문 요청 스케줄러
+키움 조회 제한(초당 약 5회, 시간당 상한)을 토큰 버킷으로 지키면서
+주문을 시세조회보다 먼저 처리하고, 대기중인 동일 요청은 하나로 병합합니다.
+"""
+import time
+import heapq
+import logging
+import itertools
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ORDER = 0
+PRIORITY_QUERY = 1
+
+
+class TokenBucket:
+    """토큰 버킷 (rate: 초당 충전량, capacity: 최대 토큰)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self):
+        """토큰 1개를 얻기까지 남은 시간 (초)"""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class ScheduledJob:
+    """스케줄러 대기 작업"""
+
+    def __init__(self, fn, priority, key):
+        self.fn = fn
+        self.priority = priority
+        self.key = key
+        self.future = Future()
+        self.waiters = 1
+        self.enqueued_at = time.monotonic()
+        self.wait_ms = None
+
+    def info(self, queue_depth):
+        return {
+            'wait_ms': round(self.wait_ms or 0.0, 1),
+            'queue_depth': queue_depth,
+            'merged': self.waiters > 1,
+        }
+
+
+class TrScheduler:
+    """
+    우선순위 TR 스케줄러
+    fn(future)는 스케줄러 스레드에서 호출되며 future를 넘겨받아 나중에 완료하거나
+    (이 경우 future를 반환) 결과값을 바로 반환합니다.
+    """
+
+    def __init__(self, rate=5.0, burst=5, hourly_limit=1000):
+        self._second = TokenBucket(rate, burst)
+        self._hourly = TokenBucket(hourly_limit / 3600.0, hourly_limit)
+        self._heap = []
+        self._by_key = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        self.dispatched = 0
+        self.merged = 0
+        self.total_wait_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='tr-scheduler', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, priority=PRIORITY_QUERY, key=None):
+        """작업 등록 - 같은 key의 작업이 대기중이면 병합 (취소/완료된 작업에는 병합하지 않음)"""
+        with self._cond:
+            job = self._by_key.get(key) if key is not None else None
+            if job is not None and not job.future.done():
+                job.waiters += 1
+                self.merged += 1
+                return job
+
+            job = ScheduledJob(fn, priority, key)
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            if key is not None:
+                self._by_key[key] = job
+            self._cond.notify()
+            return job
+
+    def abandon(self, job):
+        """
+        대기자가 없어진 작업은 실행 전이면 취소
+        취소한 작업은 병합 대상에서 빼고, 힙에 남은 항목은 실행 차례에 버립니다.
+        """
+        with self._cond:
+            job.waiters -= 1
+            if job.waiters <= 0 and job.future.cancel():
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+                self._cond.notify()
+
+    def queue_depth(self):
+        with self._cond:
+            return sum(1 for _, _, job in self._heap if not job.future.cancelled())
+
+    def stats(self):
+        with self._cond:
+            pending = [job for _, _, job in self._heap if not job.future.cancelled()]
+            depth = len(pending)
+            orders = sum(1 for job in pending if job.priority == PRIORITY_ORDER)
+        return {
+            'queue_depth': depth,
+            'pending_orders': orders,
+            'pending_queries': depth - orders,
+            'dispatched': self.dispatched,
+            'merged': self.merged,
+            'avg_wait_ms': round(self.total_wait_ms / self.dispatched, 1) if self.dispatched else 0.0,
+        }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+
+                priority, _, job = self._heap[0]
+                if job.future.cancelled():
+                    # 취소된 작업은 토큰을 기다리지 않고 바로 버림
+                    heapq.heappop(self._heap)
+                    continue
+                wait = self._second.wait_time()
+                if priority != PRIORITY_ORDER:
+                    # 시간당 상한은 조회에만 적용
+                    wait = max(wait, self._hourly.wait_time())
+                if wait > 0:
+                    # 대기 중 더 높은 우선순위 작업이 들어오면 깨어나서 다시 선택
+                    self._cond.wait(wait)
+                    continue
+
+                heapq.heappop(self._heap)
+                if job.key is not None and self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+
+                self._second.consume()
+                if priority != PRIORITY_ORDER:
+                    self._hourly.consume()
+                job.wait_ms = (time.monotonic() - job.enqueued_at) * 1000
+                self.dispatched += 1
+                self.total_wait_ms += job.wait_ms
+
+            self._execute(job)
+
+    def _execute(self, job):
+        try:
+            result = job.fn(job.future)
+        except Exception as e:
+            logger.error("스케줄 작업 실패: %s", e)
+            if not job.future.done():
+                job.future.set_exception(e)
+            return
+        # fn이 future를 직접 완료하는 경우 (TR 응답 대기) 반환값은 같은 future
+        if result is not job.future and not job.future.done():
+            job.future.set_result(result)
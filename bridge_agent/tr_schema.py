@@ -0,0 +1,234 @@
+"""
+TR 스키마 레지스트리
+TR별 입력값/출력 필드와 타입을 선언해 두고, 응답은 미리 컴파일한 (필드명, 변환함수) 목록을
+한 번 순회해 디코딩합니다. 새 TR은 TrSchema 선언만 추가하면 됩니다.
+
+필드 선언: (키, 키움 항목명, 타입)
+    str   - 공백 제거
+    code  - 종목코드 ('A005930' -> '005930')
+    int   - 부호 있는 정수 (전일대비, 평가손익 등)
+    abs   - 부호 제거 정수 (가격: 키움은 하락 시 '-' 부호를 붙여 보냄)
+    float - 실수 (등락율, 수익률)
+"""
+
+
+def _to_int(value):
+    value = value.strip()
+    return int(value) if value else 0
+
+
+def _to_abs(value):
+    value = value.strip()
+    return abs(int(value)) if value else 0
+
+
+def _to_float(value):
+    value = value.strip()
+    return float(value) if value else 0.0
+
+
+def _to_code(value):
+    return value.strip().lstrip('A')
+
+
+CONVERTERS = {
+    'str': str.strip,
+    'code': _to_code,
+    'int': _to_int,
+    'abs': _to_abs,
+    'float': _to_float,
+}
+
+
+class TrSchema:
+    """TR 선언 (입력값 기본값, 싱글/멀티 출력 필드)"""
+
+    def __init__(self, tr_code, rq_name, inputs=(), single=(), multi=()):
+        self.tr_code = tr_code
+        self.rq_name = rq_name
+        # 입력: (키, 키움 입력명, 기본값) - 기본값이 None이면 필수
+        self.inputs = tuple(inputs)
+        self.single = tuple(single)
+        self.multi = tuple(multi)
+        self.single_keys = tuple(key for key, _, _ in self.single)
+        self.multi_keys = tuple(key for key, _, _ in self.multi)
+        self._single = tuple((name, CONVERTERS[kind]) for _, name, kind in self.single)
+        self._multi = tuple((name, CONVERTERS[kind]) for _, name, kind in self.multi)
+
+    def input_values(self, **values):
+        """키 -> 키움 입력명 매핑 (기본값 적용)"""
+        result = {}
+        for key, name, default in self.inputs:
+            value = values.get(key, default)
+            if value is None:
+                raise ValueError(f'{self.tr_code} 입력값 누락: {key}')
+            result[name] = value
+        return result
+
+    def decode_single(self, ocx, rq_name):
+        get, tr_code = ocx.GetCommData, self.tr_code
+        values = [convert(get(tr_code, rq_name, 0, name)) for name, convert in self._single]
+        return dict(zip(self.single_keys, values))
+
+    def decode_rows(self, ocx, rq_name):
+        """멀티데이터 -> 필드 순서의 튜플 목록"""
+        get, tr_code, fields = ocx.GetCommData, self.tr_code, self._multi
+        return [
+            tuple(convert(get(tr_code, rq_name, i, name)) for name, convert in fields)
+            for i in range(ocx.GetRepeatCnt(tr_code, rq_name))
+        ]
+
+    def row_dicts(self, rows):
+        keys = self.multi_keys
+        return [dict(zip(keys, row)) for row in rows]
+
+    def decoder(self, ocx):
+        """TrRequestEngine용 디코더 - {'single', 'rows', 'next'}"""
+        def decode(rq_name, tr_code, prev_next):
+            return {
+                'single': self.decode_single(ocx, rq_name) if self._single else {},
+                'rows': self.decode_rows(ocx, rq_name) if self._multi else [],
+                'next': str(prev_next).strip() == '2',
+            }
+        return decode
+
+
+TR_SCHEMAS = {}
+
+
+def register(schema):
+    TR_SCHEMAS[schema.tr_code] = schema
+    return schema
+
+
+def get_schema(tr_code):
+    return TR_SCHEMAS[tr_code]
+
+
+# ===== 시세 =====
+
+register(TrSchema(
+    'opt10001', '주식기본정보요청',
+    inputs=[('stock_code', '종목코드', None)],
+    single=[
+        ('stock_code', '종목코드', 'code'),
+        ('stock_name', '종목명', 'str'),
+        ('current_price', '현재가', 'abs'),
+        ('open_price', '시가', 'abs'),
+        ('high_price', '고가', 'abs'),
+        ('low_price', '저가', 'abs'),
+        ('prev_close', '기준가', 'abs'),
+        ('upper_limit', '상한가', 'abs'),
+        ('lower_limit', '하한가', 'abs'),
+        ('change', '전일대비', 'int'),
+        ('change_rate', '등락율', 'float'),
+        ('volume', '거래량', 'abs'),
+    ],
+))
+
+# CommKwRqData 응답 (입력값 없음)
+register(TrSchema(
+    'OPTKWFID', '관심종목정보요청',
+    multi=[
+        ('stock_code', '종목코드', 'code'),
+        ('stock_name', '종목명', 'str'),
+        ('current_price', '현재가', 'abs'),
+        ('open_price', '시가', 'abs'),
+        ('high_price', '고가', 'abs'),
+        ('low_price', '저가', 'abs'),
+        ('prev_close', '기준가', 'abs'),
+        ('change', '전일대비', 'int'),
+        ('change_rate', '등락율', 'float'),
+        ('volume', '거래량', 'abs'),
+    ],
+))
+
+register(TrSchema(
+    'opt10081', '주식일봉차트조회요청',
+    inputs=[
+        ('stock_code', '종목코드', None),
+        ('base_date', '기준일자', None),
+        ('adjusted', '수정주가구분', '1'),
+    ],
+    multi=[
+        ('time', '일자', 'str'),
+        ('open', '시가', 'abs'),
+        ('high', '고가', 'abs'),
+        ('low', '저가', 'abs'),
+        ('close', '현재가', 'abs'),
+        ('volume', '거래량', 'abs'),
+    ],
+))
+
+register(TrSchema(
+    'opt10080', '주식분봉차트조회요청',
+    inputs=[
+        ('stock_code', '종목코드', None),
+        ('tick_range', '틱범위', None),
+        ('adjusted', '수정주가구분', '1'),
+    ],
+    multi=[
+        ('time', '체결시간', 'str'),
+        ('open', '시가', 'abs'),
+        ('high', '고가', 'abs'),
+        ('low', '저가', 'abs'),
+        ('close', '현재가', 'abs'),
+        ('volume', '거래량', 'abs'),
+    ],
+))
+
+# ===== 계좌 =====
+
+register(TrSchema(
+    'opw00018', '계좌평가잔고내역요청',
+    inputs=[
+        ('account_no', '계좌번호', None),
+        ('password', '비밀번호', ''),
+        ('password_media', '비밀번호입력매체구분', '00'),
+        ('query_type', '조회구분', '1'),
+    ],
+    single=[
+        ('total_purchase', '총매입금액', 'int'),
+        ('total_eval', '총평가금액', 'int'),
+        ('total_profit', '총평가손익금액', 'int'),
+        ('total_profit_rate', '총수익률(%)', 'float'),
+        ('estimated_assets', '추정예탁자산', 'int'),
+    ],
+    multi=[
+        ('stock_code', '종목번호', 'code'),
+        ('stock_name', '종목명', 'str'),
+        ('quantity', '보유수량', 'int'),
+        ('tradable_quantity', '매매가능수량', 'int'),
+        ('avg_price', '매입가', 'int'),
+        ('current_price', '현재가', 'abs'),
+        ('purchase_amount', '매입금액', 'int'),
+        ('eval_amount', '평가금액', 'int'),
+        ('profit_amount', '평가손익', 'int'),
+        ('profit_rate', '수익률(%)', 'float'),
+    ],
+))
+
+register(TrSchema(
+    'opt10075', '미체결요청',
+    inputs=[
+        ('account_no', '계좌번호', None),
+        ('all_stocks', '전체종목구분', '0'),
+        ('trade_type', '매매구분', '0'),
+        ('stock_code', '종목코드', ''),
+        ('fill_type', '체결구분', '1'),
+    ],
+    multi=[
+        ('order_no', '주문번호', 'str'),
+        ('stock_code', '종목코드', 'code'),
+        ('stock_name', '종목명', 'str'),
+        ('order_status', '주문상태', 'str'),
+        ('order_type', '주문구분', 'str'),
+        ('quantity', '주문수량', 'int'),
+        ('price', '주문가격', 'int'),
+        ('unfilled_quantity', '미체결수량', 'int'),
+        ('filled_quantity', '체결량', 'int'),
+        ('filled_price', '체결가', 'abs'),
+        ('original_order_no', '원주문번호', 'str'),
+        ('ordered_at', '시간', 'str'),
+    ],
+))
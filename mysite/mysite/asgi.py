@@ -3,6 +3,9 @@ ASGI config for mysite project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+브릿지 호출을 동시에 보내는 비동기 뷰(stock.views의 async 뷰)는 ASGI 서버에서 실행해야
+작업 스레드를 점유하지 않습니다. 예: uvicorn mysite.asgi:application --workers 2
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
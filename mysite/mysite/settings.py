@@ -48,6 +48,38 @@ KIWOOM_ACCOUNT_NO = os.environ.get('KIWOOM_ACCOUNT_NO', '')
 # Windows 브릿지 에이전트 URL
 KIWOOM_BRIDGE_URL = os.environ.get('KIWOOM_BRIDGE_URL', 'http://localhost:5000')
 
+# 브릿지 HTTP 연결: 연결/읽기 타임아웃(초), 커넥션 풀 크기 (Django 작업 스레드 수 이상 권장)
+KIWOOM_BRIDGE_CONNECT_TIMEOUT = float(os.environ.get('KIWOOM_BRIDGE_CONNECT_TIMEOUT', '3'))
+KIWOOM_BRIDGE_READ_TIMEOUT = float(os.environ.get('KIWOOM_BRIDGE_READ_TIMEOUT', '10'))
+KIWOOM_BRIDGE_POOL_SIZE = int(os.environ.get('KIWOOM_BRIDGE_POOL_SIZE', '20'))
+# 비동기 뷰 한 요청이 동시에 보내는 브릿지 호출 수
+KIWOOM_BRIDGE_ASYNC_CONCURRENCY = int(os.environ.get('KIWOOM_BRIDGE_ASYNC_CONCURRENCY', '8'))
+
+# 처리한 브릿지 이벤트ID 보관 기간 (중복 수신 방지용, 일)
+BRIDGE_EVENT_RETENTION_DAYS = int(os.environ.get('BRIDGE_EVENT_RETENTION_DAYS', '7'))
+
+# 주문 전송 속도 (건/초, 프로세스 전체, 키움 주문 제한 초당 5건 이하)
+KIWOOM_ORDER_RATE = float(os.environ.get('KIWOOM_ORDER_RATE', '4'))
+
+# 조건검색 초기편입 작업이 결과 콜백을 기다리는 최대 시간(초) - 지나면 실패 처리
+CONDITION_JOB_TIMEOUT = float(os.environ.get('CONDITION_JOB_TIMEOUT', '60'))
+
+# 종목코드 캐시 최대 종목 수 (KOSPI+KOSDAQ 전체가 들어가는 크기)
+STOCK_RESOLVER_SIZE = int(os.environ.get('STOCK_RESOLVER_SIZE', '5000'))
+# 찾지 못한 종목코드를 다시 조회하지 않는 시간(초)
+STOCK_RESOLVER_MISS_TTL = float(os.environ.get('STOCK_RESOLVER_MISS_TTL', '60'))
+
+# 활성 매매설정 캐시 최대 보관 시간(초) - 공유 캐시가 없을 때 다른 프로세스의 변경이 반영되는 최대 지연
+ACTIVE_CONFIG_CACHE_TTL = float(os.environ.get('ACTIVE_CONFIG_CACHE_TTL', '30'))
+
+# 캐시 (매매설정 캐시 버전값 공유용) - 여러 워커로 운영하면 Redis/Memcached 등 공유 백엔드 지정
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+
 
 # Application definition
 
@@ -95,6 +127,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'mysite.wsgi.application'
+ASGI_APPLICATION = 'mysite.asgi.application'
 
 
 # Database
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
-    Stock, StockPrice, TradingConfig, ConditionSearch,
-    ConditionMatch, Order, Balance, TradeHistory
+    Stock, StockPrice, Candle, TradingConfig, ConditionSearch,
+    ConditionMatch, ConditionJob, Order, Balance, TradeHistory, BridgeEvent
 )
 
 
@@ -18,6 +18,13 @@ class StockPriceAdmin(admin.ModelAdmin):
     list_filter = ['stock__market']
 
 
+@admin.register(Candle)
+class CandleAdmin(admin.ModelAdmin):
+    list_display = ['stock', 'interval', 'time', 'close_price', 'volume']
+    list_filter = ['interval']
+    search_fields = ['stock__code', 'stock__name']
+
+
 @admin.register(TradingConfig)
 class TradingConfigAdmin(admin.ModelAdmin):
     list_display = ['name', 'trade_mode', 'account_no', 'is_active', 'max_buy_amount', 'max_buy_per_stock']
@@ -37,6 +44,12 @@ class ConditionMatchAdmin(admin.ModelAdmin):
     search_fields = ['stock__code', 'stock__name']
 
 
+@admin.register(ConditionJob)
+class ConditionJobAdmin(admin.ModelAdmin):
+    list_display = ['condition', 'status', 'total', 'matched', 'ordered', 'skipped', 'failed', 'created_at', 'finished_at']
+    list_filter = ['status', 'condition']
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ['stock', 'order_type', 'quantity', 'price', 'status', 'trade_mode', 'created_at']
@@ -55,3 +68,10 @@ class TradeHistoryAdmin(admin.ModelAdmin):
     list_display = ['stock', 'order_type', 'quantity', 'price', 'total_amount', 'trade_mode', 'traded_at']
     list_filter = ['order_type', 'trade_mode']
     search_fields = ['stock__code', 'stock__name']
+
+
+@admin.register(BridgeEvent)
+class BridgeEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'event_type', 'boot_id', 'seq', 'processed_at']
+    list_filter = ['event_type']
+    search_fields = ['event_id']
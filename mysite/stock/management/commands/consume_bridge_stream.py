@@ -0,0 +1,129 @@
+"""
+브릿지 이벤트 스트림 컨슈머
+브릿지의 /api/stream/events 에 장기 연결을 유지하며 이벤트를 순서대로 처리하고 ack를 보냅니다.
+연결이 없는 동안 브릿지는 기존 콜백 API(POST)로 이벤트를 전달합니다.
+
+사용법:
+    python manage.py consume_bridge_stream
+"""
+import json
+import time
+import logging
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from stock.services import BridgeEventService, get_active_config, stock_resolver
+
+logger = logging.getLogger(__name__)
+
+
+class EventHandlingError(Exception):
+    """이벤트 처리 중 예외 (DB 오류 등) - ack하지 않고 재접속해 다시 받음"""
+
+
+class Command(BaseCommand):
+    help = '브릿지 이벤트 스트림을 구독하여 체결/조건검색/시세 이벤트를 처리합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ack-interval', type=float, default=0.5, help='ack 전송 주기 (초)')
+        parser.add_argument('--reconnect-delay', type=float, default=2.0, help='재접속 대기 (초)')
+        parser.add_argument(
+            '--max-retries', type=int, default=5,
+            help='처리 중 예외가 난 이벤트 재시도 횟수 (넘으면 로그만 남기고 건너뜀)',
+        )
+
+    def handle(self, *args, **options):
+        bridge_url = settings.KIWOOM_BRIDGE_URL
+        self.ack_session = requests.Session()
+        self.last_seq = 0
+        self.acked_seq = 0
+        self.max_retries = options['max_retries']
+        self.failures = {}   # seq -> 연속 처리 실패 횟수
+
+        self.stdout.write(f"브릿지 이벤트 스트림 구독: {bridge_url}")
+        self.stdout.write(f"종목코드 캐시 적재: {stock_resolver.warm()}종목")
+        while True:
+            pruned = BridgeEventService.prune()
+            if pruned:
+                logger.info("보관 기간이 지난 브릿지 이벤트 기록 %d건 삭제", pruned)
+            try:
+                self._consume(bridge_url, options['ack_interval'])
+            except requests.RequestException as e:
+                logger.error("이벤트 스트림 연결 끊김: %s", e)
+            except EventHandlingError:
+                # 마지막 ack 지점부터 다시 받음 (이미 반영한 이벤트는 이벤트ID로 중복 처리되지 않음)
+                self.last_seq = self.acked_seq
+            finally:
+                close_old_connections()
+            time.sleep(options['reconnect_delay'])
+
+    def _consume(self, bridge_url, ack_interval):
+        with requests.get(
+            f"{bridge_url}/api/stream/events",
+            params={'after': self.last_seq},
+            stream=True,
+            timeout=(3, 30),  # 브릿지 heartbeat(5초)보다 긴 읽기 타임아웃
+        ) as response:
+            response.raise_for_status()
+            logger.info("이벤트 스트림 연결됨 (after=%d)", self.last_seq)
+
+            last_ack_at = time.monotonic()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = json.loads(line)
+
+                if event['type'] != 'heartbeat':
+                    try:
+                        self._handle_event(event)
+                    except EventHandlingError:
+                        # 앞서 처리한 이벤트까지만 ack
+                        try:
+                            self._ack(bridge_url)
+                        except requests.RequestException:
+                            pass
+                        raise
+                    self.last_seq = event['seq']
+
+                if time.monotonic() - last_ack_at >= ack_interval or event['type'] == 'heartbeat':
+                    self._ack(bridge_url)
+                    last_ack_at = time.monotonic()
+
+    def _handle_event(self, event):
+        close_old_connections()
+        config = get_active_config()
+        try:
+            result = BridgeEventService(config).handle(event['type'], event['payload'], event_id=event.get('id'))
+        except Exception as e:
+            # 일시적 오류일 수 있으므로 ack하지 않음 (POST 경로의 500 -> 재전송과 같게)
+            failures = self.failures.pop(event['seq'], 0) + 1
+            if failures <= self.max_retries:
+                logger.exception(
+                    "브릿지 이벤트 처리 오류 (%d/%d): seq=%s type=%s",
+                    failures, self.max_retries, event['seq'], event['type'],
+                )
+                self.failures = {event['seq']: failures}
+                raise EventHandlingError(event['seq']) from e
+            logger.exception(
+                "브릿지 이벤트 처리 재시도 초과 - 건너뜀: seq=%s type=%s payload=%s",
+                event['seq'], event['type'], event['payload'],
+            )
+            return
+        self.failures.pop(event['seq'], None)
+        if not result['success']:
+            # 검증 실패 등 재시도해도 같은 결과인 이벤트는 ack하고 넘어감
+            logger.warning(
+                "브릿지 이벤트 처리 실패: seq=%s type=%s - %s",
+                event['seq'], event['type'], result.get('error'),
+            )
+
+    def _ack(self, bridge_url):
+        if self.last_seq <= self.acked_seq:
+            return
+        self.ack_session.post(
+            f"{bridge_url}/api/stream/ack", json={'seq': self.last_seq}, timeout=(3, 10)
+        )
+        self.acked_seq = self.last_seq
@@ -0,0 +1,65 @@
+"""
+종목 마스터 동기화
+브릿지의 KOSPI/KOSDAQ 종목 마스터를 Stock 테이블에 일괄 반영합니다.
+
+사용법:
+    python manage.py sync_stock_master                  # 1회 실행 (cron/작업 스케줄러용)
+    python manage.py sync_stock_master --market KOSDAQ
+    python manage.py sync_stock_master --daily 08:30    # 상주하며 매일 지정 시각에 실행
+"""
+import time
+import logging
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from stock.services import StockMasterService, get_active_config
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = '브릿지 종목 마스터(KOSPI/KOSDAQ)를 종목 테이블에 일괄 반영합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--market', choices=['KOSPI', 'KOSDAQ'], help='시장 (생략 시 전체)')
+        parser.add_argument('--daily', metavar='HH:MM', help='매일 지정 시각에 반복 실행')
+        parser.add_argument('--retry-delay', type=float, default=300.0, help='실패 시 재시도 대기 (초, --daily)')
+
+    def handle(self, *args, **options):
+        if not options['daily']:
+            result = self._sync(options['market'])
+            if not result['success']:
+                raise CommandError(result['error'])
+            return
+
+        try:
+            at = datetime.strptime(options['daily'], '%H:%M').time()
+        except ValueError:
+            raise CommandError('--daily는 HH:MM 형식이어야 합니다.')
+
+        self.stdout.write(f"종목 마스터 일일 동기화: 매일 {at:%H:%M}")
+        while True:
+            now = datetime.now()
+            due = datetime.combine(now.date(), at)
+            if due <= now:
+                due += timedelta(days=1)
+            time.sleep((due - now).total_seconds())
+
+            # 브릿지 로그인/마스터 로드 전이면 성공할 때까지 재시도 (당일 안에서)
+            while not self._sync(options['market'])['success'] and datetime.now().date() == due.date():
+                time.sleep(options['retry_delay'])
+            close_old_connections()
+
+    def _sync(self, market):
+        result = StockMasterService(get_active_config()).sync(market)
+        if result['success']:
+            data = result['data']
+            self.stdout.write(
+                f"종목 마스터 동기화 완료 ({data['trading_day']}): 전체 {data['total']}, "
+                f"신규 {data['created']}, 갱신 {data['updated']}, 비활성화 {data['deactivated']}"
+            )
+        else:
+            logger.error("종목 마스터 동기화 실패: %s", result['error'])
+        return result
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.13 on 2026-10-17 00:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Candle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interval', models.CharField(choices=[('day', '일봉'), ('m1', '1분봉'), ('m3', '3분봉'), ('m5', '5분봉'), ('m10', '10분봉'), ('m15', '15분봉'), ('m30', '30분봉'), ('m45', '45분봉'), ('m60', '60분봉')], max_length=5, verbose_name='주기')),
+                ('time', models.DateTimeField(verbose_name='시각')),
+                ('open_price', models.IntegerField(verbose_name='시가')),
+                ('high_price', models.IntegerField(verbose_name='고가')),
+                ('low_price', models.IntegerField(verbose_name='저가')),
+                ('close_price', models.IntegerField(verbose_name='종가')),
+                ('volume', models.BigIntegerField(default=0, verbose_name='거래량')),
+                ('stock', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candles', to='stock.stock', verbose_name='종목')),
+            ],
+            options={
+                'verbose_name': '캔들',
+                'verbose_name_plural': '캔들 목록',
+                'ordering': ['time'],
+                'unique_together': {('stock', 'interval', 'time')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.13 on 2026-10-17 00:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0002_candle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BridgeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=40, unique=True, verbose_name='이벤트ID')),
+                ('event_type', models.CharField(max_length=30, verbose_name='이벤트타입')),
+                ('boot_id', models.BigIntegerField(default=0, verbose_name='브릿지 기동ID')),
+                ('seq', models.BigIntegerField(default=0, verbose_name='순번')),
+                ('processed_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='처리시각')),
+            ],
+            options={
+                'verbose_name': '브릿지 이벤트',
+                'verbose_name_plural': '브릿지 이벤트 목록',
+                'ordering': ['boot_id', 'seq'],
+            },
+        ),
+    ]
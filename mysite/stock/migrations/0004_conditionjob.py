@@ -0,0 +1,35 @@
+# Generated by Django 5.0.13 on 2026-10-17 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stock', '0003_bridgeevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConditionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', '대기'), ('running', '처리중'), ('done', '완료'), ('failed', '실패')], default='pending', max_length=10, verbose_name='상태')),
+                ('total', models.IntegerField(default=0, verbose_name='편입종목수')),
+                ('matched', models.IntegerField(default=0, verbose_name='기록종목수')),
+                ('ordered', models.IntegerField(default=0, verbose_name='주문수')),
+                ('skipped', models.IntegerField(default=0, verbose_name='매수스킵수')),
+                ('failed', models.IntegerField(default=0, verbose_name='주문실패수')),
+                ('error', models.TextField(blank=True, verbose_name='오류')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='완료시각')),
+                ('condition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='stock.conditionsearch', verbose_name='조건검색식')),
+            ],
+            options={
+                'verbose_name': '조건검색 초기편입 작업',
+                'verbose_name_plural': '조건검색 초기편입 작업 목록',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -45,6 +45,39 @@ class StockPrice(models.Model):
         return f"{self.stock.name} - {self.current_price}원"
 
 
+class Candle(models.Model):
+    """과거 캔들 (일봉/분봉)"""
+    INTERVAL_CHOICES = [
+        ('day', '일봉'),
+        ('m1', '1분봉'),
+        ('m3', '3분봉'),
+        ('m5', '5분봉'),
+        ('m10', '10분봉'),
+        ('m15', '15분봉'),
+        ('m30', '30분봉'),
+        ('m45', '45분봉'),
+        ('m60', '60분봉'),
+    ]
+
+    stock = models.ForeignKey(Stock, on_delete=models.CASCADE, related_name='candles', verbose_name='종목')
+    interval = models.CharField('주기', max_length=5, choices=INTERVAL_CHOICES)
+    time = models.DateTimeField('시각')
+    open_price = models.IntegerField('시가')
+    high_price = models.IntegerField('고가')
+    low_price = models.IntegerField('저가')
+    close_price = models.IntegerField('종가')
+    volume = models.BigIntegerField('거래량', default=0)
+
+    class Meta:
+        verbose_name = '캔들'
+        verbose_name_plural = '캔들 목록'
+        ordering = ['time']
+        unique_together = ['stock', 'interval', 'time']
+
+    def __str__(self):
+        return f"{self.stock.name} {self.get_interval_display()} {self.time:%Y-%m-%d %H:%M}"
+
+
 class TradingConfig(models.Model):
     """매매 설정 (모의/실투자 전환)"""
     MODE_CHOICES = [
@@ -128,6 +161,42 @@ class ConditionMatch(models.Model):
         return f"{self.condition.condition_name} - {self.stock.name} ({self.get_match_type_display()})"
 
 
+class ConditionJob(models.Model):
+    """
+    조건검색 초기 편입 처리 작업
+    조건검색 요청 전에 대기 상태로 만들고, 브릿지의 조건검색 결과 일괄 콜백이 오면 편입 종목 수를 기록한 뒤
+    자동매매면 백그라운드에서 매수합니다. 결과가 CONDITION_JOB_TIMEOUT초 안에 오지 않으면 실패 처리합니다.
+    """
+    STATUS_CHOICES = [
+        ('pending', '대기'),
+        ('running', '처리중'),
+        ('done', '완료'),
+        ('failed', '실패'),
+    ]
+
+    condition = models.ForeignKey(
+        ConditionSearch, on_delete=models.CASCADE,
+        related_name='jobs', verbose_name='조건검색식'
+    )
+    status = models.CharField('상태', max_length=10, choices=STATUS_CHOICES, default='pending')
+    total = models.IntegerField('편입종목수', default=0)
+    matched = models.IntegerField('기록종목수', default=0)
+    ordered = models.IntegerField('주문수', default=0)
+    skipped = models.IntegerField('매수스킵수', default=0)
+    failed = models.IntegerField('주문실패수', default=0)
+    error = models.TextField('오류', blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField('완료시각', null=True, blank=True)
+
+    class Meta:
+        verbose_name = '조건검색 초기편입 작업'
+        verbose_name_plural = '조건검색 초기편입 작업 목록'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.condition.condition_name} 초기편입 {self.matched}/{self.total} ({self.get_status_display()})"
+
+
 class Order(models.Model):
     """주문"""
     ORDER_TYPE_CHOICES = [
@@ -194,6 +263,18 @@ class Balance(models.Model):
     def __str__(self):
         return f"{self.stock.name} {self.quantity}주 (수익률: {self.profit_rate}%)"
 
+    def revalue(self, current_price):
+        """현재가 반영 및 평가손익 재계산 (저장은 호출측에서)"""
+        self.current_price = current_price
+        if self.avg_price > 0 and self.quantity > 0:
+            self.profit_rate = round(
+                ((self.current_price - self.avg_price) / self.avg_price) * 100, 2
+            )
+            self.profit_amount = (self.current_price - self.avg_price) * self.quantity
+        else:
+            self.profit_rate = 0
+            self.profit_amount = 0
+
 
 class TradeHistory(models.Model):
     """체결내역"""
@@ -213,3 +294,32 @@ class TradeHistory(models.Model):
 
     def __str__(self):
         return f"{self.stock.name} {self.order_type} {self.quantity}주 @ {self.price}원"
+
+
+class BridgeEvent(models.Model):
+    """
+    처리한 브릿지 이벤트 (중복 수신 방지)
+    event_id는 브릿지 기동 ID와 기동 내 순번 ('<boot_id>-<seq>')으로, 스풀 재전송/스트림→POST 전환 시에도 유지됩니다.
+    이벤트 처리와 같은 트랜잭션에서 기록하므로 처리에 실패한 이벤트는 남지 않고 재시도됩니다.
+    """
+    event_id = models.CharField('이벤트ID', max_length=40, unique=True)
+    event_type = models.CharField('이벤트타입', max_length=30)
+    boot_id = models.BigIntegerField('브릿지 기동ID', default=0)
+    seq = models.BigIntegerField('순번', default=0)
+    processed_at = models.DateTimeField('처리시각', auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = '브릿지 이벤트'
+        verbose_name_plural = '브릿지 이벤트 목록'
+        ordering = ['boot_id', 'seq']
+
+    def __str__(self):
+        return f"{self.event_type} {self.event_id}"
+
+    @staticmethod
+    def parse_id(event_id):
+        """'<boot_id>-<seq>' -> (boot_id, seq), 형식이 다르면 (0, 0)"""
+        boot_id, _, seq = (event_id or '').partition('-')
+        if boot_id.isdigit() and seq.isdigit():
+            return int(boot_id), int(seq)
+        return 0, 0
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import (
-    Stock, StockPrice, TradingConfig, ConditionSearch,
-    ConditionMatch, Order, Balance, TradeHistory
+    Stock, StockPrice, Candle, TradingConfig, ConditionSearch,
+    ConditionMatch, ConditionJob, Order, Balance, TradeHistory
 )
 
 
@@ -22,6 +22,23 @@ class StockPriceSerializer(serializers.ModelSerializer):
         ]
 
 
+class CandleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Candle
+        fields = [
+            'time', 'open_price', 'high_price', 'low_price', 'close_price', 'volume'
+        ]
+
+
+class CandleQuerySerializer(serializers.Serializer):
+    """캔들 조회 파라미터"""
+    interval = serializers.ChoiceField(
+        choices=['day', '1', '3', '5', '10', '15', '30', '45', '60'], default='day'
+    )
+    start = serializers.RegexField(r'^\d{8}(\d{6})?$', required=False)
+    sync = serializers.BooleanField(default=True)
+
+
 class TradingConfigSerializer(serializers.ModelSerializer):
     mode_display = serializers.CharField(source='get_trade_mode_display', read_only=True)
 
@@ -68,6 +85,19 @@ class ConditionMatchSerializer(serializers.ModelSerializer):
         fields = ['id', 'condition', 'stock', 'match_type', 'match_type_display', 'matched_at']
 
 
+class ConditionJobSerializer(serializers.ModelSerializer):
+    condition_name = serializers.CharField(source='condition.condition_name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = ConditionJob
+        fields = [
+            'id', 'condition', 'condition_name', 'status', 'status_display',
+            'total', 'matched', 'ordered', 'skipped', 'failed', 'error',
+            'created_at', 'finished_at'
+        ]
+
+
 class OrderSerializer(serializers.ModelSerializer):
     stock = StockSerializer(read_only=True)
     order_type_display = serializers.CharField(source='get_order_type_display', read_only=True)
@@ -115,17 +145,67 @@ class TradeHistorySerializer(serializers.ModelSerializer):
 
 
 class ConditionMatchCallbackSerializer(serializers.Serializer):
-    """브릿지에서 조건검색 편입/이탈 콜백"""
-    condition_id = serializers.IntegerField()
+    """브릿지에서 조건검색 편입/이탈 콜백 (조건식은 키움 조건식인덱스 + 조건식명)"""
+    condition_index = serializers.IntegerField()
+    condition_name = serializers.CharField(max_length=200, required=False, allow_blank=True)
     stock_code = serializers.CharField(max_length=10)
     match_type = serializers.ChoiceField(choices=['I', 'D'])
 
 
+class ConditionMatchBulkCallbackSerializer(serializers.Serializer):
+    """브릿지에서 조건검색 결과 일괄 콜백 (연속조회 병합 결과)"""
+    condition_index = serializers.IntegerField()
+    condition_name = serializers.CharField(max_length=200, required=False, allow_blank=True)
+    stock_codes = serializers.ListField(
+        child=serializers.CharField(max_length=10), allow_empty=True
+    )
+    match_type = serializers.ChoiceField(choices=['I', 'D'], default='I')
+    job_id = serializers.IntegerField(required=False, allow_null=True)
+
+
 class OrderFilledCallbackSerializer(serializers.Serializer):
-    """브릿지에서 체결 콜백"""
+    """브릿지에서 체결 콜백 (같은 주문의 연속 체결은 합계 수량 / 가중평균 단가로 병합됨)"""
     order_no = serializers.CharField(max_length=20)
     filled_quantity = serializers.IntegerField(min_value=1)
     filled_price = serializers.IntegerField(min_value=1)
+    cumulative_quantity = serializers.IntegerField(min_value=0, required=False)
+    unfilled_quantity = serializers.IntegerField(min_value=0, required=False)
+    executions = serializers.IntegerField(min_value=1, default=1)
+    filled_at = serializers.CharField(max_length=6, required=False, allow_blank=True)
+
+
+class OrderStatusCallbackSerializer(serializers.Serializer):
+    """브릿지에서 주문상태 콜백 (접수 / 취소확인 / 거부)"""
+    order_no = serializers.CharField(max_length=20)
+    original_order_no = serializers.CharField(max_length=20, required=False, allow_blank=True)
+    status = serializers.ChoiceField(choices=['submitted', 'cancelled', 'rejected'])
+    unfilled_quantity = serializers.IntegerField(min_value=0, required=False)
+
+
+class BalanceCallbackSerializer(serializers.Serializer):
+    """브릿지에서 잔고변경 콜백 (종목별 최신값)"""
+    stock_code = serializers.CharField(max_length=10)
+    stock_name = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    quantity = serializers.IntegerField(min_value=0)
+    avg_price = serializers.IntegerField(min_value=0)
+    current_price = serializers.IntegerField(min_value=0, default=0)
+
+
+class TickSerializer(serializers.Serializer):
+    """실시간 체결 1건"""
+    stock_code = serializers.CharField(max_length=10)
+    current_price = serializers.IntegerField(min_value=0)
+    open_price = serializers.IntegerField(min_value=0, default=0)
+    high_price = serializers.IntegerField(min_value=0, default=0)
+    low_price = serializers.IntegerField(min_value=0, default=0)
+    prev_close = serializers.IntegerField(min_value=0, default=0)
+    volume = serializers.IntegerField(min_value=0, default=0)
+    change_rate = serializers.FloatField(default=0.0)
+
+
+class TickBatchCallbackSerializer(serializers.Serializer):
+    """브릿지에서 실시간 체결 일괄 콜백 (종목별 최신값으로 병합됨)"""
+    ticks = TickSerializer(many=True)
 
 
 class SwitchModeSerializer(serializers.Serializer):
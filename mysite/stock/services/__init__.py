@@ -1,3 +1,9 @@
+from .config_cache import get_active_config
 from .kiwoom_service import KiwoomService
+from .stock_master_service import StockMasterService, stock_resolver
+from .async_kiwoom_service import AsyncKiwoomService
 from .trading_service import TradingService
 from .condition_service import ConditionService
+from .market_data_service import MarketDataService
+from .bridge_event_service import BridgeEventService
+from .candle_service import CandleService
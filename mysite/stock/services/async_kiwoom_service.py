@@ -0,0 +1,103 @@
+"""
+비동기 키움 API 통신 서비스 (ASGI 비동기 뷰용)
+여러 브릿지 호출을 동시에 보내 전체 응답시간이 가장 느린 호출 하나에 가깝도록 합니다.
+
+HTTP 요청은 KiwoomService의 공유 keep-alive 세션을 그대로 쓰고, 커넥션 풀과 같은 크기의
+전용 스레드풀에서 실행합니다. 한 요청이 동시에 보내는 호출 수는 KIWOOM_BRIDGE_ASYNC_CONCURRENCY로 제한합니다.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from stock.models import TradingConfig
+
+from .kiwoom_service import KiwoomService
+
+# 브릿지 복수종목 조회 1회당 종목 수 (브릿지의 CommKwRqData 단위와 동일)
+QUOTE_CHUNK_SIZE = 100
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """브릿지 호출 전용 스레드풀 (커넥션 풀 크기와 같게 - 풀이 넘쳐 연결을 버리지 않도록)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.KIWOOM_BRIDGE_POOL_SIZE, thread_name_prefix='kiwoom-bridge',
+            )
+        return _executor
+
+
+class AsyncKiwoomService:
+    """키움 브릿지 비동기 클라이언트 (조회 API)"""
+
+    def __init__(self, config: TradingConfig = None, concurrency=None):
+        self.service = KiwoomService.shared(config)
+        self.concurrency = concurrency or settings.KIWOOM_BRIDGE_ASYNC_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _call(self, method, *args, **kwargs):
+        """KiwoomService 메서드 1건 실행 (동시 실행 수 제한)"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _get_executor(), functools.partial(getattr(self.service, method), *args, **kwargs),
+            )
+
+    async def gather(self, **calls):
+        """
+        이름별 코루틴을 동시에 실행 - {이름: 결과}
+        예: await client.gather(balance=client.get_balance(), orders=client.get_order_list())
+        """
+        results = await asyncio.gather(*calls.values())
+        return dict(zip(calls.keys(), results))
+
+    # ===== 접속 / 조건검색 =====
+
+    async def get_connect_state(self):
+        return await self._call('get_connect_state')
+
+    async def get_condition_list(self):
+        return await self._call('get_condition_list')
+
+    # ===== 시세 =====
+
+    async def get_stock_price(self, stock_code):
+        return await self._call('get_stock_price', stock_code)
+
+    async def get_stock_prices(self, stock_codes):
+        """
+        복수종목 현재가 조회 - 100종목 단위로 나눠 동시에 요청한 뒤 합침
+        일부 묶음이 실패하면 받은 시세와 함께 실패한 종목코드를 errors로 돌려줍니다.
+        """
+        codes = list(dict.fromkeys(stock_codes))
+        chunks = [codes[i:i + QUOTE_CHUNK_SIZE] for i in range(0, len(codes), QUOTE_CHUNK_SIZE)]
+        results = await asyncio.gather(*(self._call('get_stock_prices', chunk) for chunk in chunks))
+
+        prices, errors = [], {}
+        for chunk, result in zip(chunks, results):
+            data = result.get('data') or {}
+            error = result.get('error') or data.get('error')
+            if error:
+                errors.update(dict.fromkeys(chunk, error))
+                continue
+            prices.extend(data.get('prices', []))
+        if errors and not prices:
+            return {'success': False, 'error': next(iter(errors.values()))}
+        return {'success': True, 'data': {'prices': prices, 'errors': errors}}
+
+    async def get_candles(self, stock_code, interval='day', start=None, end=None):
+        return await self._call('get_candles', stock_code, interval=interval, start=start, end=end)
+
+    # ===== 계좌 =====
+
+    async def get_balance(self):
+        return await self._call('get_balance')
+
+    async def get_order_list(self):
+        return await self._call('get_order_list')
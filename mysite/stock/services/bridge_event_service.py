@@ -0,0 +1,132 @@
+"""
+브릿지 이벤트 처리 서비스
+이벤트 스트림과 콜백 API로 들어온 이벤트를 타입별로 검증하고 같은 서비스 경로로 처리합니다.
+이벤트ID가 있으면 처리 결과와 같은 트랜잭션에 BridgeEvent를 기록해, 브릿지가 재전송한 이벤트는
+한 번만 반영합니다.
+
+트랜잭션 안에서는 DB 반영만 하고, 자동매매 주문처럼 브릿지에 부작용이 있는 호출은
+커밋 후(transaction.on_commit) 실행합니다. 처리 중 예외로 롤백되면 주문도 나가지 않으므로
+재전송된 이벤트가 주문을 중복으로 내지 않습니다.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from stock.models import BridgeEvent
+from stock.serializers import (
+    ConditionMatchCallbackSerializer, ConditionMatchBulkCallbackSerializer,
+    OrderFilledCallbackSerializer, OrderStatusCallbackSerializer, BalanceCallbackSerializer,
+    TickBatchCallbackSerializer,
+)
+from .trading_service import TradingService
+from .condition_service import ConditionService
+from .market_data_service import MarketDataService
+
+logger = logging.getLogger(__name__)
+
+# 중복 반영 시 상태가 틀어지는 이벤트 (시세 'ticks'는 최신값 덮어쓰기라 제외)
+DEDUPE_EVENT_TYPES = {'condition-match', 'condition-match-bulk', 'order-filled', 'order-status', 'balance'}
+
+
+class BridgeEventService:
+    """브릿지 이벤트 라우터"""
+
+    def __init__(self, config=None):
+        self.config = config
+
+    def handle(self, event_type, payload, event_id=None):
+        """
+        이벤트 1건 처리 (event_id가 이미 처리된 이벤트면 건너뜀)
+        event_type: 'condition-match', 'condition-match-bulk', 'order-filled', 'order-status',
+                    'balance', 'ticks'
+        """
+        handlers = {
+            'condition-match': (ConditionMatchCallbackSerializer, self._condition_match),
+            'condition-match-bulk': (ConditionMatchBulkCallbackSerializer, self._condition_match_bulk),
+            'order-filled': (OrderFilledCallbackSerializer, self._order_filled),
+            'order-status': (OrderStatusCallbackSerializer, self._order_status),
+            'balance': (BalanceCallbackSerializer, self._balance),
+            'ticks': (TickBatchCallbackSerializer, self._ticks),
+        }
+        if event_type not in handlers:
+            return {'success': False, 'error': f'알 수 없는 이벤트 타입: {event_type}'}
+
+        serializer_class, handler = handlers[event_type]
+        serializer = serializer_class(data=payload)
+        if not serializer.is_valid():
+            return {'success': False, 'error': serializer.errors}
+        if not event_id or event_type not in DEDUPE_EVENT_TYPES:
+            return handler(serializer.validated_data)
+
+        boot_id, seq = BridgeEvent.parse_id(event_id)
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    BridgeEvent.objects.create(
+                        event_id=event_id, event_type=event_type, boot_id=boot_id, seq=seq,
+                    )
+            except IntegrityError:
+                logger.info("중복 브릿지 이벤트 무시: %s %s", event_type, event_id)
+                return {'success': True, 'data': {'event_id': event_id, 'duplicate': True}}
+
+            result = handler(serializer.validated_data)
+            if not result['success']:
+                # 처리 실패는 기록하지 않음 (재전송 시 다시 처리)
+                transaction.set_rollback(True)
+            return result
+
+    @staticmethod
+    def prune(days=None):
+        """보관 기간이 지난 처리 이벤트 기록 삭제"""
+        days = settings.BRIDGE_EVENT_RETENTION_DAYS if days is None else days
+        deleted, _ = BridgeEvent.objects.filter(
+            processed_at__lt=timezone.now() - timedelta(days=days),
+        ).delete()
+        return deleted
+
+    def _condition_match(self, data):
+        return ConditionService(self.config).process_condition_match(
+            condition_index=data['condition_index'],
+            condition_name=data.get('condition_name'),
+            stock_code=data['stock_code'],
+            match_type=data['match_type'],
+        )
+
+    def _condition_match_bulk(self, data):
+        return ConditionService(self.config).process_condition_matches(
+            condition_index=data['condition_index'],
+            condition_name=data.get('condition_name'),
+            stock_codes=data['stock_codes'],
+            match_type=data['match_type'],
+            job_id=data.get('job_id'),
+        )
+
+    def _order_filled(self, data):
+        return TradingService(self.config).process_order_filled(
+            order_no=data['order_no'],
+            filled_quantity=data['filled_quantity'],
+            filled_price=data['filled_price'],
+            cumulative_quantity=data.get('cumulative_quantity'),
+        )
+
+    def _order_status(self, data):
+        return TradingService(self.config).process_order_status(
+            order_no=data['order_no'],
+            status=data['status'],
+            original_order_no=data.get('original_order_no', ''),
+        )
+
+    def _balance(self, data):
+        return TradingService(self.config).process_balance_update(
+            stock_code=data['stock_code'],
+            quantity=data['quantity'],
+            avg_price=data['avg_price'],
+            current_price=data['current_price'],
+            stock_name=data.get('stock_name', ''),
+        )
+
+    def _ticks(self, data):
+        return MarketDataService().ingest_ticks(data['ticks'])
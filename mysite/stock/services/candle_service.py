@@ -0,0 +1,109 @@
+"""
+캔들 서비스
+브릿지에서 과거 캔들을 받아 DB에 저장 (이미 가진 마지막 봉 이후만 증분 조회, 첫 봉 이전은 요청 시 보충)
+"""
+import logging
+from datetime import datetime
+from django.utils import timezone
+from stock.models import Candle, TradingConfig
+from .kiwoom_service import KiwoomService
+
+logger = logging.getLogger(__name__)
+
+CANDLE_UPDATE_FIELDS = ['open_price', 'high_price', 'low_price', 'close_price', 'volume']
+
+
+class CandleService:
+    """과거 캔들 동기화 서비스"""
+
+    def __init__(self, config: TradingConfig = None):
+        self.kiwoom = KiwoomService.shared(config)
+
+    @staticmethod
+    def interval_key(interval):
+        """요청 주기 -> Candle.interval ('day' 또는 'm{분}')"""
+        return 'day' if str(interval) == 'day' else f'm{int(interval)}'
+
+    @staticmethod
+    def _parse_time(value):
+        fmt = '%Y%m%d' if len(value) == 8 else '%Y%m%d%H%M%S'
+        return timezone.make_aware(datetime.strptime(value, fmt))
+
+    @staticmethod
+    def _format_time(value, interval):
+        value = timezone.localtime(value)
+        return value.strftime('%Y%m%d' if interval == 'day' else '%Y%m%d%H%M%S')
+
+    def sync_candles(self, stock, interval='day', start=None):
+        """
+        캔들 증분 동기화
+        DB의 마지막 봉(미확정일 수 있으므로 포함)부터 요청해 새 봉은 추가, 기존 봉은 갱신합니다.
+        처음 받는 종목은 start(YYYYMMDD)부터, start도 없으면 브릿지 한 페이지 분량을 받습니다.
+        start가 DB의 첫 봉보다 이르면 [start, 첫 봉] 구간도 받아 과거 봉을 채웁니다.
+        """
+        key = self.interval_key(interval)
+        candles = Candle.objects.filter(stock=stock, interval=key)
+        first = candles.order_by('time').first()
+        last = candles.order_by('-time').first()
+
+        since = self._format_time(last.time, key) if last else start
+        backfill = None
+        if first and start and start < self._format_time(first.time, key):
+            backfill = start
+
+        synced = tr_count = 0
+        ranges = [(backfill, self._format_time(first.time, key))] if backfill else []
+        for range_start, range_end in ranges + [(since, None)]:
+            result = self._fetch(stock, interval, key, range_start, range_end)
+            if not result['success']:
+                return result
+            synced += result['data']['synced']
+            tr_count += result['data']['tr_count']
+
+        return {'success': True, 'data': {
+            'synced': synced,
+            'since': since,
+            'backfill': backfill,
+            'tr_count': tr_count,
+        }}
+
+    def _fetch(self, stock, interval, key, start, end=None):
+        """브릿지에서 구간 캔들을 받아 저장 (새 봉 추가, 기존 봉 갱신)"""
+        result = self.kiwoom.get_candles(stock.code, interval, start=start, end=end)
+        if not result['success']:
+            return result
+        if 'error' in result['data']:
+            return {'success': False, 'error': result['data']['error']}
+
+        candles = [
+            Candle(
+                stock=stock,
+                interval=key,
+                time=self._parse_time(c['time']),
+                open_price=c['open'],
+                high_price=c['high'],
+                low_price=c['low'],
+                close_price=c['close'],
+                volume=c['volume'],
+            )
+            for c in result['data'].get('candles', [])
+        ]
+        Candle.objects.bulk_create(
+            candles,
+            update_conflicts=True,
+            unique_fields=['stock', 'interval', 'time'],
+            update_fields=CANDLE_UPDATE_FIELDS,
+        )
+        return {'success': True, 'data': {'synced': len(candles), 'tr_count': result['data'].get('tr_count', 0)}}
+
+    def get_candles(self, stock, interval='day', start=None, sync=True):
+        """캔들 목록 (sync면 먼저 증분 동기화)"""
+        if sync:
+            result = self.sync_candles(stock, interval, start)
+            if not result['success']:
+                return result
+
+        queryset = Candle.objects.filter(stock=stock, interval=self.interval_key(interval))
+        if start:
+            queryset = queryset.filter(time__gte=self._parse_time(start))
+        return {'success': True, 'data': queryset}
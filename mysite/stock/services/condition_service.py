@@ -3,22 +3,39 @@
 조건검색식 관리, 실시간 편입/이탈 처리, 자동매매 트리거
 """
 import logging
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
 from django.utils import timezone
 from stock.models import (
-    Stock, ConditionSearch, ConditionMatch, TradingConfig
+    ConditionSearch, ConditionMatch, ConditionJob, TradingConfig
 )
 from .kiwoom_service import KiwoomService
+from .stock_master_service import StockMasterService
 from .trading_service import TradingService
 
 logger = logging.getLogger(__name__)
 
+# 결과 콜백을 받지 못해 만료된 초기편입 작업의 오류 메시지
+JOB_TIMEOUT_ERROR = '조건검색 결과 미수신 (시간 초과)'
+
+# 초기 편입 처리 작업 실행기 (작업은 차례로 실행 - 주문 속도는 OrderRateLimiter가 조절)
+_job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='condition-job')
+
+# 실시간 편입/이탈 자동매매 실행기 (이벤트 처리 트랜잭션 커밋 후 주문 - DB 잠금을 잡은 채 브릿지를 호출하지 않도록)
+_trade_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='auto-trade')
+
 
 class ConditionService:
     """조건검색 관리 서비스"""
 
     def __init__(self, config: TradingConfig = None):
-        self.kiwoom = KiwoomService(config)
+        self.kiwoom = KiwoomService.shared(config)
         self.trading = TradingService(config)
+        self.master = StockMasterService(config)
         self.config = config
 
     def load_condition_list(self):
@@ -54,30 +71,34 @@ class ConditionService:
         """
         조건검색 실행
         is_realtime=True: 실시간 조건검색 (편입/이탈 모니터링)
+        초기 편입 종목은 브릿지의 조건검색 결과 일괄 콜백으로 들어오며, 요청 전에 대기 작업을 만들어
+        작업ID를 브릿지에 넘깁니다 (결과 콜백이 이 응답보다 먼저 와도 같은 작업에 기록되도록).
         """
         try:
             condition = ConditionSearch.objects.get(id=condition_id)
         except ConditionSearch.DoesNotExist:
             return {'success': False, 'error': '조건검색식을 찾을 수 없습니다.'}
 
-        screen_no = f"09{condition.condition_index:02d}"
-
+        self.expire_stale_jobs()
+        job = ConditionJob.objects.create(condition=condition)
         result = self.kiwoom.send_condition(
-            screen_no=screen_no,
             condition_name=condition.condition_name,
             condition_index=condition.condition_index,
             is_realtime=is_realtime,
+            job_id=job.id,
         )
 
-        if result['success']:
-            condition.is_realtime = is_realtime
-            condition.status = 'active'
-            condition.save()
-
-            # 초기 편입 종목 처리
-            matched_stocks = result['data'].get('stocks', [])
-            self._process_initial_matches(condition, matched_stocks)
+        error = result.get('error') if not result['success'] else result['data'].get('error')
+        if error:
+            ConditionJob.objects.filter(id=job.id, status='pending').update(
+                status='failed', error=error, finished_at=timezone.now(),
+            )
+            return result
 
+        condition.is_realtime = is_realtime
+        condition.status = 'active'
+        condition.save()
+        result['data']['job_id'] = job.id
         return result
 
     def stop_condition_search(self, condition_id):
@@ -87,10 +108,7 @@ class ConditionService:
         except ConditionSearch.DoesNotExist:
             return {'success': False, 'error': '조건검색식을 찾을 수 없습니다.'}
 
-        screen_no = f"09{condition.condition_index:02d}"
-
         result = self.kiwoom.stop_condition(
-            screen_no=screen_no,
             condition_name=condition.condition_name,
             condition_index=condition.condition_index,
         )
@@ -100,14 +118,14 @@ class ConditionService:
 
         return {'success': True, 'data': {'message': f'조건검색 [{condition.condition_name}] 중지됨'}}
 
-    def process_condition_match(self, condition_id, stock_code, match_type):
+    def process_condition_match(self, condition_index, stock_code, match_type, condition_name=None):
         """
         조건검색 편입/이탈 이벤트 처리 (브릿지에서 콜백)
+        condition_index/condition_name: 키움 조건식인덱스/조건식명 (브릿지는 DB ID를 모름)
         match_type: 'I' (편입) 또는 'D' (이탈)
         """
-        try:
-            condition = ConditionSearch.objects.get(id=condition_id)
-        except ConditionSearch.DoesNotExist:
+        condition = self._find_condition(condition_index, condition_name)
+        if condition is None:
             return {'success': False, 'error': '조건검색식을 찾을 수 없습니다.'}
 
         # 종목 정보 조회 또는 생성
@@ -130,10 +148,9 @@ class ConditionService:
             stock.code,
         )
 
-        # 자동매매 실행
-        trade_result = None
+        # 자동매매는 커밋 후 실행
         if condition.auto_trade:
-            trade_result = self._execute_auto_trade(condition, stock, match_type)
+            self._schedule_auto_trade(condition, [stock], match_type)
 
         return {
             'success': True,
@@ -142,10 +159,96 @@ class ConditionService:
                 'stock_code': stock.code,
                 'stock_name': stock.name,
                 'match_type': match_type,
-                'auto_trade_result': trade_result,
+                'auto_trade_scheduled': condition.auto_trade,
             }
         }
 
+    def process_condition_matches(self, condition_index, stock_codes, match_type, condition_name=None, job_id=None):
+        """
+        조건검색 편입/이탈 일괄 처리 (브릿지 일괄 콜백)
+        종목은 한번의 쿼리로 조회하고 편입/이탈 기록은 bulk_create로 저장
+        편입(I) 일괄은 조건검색 시작 시의 초기 편입 종목이므로 초기편입 작업(ConditionJob, job_id)에 기록하고,
+        자동매매면 커밋 후 작업 실행기에서 현재가 일괄 조회 + 주문 속도 제한으로 매수합니다.
+        """
+        condition = self._find_condition(condition_index, condition_name)
+        if condition is None:
+            return {'success': False, 'error': '조건검색식을 찾을 수 없습니다.'}
+
+        codes = list(dict.fromkeys(stock_codes))
+        stocks = self._get_or_create_stocks(codes)
+
+        matches = ConditionMatch.objects.bulk_create([
+            ConditionMatch(condition=condition, stock=stocks[code], match_type=match_type)
+            for code in codes if code in stocks
+        ])
+
+        logger.info(
+            "조건검색 일괄 %s: [%s] %d종목",
+            '편입' if match_type == 'I' else '이탈',
+            condition.condition_name,
+            len(matches),
+        )
+
+        job = None
+        if match_type == 'I':
+            job = self._start_initial_match_job(condition, job_id, len(codes), [match.stock for match in matches])
+        elif condition.auto_trade and matches:
+            # 자동매매는 커밋 후 실행
+            self._schedule_auto_trade(condition, [match.stock for match in matches], match_type)
+
+        return {
+            'success': True,
+            'data': {
+                'condition_id': condition.id,
+                'job_id': job.id if job else None,
+                'match_type': match_type,
+                'matched': len(matches),
+                'missing': [code for code in codes if code not in stocks],
+                'auto_trade_scheduled': condition.auto_trade and bool(matches),
+            }
+        }
+
+    @staticmethod
+    def expire_stale_jobs():
+        """결과 콜백 없이 CONDITION_JOB_TIMEOUT초가 지난 대기 작업을 실패 처리 - 처리 건수"""
+        return ConditionJob.objects.filter(
+            status='pending',
+            created_at__lt=timezone.now() - timedelta(seconds=settings.CONDITION_JOB_TIMEOUT),
+        ).update(status='failed', error=JOB_TIMEOUT_ERROR, finished_at=timezone.now())
+
+    @staticmethod
+    def _find_condition(condition_index, condition_name=None):
+        """
+        브릿지 콜백의 조건식 찾기 (키움 조건식인덱스 + 조건식명, 없으면 None)
+        조건식명이 없으면 인덱스만으로 찾고, 같은 인덱스가 여럿이면 실행중인 조건식을 우선합니다.
+        """
+        conditions = ConditionSearch.objects.filter(condition_index=condition_index)
+        if condition_name:
+            conditions = conditions.filter(condition_name=condition_name)
+        conditions = list(conditions)
+        active = [c for c in conditions if c.status == 'active']
+        return (active or conditions or [None])[0]
+
+    def _schedule_auto_trade(self, condition, stocks, match_type):
+        """
+        자동매매 예약 - 현재 트랜잭션이 커밋된 뒤 실행기에서 주문
+        이벤트 처리가 롤백되면(재전송 대상) 주문하지 않으므로 재전송 시 중복 주문이 나가지 않습니다.
+        """
+        transaction.on_commit(
+            lambda: _trade_executor.submit(self._run_auto_trade, condition, stocks, match_type)
+        )
+
+    def _run_auto_trade(self, condition, stocks, match_type):
+        try:
+            for stock in stocks:
+                result = self._execute_auto_trade(condition, stock, match_type)
+                if result and not result['success']:
+                    logger.warning("자동매매 미실행: [%s] %s - %s", condition.condition_name, stock.code, result.get('error'))
+        except Exception:
+            logger.exception("자동매매 실행 오류: [%s]", condition.condition_name)
+        finally:
+            close_old_connections()
+
     def _execute_auto_trade(self, condition, stock, match_type):
         """
         조건검색 결과에 따른 자동매매 실행
@@ -168,43 +271,78 @@ class ConditionService:
                 reason=f"조건검색 이탈: {condition.condition_name}",
             )
 
-    def _process_initial_matches(self, condition, stock_codes):
-        """조건검색 초기 편입 종목 처리"""
-        for code in stock_codes:
-            stock = self._get_or_create_stock(code)
-            if stock:
-                ConditionMatch.objects.create(
-                    condition=condition,
-                    stock=stock,
-                    match_type='I',
-                )
-                if condition.auto_trade:
-                    self._execute_auto_trade(condition, stock, 'I')
+    @transaction.atomic
+    def _start_initial_match_job(self, condition, job_id, total, stocks):
+        """
+        초기 편입 결과를 조건검색 시작 때 만든 작업에 기록
+        작업ID가 없으면(저널 재생 등) 가장 최근 대기 작업, 그것도 없으면 새로 만듭니다.
+        시간 초과로 실패 처리된 뒤 늦게 도착한 결과도 같은 작업에 기록합니다.
+        자동매매면 커밋 후 작업 실행기에 등록하고, 아니면 바로 완료 처리합니다.
+        """
+        jobs = condition.jobs.select_for_update()
+        if job_id is not None:
+            job = jobs.filter(id=job_id).filter(
+                Q(status='pending') | Q(status='failed', error=JOB_TIMEOUT_ERROR)
+            ).first()
+        else:
+            job = jobs.filter(status='pending').order_by('-created_at').first()
+        if job is None:
+            job = ConditionJob(condition=condition)
+        job.status = 'pending'
+        job.error = ''
+        job.finished_at = None
+        job.total = total
+        job.matched = len(stocks)
+        if condition.auto_trade and stocks:
+            job.save()
+            transaction.on_commit(lambda: _job_executor.submit(self._run_initial_match_job, job.id, stocks))
+        else:
+            job.status = 'done'
+            job.finished_at = timezone.now()
+            job.save()
+        return job
 
-    def _get_or_create_stock(self, stock_code):
-        """종목 정보 조회 또는 생성"""
-        stock = Stock.objects.filter(code=stock_code).first()
-        if stock:
-            return stock
-
-        # 브릿지에서 종목 정보 조회
-        info = self.kiwoom.get_stock_info(stock_code)
-        if info['success']:
-            data = info['data']
-            stock = Stock.objects.create(
-                code=stock_code,
-                name=data.get('name', stock_code),
-                market=data.get('market', 'KOSPI'),
+    def _run_initial_match_job(self, job_id, stocks):
+        """초기 편입 종목 자동매수 - 현재가 일괄 조회 후 주문 속도 제한에 맞춰 차례로 매수"""
+        job = ConditionJob.objects.select_related('condition').get(id=job_id)
+        condition = job.condition
+        job.status = 'running'
+        job.save(update_fields=['status'])
+        try:
+            def on_result(stock, result):
+                if result['success']:
+                    job.ordered += 1
+                elif result.get('skipped'):
+                    job.skipped += 1
+                else:
+                    job.failed += 1
+                job.save(update_fields=['ordered', 'skipped', 'failed'])
+
+            trade = self.trading.auto_buy_many(
+                stocks,
+                condition=condition,
+                reason=f"조건검색 편입: {condition.condition_name}",
+                on_result=on_result,
             )
-            return stock
+            if not trade['success']:
+                raise RuntimeError(trade['error'])
+            job.status = 'done'
+        except Exception as e:
+            logger.exception("조건검색 초기 편입 자동매수 실패: [%s]", condition.condition_name)
+            job.status = 'failed'
+            job.error = str(e)
+        finally:
+            job.finished_at = timezone.now()
+            job.save()
+            close_old_connections()
 
-        # 브릿지 연결 실패 시 코드만으로 생성
-        stock = Stock.objects.create(
-            code=stock_code,
-            name=stock_code,
-            market='KOSPI',
-        )
-        return stock
+    def _get_or_create_stock(self, stock_code):
+        """종목 조회 (캐시 -> DB -> 브릿지 종목정보 순, 찾지 못하면 None)"""
+        return self.master.resolve(stock_code)
+
+    def _get_or_create_stocks(self, stock_codes):
+        """종목 일괄 조회 - {종목코드: Stock}"""
+        return self.master.resolve_many(stock_codes)
 
     def get_condition_matches(self, condition_id, match_type=None, limit=100):
         """조건검색 결과 조회"""
@@ -0,0 +1,66 @@
+"""
+활성 매매설정 캐시 (프로세스 단위)
+매 요청/콜백마다 활성 TradingConfig를 조회하지 않도록 프로세스 안에 보관합니다.
+
+TradingConfig가 저장/삭제되면 시그널(stock.signals)로 이 프로세스의 캐시를 비우고,
+커밋 후 Django 캐시의 버전값을 올려 다른 워커/이벤트 소비 프로세스도 다음 조회 때 다시 읽게 합니다.
+버전값은 CACHES가 프로세스 간 공유 백엔드일 때만 전파되므로, 최대 ACTIVE_CONFIG_CACHE_TTL초마다 다시 읽습니다.
+
+호출마다 캐시된 인스턴스의 사본을 돌려주므로, 호출한 쪽이 값을 바꿔도(모드 전환 등) 저장이 커밋되기 전까지
+다른 요청에는 보이지 않습니다.
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from stock.models import TradingConfig
+
+VERSION_KEY = 'stock:active-config-version'
+
+_lock = threading.Lock()
+_config = None
+_version = None
+_loaded_at = None
+
+
+def get_active_config():
+    """현재 활성화된 매매설정 사본 (없으면 None) - 캐시가 유효하면 DB 조회 없음"""
+    global _config, _version, _loaded_at
+    version = cache.get(VERSION_KEY, 0)
+    now = time.monotonic()
+    with _lock:
+        if (
+            _loaded_at is not None and _version == version
+            and now - _loaded_at < settings.ACTIVE_CONFIG_CACHE_TTL
+        ):
+            return copy.copy(_config)
+
+    config = TradingConfig.objects.filter(is_active=True).first()
+    with _lock:
+        _config, _version, _loaded_at = config, version, now
+    return copy.copy(config)
+
+
+def invalidate_active_config():
+    """캐시 무효화 - 이 프로세스는 즉시, 다른 프로세스는 커밋 후 버전값 변경으로"""
+    _clear()
+    transaction.on_commit(_bump_version)
+
+
+def _clear():
+    global _loaded_at
+    with _lock:
+        _loaded_at = None
+
+
+def _bump_version():
+    # 커밋 전 다른 스레드가 이전 값을 다시 읽어 두었을 수 있으므로 한 번 더 비움
+    _clear()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
@@ -2,18 +2,68 @@
 키움 API 통신 서비스
 Windows 브릿지 에이전트와 HTTP로 통신하여 키움 OpenAPI+ 기능을 사용합니다.
 모의투자/실투자 전환을 API 키 기반으로 처리합니다.
+
+브릿지 호출은 브릿지 URL별로 프로세스 전체가 공유하는 keep-alive 세션(커넥션 풀)을 사용하므로
+호출마다 TCP 연결을 새로 맺지 않습니다.
 """
 import logging
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from stock.models import TradingConfig
 
 logger = logging.getLogger(__name__)
 
+_sessions = {}
+_instances = {}
+_lock = threading.Lock()
+
+# 설정별 공유 인스턴스 최대 개수 (설정 변경 시 새 키로 생성되므로 오래된 것은 정리)
+MAX_SHARED_INSTANCES = 16
+
+
+def get_session(bridge_url):
+    """브릿지 URL별 공유 세션 (스레드 공용, 커넥션 풀 크기는 KIWOOM_BRIDGE_POOL_SIZE)"""
+    with _lock:
+        session = _sessions.get(bridge_url)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.KIWOOM_BRIDGE_POOL_SIZE,
+                pool_block=False,
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[bridge_url] = session
+        return session
+
 
 class KiwoomService:
     """키움 OpenAPI+ 브릿지 통신 서비스"""
 
+    @classmethod
+    def shared(cls, config: TradingConfig = None):
+        """
+        설정별 공유 인스턴스
+        모드/키/계좌가 같으면 같은 인스턴스를 재사용하고, 값이 바뀌면 새로 만듭니다.
+        """
+        key = (
+            (config.trade_mode, config.app_key, config.app_secret, config.account_no)
+            if config else None
+        )
+        with _lock:
+            instance = _instances.get(key)
+        if instance is None:
+            instance = cls(config)
+            with _lock:
+                if len(_instances) >= MAX_SHARED_INSTANCES:
+                    _instances.clear()
+                instance = _instances.setdefault(key, instance)
+        return instance
+
     def __init__(self, config: TradingConfig = None):
         if config:
             self.trade_mode = config.trade_mode
@@ -25,7 +75,16 @@ class KiwoomService:
             self._load_keys_from_settings()
 
         self.bridge_url = settings.KIWOOM_BRIDGE_URL
-        self.timeout = 10
+        self.connect_timeout = settings.KIWOOM_BRIDGE_CONNECT_TIMEOUT
+        self.timeout = settings.KIWOOM_BRIDGE_READ_TIMEOUT
+        self.session = get_session(self.bridge_url)
+        self.headers = {
+            'Content-Type': 'application/json',
+            'X-Trade-Mode': self.trade_mode,
+            'X-App-Key': self.app_key,
+            'X-App-Secret': self.app_secret,
+            'X-Account-No': self.account_no,
+        }
 
     def _load_keys_from_settings(self):
         """설정에서 모드에 따라 API 키 로드"""
@@ -37,22 +96,16 @@ class KiwoomService:
             self.app_secret = settings.KIWOOM_APP_SECRET_MOCK
         self.account_no = settings.KIWOOM_ACCOUNT_NO
 
-    def _request(self, endpoint, method='GET', data=None):
-        """브릿지 에이전트에 HTTP 요청"""
+    def _request(self, endpoint, method='GET', data=None, timeout=None):
+        """브릿지 에이전트에 HTTP 요청 (timeout은 읽기 타임아웃, 연결 타임아웃은 설정값)"""
+        timeout = (self.connect_timeout, timeout or self.timeout)
         url = f"{self.bridge_url}/api/{endpoint}"
-        headers = {
-            'Content-Type': 'application/json',
-            'X-Trade-Mode': self.trade_mode,
-            'X-App-Key': self.app_key,
-            'X-App-Secret': self.app_secret,
-            'X-Account-No': self.account_no,
-        }
 
         try:
             if method == 'GET':
-                response = requests.get(url, headers=headers, params=data, timeout=self.timeout)
+                response = self.session.get(url, headers=self.headers, params=data, timeout=timeout)
             else:
-                response = requests.post(url, headers=headers, json=data, timeout=self.timeout)
+                response = self.session.post(url, headers=self.headers, json=data, timeout=timeout)
 
             response.raise_for_status()
             return {'success': True, 'data': response.json()}
@@ -84,19 +137,21 @@ class KiwoomService:
         """조건검색식 목록 조회"""
         return self._request('condition/list')
 
-    def send_condition(self, screen_no, condition_name, condition_index, is_realtime=True):
-        """조건검색 요청 (편입 종목 조회)"""
+    def send_condition(self, condition_name, condition_index, is_realtime=True, job_id=None):
+        """
+        조건검색 요청 (화면번호는 브릿지에서 할당)
+        편입 종목은 조건검색 결과 일괄 콜백으로 수신하며, job_id를 넘기면 그 콜백에 같이 실려 옵니다.
+        """
         return self._request('condition/search', method='POST', data={
-            'screen_no': screen_no,
             'condition_name': condition_name,
             'condition_index': condition_index,
             'is_realtime': is_realtime,
+            'job_id': job_id,
         })
 
-    def stop_condition(self, screen_no, condition_name, condition_index):
+    def stop_condition(self, condition_name, condition_index):
         """실시간 조건검색 중지"""
         return self._request('condition/stop', method='POST', data={
-            'screen_no': screen_no,
             'condition_name': condition_name,
             'condition_index': condition_index,
         })
@@ -107,10 +162,53 @@ class KiwoomService:
         """종목 현재가 조회"""
         return self._request('stock/price', data={'code': stock_code})
 
+    def get_stock_prices(self, stock_codes):
+        """
+        복수종목 현재가 조회 (브릿지에서 CommKwRqData로 100종목 단위 일괄 조회)
+        Returns: data['prices'] - 종목별 시세 목록
+        """
+        return self._request('stock/prices', method='POST', data={'codes': list(stock_codes)})
+
+    def subscribe_realtime(self, stock_codes, owner='api', replace=False):
+        """
+        실시간 시세 구독 (브릿지에서 구독자별 참조 카운트 관리)
+        replace=True면 해당 구독자의 종목 목록을 주어진 목록으로 교체
+        """
+        return self._request('realtime/subscribe', method='POST', data={
+            'codes': list(stock_codes),
+            'owner': owner,
+            'replace': replace,
+        })
+
+    def unsubscribe_realtime(self, stock_codes, owner='api'):
+        """실시간 시세 구독 해지"""
+        return self._request('realtime/unsubscribe', method='POST', data={
+            'codes': list(stock_codes),
+            'owner': owner,
+        })
+
     def get_stock_info(self, stock_code):
         """종목 기본 정보 조회"""
         return self._request('stock/info', data={'code': stock_code})
 
+    def get_candles(self, stock_code, interval='day', start=None, end=None):
+        """
+        과거 캔들 조회
+        interval: 'day' 또는 분봉 틱범위(1, 3, 5 ...), start/end: 'YYYYMMDD' 또는 'YYYYMMDDHHMMSS'
+        start 이후 봉만 요청하면 브릿지는 캐시에 없는 최신 구간만 키움에서 조회합니다.
+        """
+        params = {'code': stock_code, 'interval': interval}
+        if start:
+            params['start'] = start
+        if end:
+            params['end'] = end
+        # 처음 받는 종목은 연속조회로 여러 TR이 필요하므로 대기시간을 넉넉히
+        return self._request('stock/candles', data=params, timeout=60)
+
+    def get_stock_master(self, market=None):
+        """종목 마스터 일괄 조회 (market: 'KOSPI' 또는 'KOSDAQ', 생략 시 전체)"""
+        return self._request('stock/master', data={'market': market} if market else None)
+
     # ===== 주문 관련 =====
 
     def send_order(self, order_type, stock_code, quantity, price=0, price_type='market'):
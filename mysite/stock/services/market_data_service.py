@@ -0,0 +1,67 @@
+"""
+시세 서비스
+브릿지 실시간 체결 수신, 종목별 최신 시세 저장, 보유종목 평가
+"""
+import logging
+from django.db import transaction
+from django.utils import timezone
+from stock.models import StockPrice, Balance
+from .stock_master_service import stock_resolver
+
+logger = logging.getLogger(__name__)
+
+PRICE_FIELDS = [
+    'current_price', 'open_price', 'high_price', 'low_price',
+    'prev_close', 'volume', 'change_rate',
+]
+
+
+class MarketDataService:
+    """실시간 시세 반영 서비스"""
+
+    @transaction.atomic
+    def ingest_ticks(self, ticks):
+        """
+        실시간 체결 일괄 반영
+        종목별 최신 시세(StockPrice)를 갱신하고 보유잔고 평가금액을 재계산
+        """
+        latest = {tick['stock_code']: tick for tick in ticks}
+        stocks = stock_resolver.get_many(list(latest))
+        if not stocks:
+            return {'success': True, 'data': {'updated': 0, 'revalued': 0}}
+
+        now = timezone.now()
+        existing = {}
+        for price in StockPrice.objects.filter(stock__in=stocks.values()).order_by('stock_id', '-timestamp'):
+            existing.setdefault(price.stock_id, price)
+
+        to_update, to_create = [], []
+        for code, stock in stocks.items():
+            tick = latest[code]
+            price = existing.get(stock.id)
+            if price is None:
+                to_create.append(StockPrice(stock=stock, **{f: tick[f] for f in PRICE_FIELDS}))
+                continue
+            for field in PRICE_FIELDS:
+                setattr(price, field, tick[field])
+            price.timestamp = now
+            to_update.append(price)
+
+        StockPrice.objects.bulk_update(to_update, PRICE_FIELDS + ['timestamp'])
+        StockPrice.objects.bulk_create(to_create)
+
+        # 보유종목 평가
+        balances = list(
+            Balance.objects.filter(stock__in=stocks.values(), quantity__gt=0).select_related('stock')
+        )
+        for balance in balances:
+            balance.revalue(latest[balance.stock.code]['current_price'])
+            balance.updated_at = now
+        Balance.objects.bulk_update(
+            balances, ['current_price', 'profit_rate', 'profit_amount', 'updated_at']
+        )
+
+        return {
+            'success': True,
+            'data': {'updated': len(to_update) + len(to_create), 'revalued': len(balances)},
+        }
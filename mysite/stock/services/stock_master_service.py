@@ -0,0 +1,236 @@
+"""
+종목 마스터 서비스
+브릿지의 KOSPI/KOSDAQ 종목 마스터를 Stock 테이블에 일괄 반영하고(하루 1회),
+이벤트 처리 경로에서는 프로세스 내 종목코드 캐시(StockResolver)로 DB/브릿지 조회 없이 종목을 찾습니다.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+
+from stock.models import Stock, TradingConfig
+from .kiwoom_service import KiwoomService
+
+logger = logging.getLogger(__name__)
+
+MARKETS = {code for code, _ in Stock.MARKET_CHOICES}
+
+BULK_BATCH_SIZE = 500
+
+
+class StockResolver:
+    """
+    종목코드 -> Stock (프로세스 내 LRU 캐시)
+    캐시된 Stock은 여러 스레드가 함께 쓰므로 읽기 전용으로 취급합니다.
+    Stock 저장/삭제 시그널과 마스터 동기화 후 해당 항목을 비웁니다.
+    찾지 못한 종목코드도 miss_ttl초 동안 기억해, 같은 코드의 이벤트마다 DB/브릿지를 다시 조회하지 않습니다.
+    """
+
+    def __init__(self, max_entries=None, miss_ttl=None):
+        self.max_entries = max_entries or settings.STOCK_RESOLVER_SIZE
+        self.miss_ttl = settings.STOCK_RESOLVER_MISS_TTL if miss_ttl is None else miss_ttl
+        self._lock = threading.Lock()
+        self._stocks = OrderedDict()
+        self._missing = {}   # 종목코드 -> 만료시각 (monotonic)
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    def get(self, code):
+        """종목 1건 (없으면 None)"""
+        return self.get_many([code]).get(code)
+
+    def get_many(self, codes, remember_misses=True):
+        """
+        종목 일괄 조회 - {종목코드: Stock}, 캐시에 없는 종목만 한 번의 쿼리로 조회
+        최근에 찾지 못한 종목은 조회하지 않고 결과에서 뺍니다.
+        remember_misses=False면 DB에 없는 종목을 기억하지 않음 (호출한 쪽에서 브릿지 조회 후 mark_missing)
+        """
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for code in codes:
+                stock = self._stocks.get(code)
+                if stock is not None:
+                    self._stocks.move_to_end(code)
+                    found[code] = stock
+                elif self._missing.get(code, 0) > now:
+                    self.negative_hits += 1
+                else:
+                    missing.append(code)
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            loaded = Stock.objects.in_bulk(missing, field_name='code')
+            self._put_many(loaded.values())
+            found.update(loaded)
+            if remember_misses:
+                self.mark_missing([code for code in missing if code not in loaded])
+        return found
+
+    def is_missing(self, code):
+        """최근에 찾지 못한 종목인지"""
+        with self._lock:
+            return self._missing.get(code, 0) > time.monotonic()
+
+    def mark_missing(self, codes):
+        """찾지 못한 종목코드 기억 (miss_ttl초)"""
+        if not codes or self.miss_ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._missing) >= self.max_entries:
+                self._missing = {code: expires for code, expires in self._missing.items() if expires > now}
+                if len(self._missing) >= self.max_entries:
+                    self._missing.clear()
+            for code in codes:
+                self._missing[code] = now + self.miss_ttl
+
+    def put(self, stock):
+        self._put_many([stock])
+
+    def _put_many(self, stocks):
+        with self._lock:
+            for stock in stocks:
+                self._stocks[stock.code] = stock
+                self._stocks.move_to_end(stock.code)
+                self._missing.pop(stock.code, None)
+            while len(self._stocks) > self.max_entries:
+                self._stocks.popitem(last=False)
+
+    def discard(self, code):
+        with self._lock:
+            self._stocks.pop(code, None)
+            self._missing.pop(code, None)
+
+    def clear(self):
+        with self._lock:
+            self._stocks.clear()
+            self._missing.clear()
+
+    def warm(self):
+        """활성 종목을 캐시 크기만큼 미리 적재 - 적재한 종목 수"""
+        stocks = list(Stock.objects.filter(is_active=True).order_by('code')[:self.max_entries])
+        self._put_many(stocks)
+        return len(stocks)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._stocks),
+                'max_entries': self.max_entries,
+                'missing': len(self._missing),
+                'hits': self.hits,
+                'misses': self.misses,
+                'negative_hits': self.negative_hits,
+            }
+
+
+stock_resolver = StockResolver()
+
+
+class StockMasterService:
+    """종목 마스터 동기화 / 종목 조회"""
+
+    def __init__(self, config: TradingConfig = None):
+        self.kiwoom = KiwoomService.shared(config)
+
+    def sync(self, market=None):
+        """
+        브릿지 종목 마스터를 Stock에 일괄 반영 (코드 기준 upsert)
+        마스터에 없는 기존 종목은 상장폐지로 보고 비활성화합니다 (market 지정 시 해당 시장만).
+        """
+        result = self.kiwoom.get_stock_master(market)
+        if not result['success']:
+            return result
+        data = result['data']
+        if 'error' in data:
+            return {'success': False, 'error': data['error']}
+
+        masters = {s['code']: s for s in data.get('stocks', []) if s.get('market') in MARKETS}
+        if not masters:
+            return {'success': False, 'error': '종목 마스터가 비어 있습니다.'}
+
+        existing = {code: (stock_market, active) for code, stock_market, active in
+                    Stock.objects.values_list('code', 'market', 'is_active')}
+        stale = [
+            code for code, (stock_market, active) in existing.items()
+            if active and code not in masters and (market is None or stock_market == market)
+        ]
+
+        with transaction.atomic():
+            Stock.objects.bulk_create(
+                [
+                    Stock(code=code, name=info.get('name') or code, market=info['market'], is_active=True)
+                    for code, info in masters.items()
+                ],
+                batch_size=BULK_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['code'],
+                update_fields=['name', 'market', 'is_active', 'updated_at'],
+            )
+            deactivated = 0
+            for i in range(0, len(stale), BULK_BATCH_SIZE):
+                deactivated += Stock.objects.filter(code__in=stale[i:i + BULK_BATCH_SIZE]).update(is_active=False)
+
+        # bulk_create/update는 시그널이 없으므로 캐시 전체를 비움
+        stock_resolver.clear()
+
+        created = sum(1 for code in masters if code not in existing)
+        logger.info(
+            "종목 마스터 동기화 (%s): 전체 %d, 신규 %d, 비활성화 %d",
+            market or '전체', len(masters), created, deactivated,
+        )
+        return {'success': True, 'data': {
+            'trading_day': data.get('trading_day'),
+            'total': len(masters),
+            'created': created,
+            'updated': len(masters) - created,
+            'deactivated': deactivated,
+        }}
+
+    def resolve(self, stock_code):
+        """종목 조회 (없으면 None)"""
+        return self.resolve_many([stock_code]).get(stock_code)
+
+    def resolve_many(self, stock_codes):
+        """
+        종목 일괄 조회 - {종목코드: Stock}
+        캐시/DB에 없는 종목(마스터 동기화 이전 신규상장 등)만 브릿지 종목 마스터 정보로 생성하며,
+        브릿지에서도 찾지 못한 종목은 결과에서 빠지고 STOCK_RESOLVER_MISS_TTL초 동안 다시 조회하지 않습니다.
+        """
+        stocks = stock_resolver.get_many(stock_codes, remember_misses=False)
+        unknown = []
+        for code in stock_codes:
+            if code in stocks or stock_resolver.is_missing(code):
+                continue
+            stock = self._create_from_bridge(code)
+            if stock:
+                stocks[code] = stock
+            else:
+                unknown.append(code)
+        stock_resolver.mark_missing(unknown)
+        return stocks
+
+    def _create_from_bridge(self, stock_code):
+        """브릿지 종목 마스터 정보로 종목 생성 - 시장/종목명이 확인되지 않으면 만들지 않음"""
+        result = self.kiwoom.get_stock_info(stock_code)
+        data = result.get('data') or {}
+        name = (data.get('name') or '').strip()
+        if not result['success'] or 'error' in data or data.get('market') not in MARKETS or not name:
+            logger.warning(
+                "종목 정보 조회 실패: %s - %s",
+                stock_code, result.get('error') or data.get('error') or '시장/종목명 없음',
+            )
+            return None
+
+        stock, _ = Stock.objects.get_or_create(
+            code=stock_code,
+            defaults={'name': name, 'market': data['market']},
+        )
+        stock_resolver.put(stock)
+        return stock
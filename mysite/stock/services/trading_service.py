@@ -2,29 +2,70 @@
 매매 서비스
 매수/매도 주문 처리, 잔고 관리, 모의/실투자 전환
 """
+import time
 import logging
+import threading
+
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 from stock.models import (
-    Stock, Order, Balance, TradeHistory, TradingConfig, ConditionSearch
+    Order, Balance, TradeHistory, TradingConfig, ConditionSearch
 )
+from .config_cache import get_active_config
 from .kiwoom_service import KiwoomService
+from .stock_master_service import StockMasterService
 
 logger = logging.getLogger(__name__)
 
 
+class OrderRateLimiter:
+    """
+    주문 전송 간격 조절 (초당 rate건)
+    프로세스 공용이라 여러 작업이 동시에 주문해도 합산 속도가 rate를 넘지 않습니다.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        """다음 주문 슬롯까지 대기"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_order_limiter = None
+_order_limiter_lock = threading.Lock()
+
+
+def get_order_limiter():
+    global _order_limiter
+    with _order_limiter_lock:
+        if _order_limiter is None:
+            _order_limiter = OrderRateLimiter(settings.KIWOOM_ORDER_RATE)
+        return _order_limiter
+
+
 class TradingService:
     """매매 실행 서비스"""
 
     def __init__(self, config: TradingConfig = None):
-        self.kiwoom = KiwoomService(config)
+        self.kiwoom = KiwoomService.shared(config)
+        self.master = StockMasterService(config)
         self.config = config
         self.trade_mode = config.trade_mode if config else 'mock'
 
     def get_active_config(self):
-        """현재 활성화된 매매설정 반환"""
+        """현재 활성화된 매매설정 반환 (생성 시 받은 설정, 없으면 캐시된 활성 설정)"""
         if self.config:
             return self.config
-        return TradingConfig.objects.filter(is_active=True).first()
+        return get_active_config()
 
     def switch_mode(self, mode):
         """
@@ -48,7 +89,7 @@ class TradingService:
 
         # 서비스 내부 모드도 갱신
         self.trade_mode = mode
-        self.kiwoom = KiwoomService(config)
+        self.kiwoom = KiwoomService.shared(config)
 
         logger.info("투자모드 전환: %s", '실투자' if mode == 'real' else '모의투자')
         return {
@@ -88,7 +129,8 @@ class TradingService:
             status='pending',
         )
 
-        # 키움 브릿지로 주문 전송
+        # 키움 브릿지로 주문 전송 (프로세스 전체 주문 속도 제한)
+        get_order_limiter().wait()
         result = self.kiwoom.send_order(
             order_type='buy',
             stock_code=stock.code,
@@ -150,7 +192,8 @@ class TradingService:
             status='pending',
         )
 
-        # 키움 브릿지로 주문 전송
+        # 키움 브릿지로 주문 전송 (프로세스 전체 주문 속도 제한)
+        get_order_limiter().wait()
         result = self.kiwoom.send_order(
             order_type='sell',
             stock_code=stock.code,
@@ -196,14 +239,9 @@ class TradingService:
         if not price_result['success']:
             return {'success': False, 'error': '현재가 조회 실패'}
 
-        current_price = price_result['data'].get('current_price', 0)
-        if current_price <= 0:
-            return {'success': False, 'error': '현재가 비정상'}
-
-        # 매수 수량 계산 (종목당 최대금액 / 현재가)
-        quantity = config.max_buy_per_stock // current_price
-        if quantity <= 0:
-            return {'success': False, 'error': '매수 가능 수량 없음 (가격 > 종목당 최대금액)'}
+        quantity, error = self._auto_buy_quantity(config, price_result['data'].get('current_price', 0))
+        if error:
+            return {'success': False, 'error': error}
 
         # 이미 보유 중인지 확인
         existing = Balance.objects.filter(
@@ -221,6 +259,58 @@ class TradingService:
             reason=reason,
         )
 
+    def auto_buy_many(self, stocks, condition=None, reason='', on_result=None):
+        """
+        자동매수 일괄 - 조건검색 초기 편입 종목처럼 여러 종목을 한 번에 매수
+        현재가는 복수종목 조회 한 번으로 받고, 주문은 차례로 전송합니다 (buy/sell이 KIWOOM_ORDER_RATE로 조절).
+        on_result(stock, result): 종목 1건 처리마다 호출 (진행상황 기록용)
+        """
+        config = self.get_active_config()
+        if not config:
+            return {'success': False, 'error': '매매설정 없음'}
+
+        price_result = self.kiwoom.get_stock_prices([stock.code for stock in stocks])
+        if not price_result['success']:
+            return price_result
+        if 'error' in price_result['data']:
+            return {'success': False, 'error': price_result['data']['error']}
+        prices = {p['stock_code']: p['current_price'] for p in price_result['data'].get('prices', [])}
+
+        held = set(Balance.objects.filter(
+            stock__in=stocks, trade_mode=self.trade_mode, quantity__gt=0
+        ).values_list('stock_id', flat=True))
+
+        results = []
+        for stock in stocks:
+            quantity, error = self._auto_buy_quantity(config, prices.get(stock.code, 0))
+            if stock.id in held:
+                result = {'success': False, 'skipped': True, 'error': f'이미 보유중인 종목: {stock.name}'}
+            elif error:
+                result = {'success': False, 'skipped': True, 'error': error}
+            else:
+                result = self.buy(
+                    stock=stock,
+                    quantity=quantity,
+                    price_type='market',
+                    condition=condition,
+                    reason=reason,
+                )
+            results.append({'stock_code': stock.code, 'result': result})
+            if on_result:
+                on_result(stock, result)
+
+        return {'success': True, 'data': results}
+
+    @staticmethod
+    def _auto_buy_quantity(config, current_price):
+        """자동매수 수량 (종목당 최대금액 / 현재가) - (수량, 오류)"""
+        if current_price <= 0:
+            return 0, '현재가 비정상'
+        quantity = config.max_buy_per_stock // current_price
+        if quantity <= 0:
+            return 0, '매수 가능 수량 없음 (가격 > 종목당 최대금액)'
+        return quantity, None
+
     def auto_sell(self, stock, condition=None, reason=''):
         """
         자동매도 - 조건검색 이탈 시 호출
@@ -242,18 +332,24 @@ class TradingService:
         )
 
     @transaction.atomic
-    def process_order_filled(self, order_no, filled_quantity, filled_price):
+    def process_order_filled(self, order_no, filled_quantity, filled_price, cumulative_quantity=None):
         """
         체결 처리 (브릿지 콜백)
         주문 상태 업데이트 + 잔고 반영 + 체결내역 기록
+        cumulative_quantity(주문 누적 체결수량)가 오면 이미 반영한 체결의 재전송은 건너뜁니다.
         """
         try:
             order = Order.objects.select_for_update().get(order_no=order_no)
         except Order.DoesNotExist:
             return {'success': False, 'error': f'주문번호 없음: {order_no}'}
 
+        if cumulative_quantity is not None and cumulative_quantity <= order.filled_quantity:
+            return {'success': True, 'data': {'order_no': order_no, 'status': order.status, 'duplicate': True}}
+
+        # 체결가격은 주문 전체의 가중평균
+        total_amount = order.filled_price * order.filled_quantity + filled_price * filled_quantity
         order.filled_quantity += filled_quantity
-        order.filled_price = filled_price
+        order.filled_price = total_amount // order.filled_quantity
         if order.filled_quantity >= order.quantity:
             order.status = 'filled'
         else:
@@ -276,6 +372,45 @@ class TradingService:
 
         return {'success': True, 'data': {'order_no': order_no, 'status': order.status}}
 
+    def process_order_status(self, order_no, status, original_order_no=''):
+        """
+        주문상태 처리 (브릿지 콜백)
+        submitted: 접수 확인, cancelled: 취소확인 (원주문 취소), rejected: 주문 거부
+        """
+        target_no = original_order_no if status == 'cancelled' and original_order_no else order_no
+        order = Order.objects.filter(order_no=target_no).first()
+        if not order:
+            return {'success': False, 'error': f'주문번호 없음: {target_no}'}
+
+        transitions = {
+            'submitted': ('pending',),
+            'cancelled': ('pending', 'submitted', 'partial'),
+            'rejected': ('pending', 'submitted'),
+        }
+        updated = Order.objects.filter(pk=order.pk, status__in=transitions[status]).update(
+            status=status, updated_at=timezone.now(),
+        )
+        return {'success': True, 'data': {
+            'order_no': target_no,
+            'status': status if updated else order.status,
+            'updated': bool(updated),
+        }}
+
+    def process_balance_update(self, stock_code, quantity, avg_price, current_price=0, stock_name=''):
+        """잔고변경 처리 (브릿지 콜백) - 키움 잔고값으로 보유수량/매입가를 덮어씀"""
+        stock = self.master.resolve(stock_code)
+        if not stock:
+            return {'success': False, 'error': f'종목 정보를 찾을 수 없습니다: {stock_code}'}
+
+        balance, _ = Balance.objects.get_or_create(
+            stock=stock, trade_mode=self.trade_mode, defaults={'quantity': 0, 'avg_price': 0},
+        )
+        balance.quantity = quantity
+        balance.avg_price = avg_price
+        balance.revalue(current_price or balance.current_price)
+        balance.save()
+        return {'success': True, 'data': {'stock_code': stock_code, 'quantity': quantity}}
+
     def _update_balance(self, order, filled_quantity, filled_price):
         """잔고 업데이트"""
         balance, created = Balance.objects.get_or_create(
@@ -293,33 +428,52 @@ class TradingService:
             # 매도: 수량 차감
             balance.quantity -= filled_quantity
 
-        balance.current_price = filled_price
-        if balance.avg_price > 0 and balance.quantity > 0:
-            balance.profit_rate = round(
-                ((balance.current_price - balance.avg_price) / balance.avg_price) * 100, 2
-            )
-            balance.profit_amount = (balance.current_price - balance.avg_price) * balance.quantity
-        else:
-            balance.profit_rate = 0
-            balance.profit_amount = 0
-
+        balance.revalue(filled_price)
         balance.save()
 
+    def revalue_balance(self):
+        """보유종목 현재가 일괄 평가 (복수종목 조회 1~2회)"""
+        balances = list(
+            Balance.objects.filter(trade_mode=self.trade_mode, quantity__gt=0).select_related('stock')
+        )
+        if not balances:
+            return {'success': True, 'data': {'revalued': 0}}
+
+        result = self.kiwoom.get_stock_prices([b.stock.code for b in balances])
+        if not result['success']:
+            return result
+
+        prices = {p['stock_code']: p['current_price'] for p in result['data'].get('prices', [])}
+        now = timezone.now()
+        revalued = []
+        for balance in balances:
+            price = prices.get(balance.stock.code, 0)
+            if price > 0:
+                balance.revalue(price)
+                balance.updated_at = now
+                revalued.append(balance)
+
+        Balance.objects.bulk_update(
+            revalued, ['current_price', 'profit_rate', 'profit_amount', 'updated_at']
+        )
+        return {'success': True, 'data': {'revalued': len(revalued)}}
+
     def sync_balance(self):
         """키움에서 잔고 동기화"""
         result = self.kiwoom.get_balance()
         if not result['success']:
             return result
+        if 'error' in result['data']:
+            return {'success': False, 'error': result['data']['error']}
 
         items = result['data'].get('items', [])
+        stocks = self.master.resolve_many([item['stock_code'] for item in items])
+        codes = []
         for item in items:
-            stock = Stock.objects.filter(code=item['stock_code']).first()
+            stock = stocks.get(item['stock_code'])
             if not stock:
-                stock = Stock.objects.create(
-                    code=item['stock_code'],
-                    name=item.get('stock_name', item['stock_code']),
-                    market='KOSPI',
-                )
+                logger.warning("잔고 동기화: 종목 정보 없음 %s (%s)", item['stock_code'], item.get('stock_name'))
+                continue
 
             Balance.objects.update_or_create(
                 stock=stock,
@@ -332,5 +486,24 @@ class TradingService:
                     'profit_amount': item.get('profit_amount', 0),
                 },
             )
+            if item.get('quantity', 0) > 0:
+                codes.append(stock.code)
+
+        # 키움 잔고에 없는 종목은 매도 완료로 보고 보유수량 정리
+        # (시뮬레이션 모드는 잔고 TR을 조회하지 않으므로 pages가 0 - 정리하지 않음)
+        cleared = 0
+        if result['data'].get('pages'):
+            cleared = Balance.objects.filter(
+                trade_mode=self.trade_mode, quantity__gt=0,
+            ).exclude(stock__code__in=[item['stock_code'] for item in items]).update(
+                quantity=0, profit_rate=0, profit_amount=0, updated_at=timezone.now(),
+            )
+
+        # 보유종목 실시간 시세 구독 갱신
+        self.kiwoom.subscribe_realtime(codes, owner='position', replace=True)
 
-        return {'success': True, 'data': {'synced': len(items)}}
+        return {'success': True, 'data': {
+            'synced': len(items),
+            'cleared': cleared,
+            'totals': result['data'].get('totals'),
+        }}
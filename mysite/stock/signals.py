@@ -0,0 +1,23 @@
+"""
+모델 시그널 핸들러
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Stock, TradingConfig
+from .services.config_cache import invalidate_active_config
+from .services.stock_master_service import stock_resolver
+
+
+@receiver(post_save, sender=TradingConfig, dispatch_uid='trading_config_saved')
+@receiver(post_delete, sender=TradingConfig, dispatch_uid='trading_config_deleted')
+def invalidate_config_cache(sender, **kwargs):
+    """매매설정 변경 시 활성 설정 캐시 무효화"""
+    invalidate_active_config()
+
+
+@receiver(post_save, sender=Stock, dispatch_uid='stock_saved')
+@receiver(post_delete, sender=Stock, dispatch_uid='stock_deleted')
+def invalidate_stock_resolver(sender, instance, **kwargs):
+    """종목 변경 시 종목코드 캐시에서 제거 (다음 조회 때 다시 읽음)"""
+    stock_resolver.discard(instance.code)
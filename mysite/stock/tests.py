@@ -1,3 +1,271 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .models import (
+    BridgeEvent, Candle, ConditionJob, ConditionMatch, ConditionSearch, Order, Stock, TradeHistory, TradingConfig,
+)
+from .services import BridgeEventService, CandleService, KiwoomService, StockMasterService, stock_resolver
+from .services import condition_service, trading_service
+from .services.condition_service import ConditionService
+
+
+class BridgeEventDedupeTests(TestCase):
+    """브릿지 이벤트 중복 수신 / 재전송 처리"""
+
+    def setUp(self):
+        stock_resolver.clear()
+        self.stock = Stock.objects.create(code='005930', name='삼성전자', market='KOSPI')
+        self.order = Order.objects.create(
+            stock=self.stock, order_type='buy', quantity=10, status='submitted', order_no='0001',
+        )
+        self.service = BridgeEventService()
+
+    def _fill(self, event_id, filled_quantity, cumulative_quantity, order_no='0001', price=70000):
+        return self.service.handle('order-filled', {
+            'order_no': order_no,
+            'filled_quantity': filled_quantity,
+            'filled_price': price,
+            'cumulative_quantity': cumulative_quantity,
+        }, event_id=event_id)
+
+    def test_duplicate_event_id_is_applied_once(self):
+        first = self._fill('1-1', 4, 4)
+        second = self._fill('1-1', 4, 4)
+
+        self.assertTrue(first['success'])
+        self.assertTrue(second['success'])
+        self.assertTrue(second['data']['duplicate'])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.filled_quantity, 4)
+        self.assertEqual(TradeHistory.objects.count(), 1)
+        self.assertEqual(BridgeEvent.objects.filter(event_id='1-1').count(), 1)
+
+    def test_failed_handler_is_not_recorded_and_retry_applies(self):
+        failed = self._fill('1-2', 3, 3, order_no='0002')
+        self.assertFalse(failed['success'])
+        self.assertFalse(BridgeEvent.objects.filter(event_id='1-2').exists())
+
+        # 주문 접수 반영 후 같은 이벤트ID로 재전송
+        Order.objects.create(stock=self.stock, order_type='buy', quantity=3, status='submitted', order_no='0002')
+        retried = self._fill('1-2', 3, 3, order_no='0002')
+
+        self.assertTrue(retried['success'])
+        self.assertNotIn('duplicate', retried['data'])
+        self.assertEqual(Order.objects.get(order_no='0002').status, 'filled')
+        self.assertTrue(BridgeEvent.objects.filter(event_id='1-2').exists())
+
+    def test_exception_in_handler_rolls_back_event_record(self):
+        with mock.patch.object(TradeHistory.objects, 'create', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                self._fill('1-3', 4, 4)
+
+        self.assertFalse(BridgeEvent.objects.filter(event_id='1-3').exists())
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.filled_quantity, 0)
+
+        self.assertTrue(self._fill('1-3', 4, 4)['success'])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.filled_quantity, 4)
+
+    def test_cumulative_quantity_skips_already_applied_fill(self):
+        self._fill('1-4', 4, 4)
+        # 이벤트ID가 달라도(브릿지 재기동 후 재전송) 누적 체결수량이 같으면 건너뜀
+        result = self._fill('2-1', 4, 4)
+
+        self.assertTrue(result['data']['duplicate'])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.filled_quantity, 4)
+        self.assertEqual(TradeHistory.objects.count(), 1)
+
+        self._fill('2-2', 6, 10, price=71000)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.filled_quantity, 10)
+        self.assertEqual(self.order.status, 'filled')
+        self.assertEqual(self.order.filled_price, (4 * 70000 + 6 * 71000) // 10)
+
+
+class BridgeEventSideEffectTests(TestCase):
+    """자동매매 주문은 이벤트 처리 트랜잭션 커밋 후에만 실행"""
+
+    def setUp(self):
+        stock_resolver.clear()
+        Stock.objects.create(code='005930', name='삼성전자', market='KOSPI')
+        ConditionSearch.objects.create(condition_index=1, condition_name='다른조건')
+        self.condition = ConditionSearch.objects.create(condition_index=0, condition_name='테스트', auto_trade=True)
+        # 브릿지는 키움 조건식인덱스/조건식명을 보냄 (DB ID가 아님)
+        self.payload = {'condition_index': 0, 'condition_name': '테스트', 'stock_code': '005930', 'match_type': 'I'}
+
+    def test_auto_trade_runs_after_commit(self):
+        with mock.patch.object(condition_service, '_trade_executor') as executor:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                result = BridgeEventService().handle('condition-match', self.payload, event_id='1-1')
+            self.assertTrue(result['success'])
+            self.assertEqual(ConditionMatch.objects.get().condition, self.condition)
+            executor.submit.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+            executor.submit.assert_called_once()
+
+    def test_rolled_back_event_does_not_trade(self):
+        schedule = ConditionService._schedule_auto_trade
+
+        def schedule_then_fail(service, *args):
+            schedule(service, *args)
+            raise OperationalError('database is locked')
+
+        with mock.patch.object(condition_service, '_trade_executor') as executor, \
+                mock.patch.object(ConditionService, '_schedule_auto_trade', schedule_then_fail):
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertRaises(OperationalError):
+                    BridgeEventService().handle('condition-match', self.payload, event_id='1-1')
+            executor.submit.assert_not_called()
+
+        self.assertFalse(ConditionMatch.objects.exists())
+        self.assertFalse(BridgeEvent.objects.exists())
+
+
+class ConditionInitialMatchJobTests(TestCase):
+    """조건검색 초기 편입(일괄 콜백 I)은 초기편입 작업으로 일괄 매수"""
+
+    def setUp(self):
+        stock_resolver.clear()
+        self.codes = ['005930', '000660', '035420']
+        for code in self.codes:
+            Stock.objects.create(code=code, name=code, market='KOSPI')
+        TradingConfig.objects.create(
+            name='테스트', trade_mode='mock', is_active=True, max_buy_per_stock=1000000,
+        )
+        # DB ID와 키움 조건식인덱스가 다르도록 다른 조건식을 먼저 저장
+        ConditionSearch.objects.create(condition_index=1, condition_name='다른조건')
+        self.condition = ConditionSearch.objects.create(condition_index=0, condition_name='테스트', auto_trade=True)
+
+    def test_bulk_initial_matches_run_through_job(self):
+        prices = {'success': True, 'data': {'prices': [
+            {'stock_code': code, 'current_price': 50000} for code in self.codes
+        ]}}
+        order = {'success': True, 'data': {'order_no': 'SIM0001'}}
+        unknown = {'success': True, 'data': {'error': 'KOSPI/KOSDAQ 종목 마스터에 없는 종목: 999999'}}
+        callbacks = []
+
+        def send_condition(condition_name, condition_index, is_realtime, job_id):
+            # 시뮬레이터처럼 결과 일괄 콜백이 조건검색 요청 응답보다 먼저 도착
+            callbacks.append(BridgeEventService().handle('condition-match-bulk', {
+                'condition_index': condition_index, 'condition_name': condition_name,
+                'stock_codes': self.codes + ['999999'], 'match_type': 'I', 'job_id': job_id,
+            }, event_id='1-1'))
+            return {'success': True, 'data': {'screen_no': '3000'}}
+
+        with mock.patch.object(KiwoomService, 'send_condition', side_effect=send_condition), \
+                mock.patch.object(KiwoomService, 'get_stock_info', return_value=unknown), \
+                mock.patch.object(KiwoomService, 'get_stock_prices', return_value=prices) as get_stock_prices, \
+                mock.patch.object(KiwoomService, 'get_stock_price') as get_stock_price, \
+                mock.patch.object(KiwoomService, 'send_order', return_value=order) as send_order, \
+                mock.patch.object(trading_service, 'get_order_limiter') as get_order_limiter, \
+                mock.patch.object(condition_service, 'close_old_connections'), \
+                mock.patch.object(condition_service._job_executor, 'submit', lambda fn, *args: fn(*args)):
+            with self.captureOnCommitCallbacks(execute=True):
+                started = ConditionService().start_condition_search(self.condition.id)
+
+        self.assertTrue(started['success'])
+        self.assertTrue(callbacks[0]['success'])
+        self.assertEqual(callbacks[0]['data']['job_id'], started['data']['job_id'])
+        self.assertEqual(ConditionJob.objects.count(), 1)
+        job = ConditionJob.objects.get()
+        self.assertEqual(job.status, 'done')
+        self.assertEqual((job.total, job.matched, job.ordered), (4, 3, 3))
+        get_stock_prices.assert_called_once()
+        get_stock_price.assert_not_called()
+        self.assertEqual(send_order.call_count, 3)
+        self.assertEqual(get_order_limiter.return_value.wait.call_count, 3)
+
+    def test_failed_request_fails_job(self):
+        with mock.patch.object(KiwoomService, 'send_condition', return_value={'success': False, 'error': '연결 실패'}):
+            result = ConditionService().start_condition_search(self.condition.id)
+
+        self.assertFalse(result['success'])
+        job = ConditionJob.objects.get()
+        self.assertEqual((job.status, job.error), ('failed', '연결 실패'))
+        self.condition.refresh_from_db()
+        self.assertEqual(self.condition.status, 'stopped')
+
+    @override_settings(CONDITION_JOB_TIMEOUT=60)
+    def test_job_without_results_times_out(self):
+        job = ConditionJob.objects.create(condition=self.condition)
+        ConditionJob.objects.filter(id=job.id).update(created_at=timezone.now() - timedelta(seconds=61))
+
+        self.assertEqual(ConditionService.expire_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', condition_service.JOB_TIMEOUT_ERROR))
+        self.assertIsNotNone(job.finished_at)
+
+
+class CandleSyncTests(TestCase):
+    """캔들 동기화 - 마지막 봉 이후 증분 + 첫 봉 이전 보충"""
+
+    def setUp(self):
+        self.stock = Stock.objects.create(code='005930', name='삼성전자', market='KOSPI')
+        self.service = CandleService()
+        for day in ('20240110', '20240111'):
+            Candle.objects.create(
+                stock=self.stock, interval='day', time=CandleService._parse_time(day),
+                open_price=1, high_price=1, low_price=1, close_price=1,
+            )
+
+    @staticmethod
+    def _response(*days):
+        candles = [{'time': d, 'open': 2, 'high': 2, 'low': 2, 'close': 2, 'volume': 10} for d in days]
+        return {'success': True, 'data': {'candles': candles, 'tr_count': 1}}
+
+    def test_start_before_stored_range_backfills_history(self):
+        responses = [self._response('20240108', '20240109', '20240110'), self._response('20240111', '20240112')]
+        with mock.patch.object(KiwoomService, 'get_candles', side_effect=responses) as get_candles:
+            result = self.service.sync_candles(self.stock, 'day', start='20240108')
+
+        self.assertEqual(get_candles.call_args_list, [
+            mock.call('005930', 'day', start='20240108', end='20240110'),
+            mock.call('005930', 'day', start='20240111', end=None),
+        ])
+        self.assertEqual((result['data']['backfill'], result['data']['tr_count']), ('20240108', 2))
+        self.assertEqual(Candle.objects.filter(stock=self.stock).count(), 5)
+
+    def test_start_within_stored_range_only_syncs_forward(self):
+        with mock.patch.object(KiwoomService, 'get_candles', return_value=self._response('20240111')) as get_candles:
+            self.service.sync_candles(self.stock, 'day', start='20240110')
+        get_candles.assert_called_once_with('005930', 'day', start='20240111', end=None)
+
+
+class StockResolverTests(TestCase):
+    """종목코드 조회 - 마스터에 없는 종목은 임시 종목을 만들지 않고 짧게 기억"""
+
+    def setUp(self):
+        stock_resolver.clear()
+        self.service = StockMasterService()
+
+    def test_unknown_code_is_not_created_and_miss_is_cached(self):
+        error = {'success': True, 'data': {'error': 'KOSPI/KOSDAQ 종목 마스터에 없는 종목: 580012'}}
+        with mock.patch.object(KiwoomService, 'get_stock_info', return_value=error) as get_stock_info:
+            self.assertIsNone(self.service.resolve('580012'))
+            with CaptureQueriesContext(connection) as queries:
+                self.assertIsNone(self.service.resolve('580012'))
+
+        get_stock_info.assert_called_once()
+        self.assertEqual(len(queries), 0)
+        self.assertFalse(Stock.objects.filter(code='580012').exists())
+
+    def test_bridge_info_without_name_is_rejected(self):
+        info = {'success': True, 'data': {'code': '005930', 'name': ' ', 'market': 'KOSPI'}}
+        with mock.patch.object(KiwoomService, 'get_stock_info', return_value=info):
+            self.assertIsNone(self.service.resolve('005930'))
+        self.assertFalse(Stock.objects.exists())
+
+    def test_saved_stock_clears_cached_miss(self):
+        with mock.patch.object(KiwoomService, 'get_stock_info', return_value={'success': False, 'error': '연결 실패'}):
+            self.assertIsNone(self.service.resolve('005930'))
+        Stock.objects.create(code='005930', name='삼성전자', market='KOSPI')
+        self.assertEqual(self.service.resolve('005930').name, '삼성전자')
@@ -6,13 +6,22 @@ router = DefaultRouter()
 router.register(r'config', views.TradingConfigViewSet, basename='config')
 router.register(r'stocks', views.StockViewSet, basename='stocks')
 router.register(r'conditions', views.ConditionSearchViewSet, basename='conditions')
+router.register(r'condition-jobs', views.ConditionJobViewSet, basename='condition-jobs')
 router.register(r'orders', views.OrderViewSet, basename='orders')
 router.register(r'balance', views.BalanceViewSet, basename='balance')
 router.register(r'trades', views.TradeHistoryViewSet, basename='trades')
 
 urlpatterns = [
     path('', include(router.urls)),
+    # 비동기 조회 (브릿지 호출 동시 실행)
+    path('quotes/', views.stock_quotes, name='stock-quotes'),
+    path('overview/', views.bridge_overview, name='bridge-overview'),
     # 브릿지 콜백 엔드포인트
     path('callback/condition-match/', views.condition_match_callback, name='condition-match-callback'),
+    path('callback/condition-match/bulk/', views.condition_match_bulk_callback,
+         name='condition-match-bulk-callback'),
     path('callback/order-filled/', views.order_filled_callback, name='order-filled-callback'),
+    path('callback/order-status/', views.order_status_callback, name='order-status-callback'),
+    path('callback/balance/', views.balance_callback, name='balance-callback'),
+    path('callback/ticks/', views.ticks_callback, name='ticks-callback'),
 ]
@@ -1,24 +1,25 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 
 from .models import (
     Stock, StockPrice, TradingConfig, ConditionSearch,
-    ConditionMatch, Order, Balance, TradeHistory
+    ConditionMatch, ConditionJob, Order, Balance, TradeHistory
 )
 from .serializers import (
-    StockSerializer, StockPriceSerializer, TradingConfigSerializer,
+    StockSerializer, StockPriceSerializer, CandleSerializer, CandleQuerySerializer,
+    TradingConfigSerializer,
     TradingConfigCreateSerializer, ConditionSearchSerializer,
-    ConditionMatchSerializer, OrderSerializer, OrderCreateSerializer,
-    BalanceSerializer, TradeHistorySerializer,
-    ConditionMatchCallbackSerializer, OrderFilledCallbackSerializer,
-    SwitchModeSerializer,
+    ConditionMatchSerializer, ConditionJobSerializer, OrderSerializer, OrderCreateSerializer,
+    BalanceSerializer, TradeHistorySerializer, SwitchModeSerializer,
+)
+from .services import (
+    KiwoomService, AsyncKiwoomService, TradingService, ConditionService, CandleService,
+    BridgeEventService, get_active_config,
 )
-from .services import KiwoomService, TradingService, ConditionService
-
-
-def _get_active_config():
-    return TradingConfig.objects.filter(is_active=True).first()
 
 
 class TradingConfigViewSet(viewsets.ModelViewSet):
@@ -36,7 +37,7 @@ class TradingConfigViewSet(viewsets.ModelViewSet):
         serializer = SwitchModeSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        config = _get_active_config()
+        config = get_active_config()
         if not config:
             return Response(
                 {'error': '활성화된 매매설정이 없습니다.'},
@@ -53,7 +54,7 @@ class TradingConfigViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def current(self, request):
         """현재 활성 설정 조회"""
-        config = _get_active_config()
+        config = get_active_config()
         if not config:
             return Response(
                 {'error': '활성화된 매매설정이 없습니다.'},
@@ -71,14 +72,28 @@ class StockViewSet(viewsets.ReadOnlyModelViewSet):
     def price(self, request, pk=None):
         """종목 시세 조회"""
         stock = self.get_object()
-        config = _get_active_config()
-        kiwoom = KiwoomService(config)
+        config = get_active_config()
+        kiwoom = KiwoomService.shared(config)
         result = kiwoom.get_stock_price(stock.code)
 
         if result['success']:
             return Response(result['data'])
         return Response({'error': result['error']}, status=status.HTTP_502_BAD_GATEWAY)
 
+    @action(detail=True, methods=['get'])
+    def candles(self, request, pk=None):
+        """과거 캔들 조회 (?interval=day|1|3|5..., ?start=YYYYMMDD, ?sync=false면 저장된 캔들만)"""
+        stock = self.get_object()
+        serializer = CandleQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        service = CandleService(get_active_config())
+        result = service.get_candles(stock, **serializer.validated_data)
+
+        if result['success']:
+            return Response(CandleSerializer(result['data'], many=True).data)
+        return Response({'error': result['error']}, status=status.HTTP_502_BAD_GATEWAY)
+
 
 class ConditionSearchViewSet(viewsets.ModelViewSet):
     """조건검색식 관리 API"""
@@ -88,7 +103,7 @@ class ConditionSearchViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'])
     def load(self, request):
         """키움에서 조건검색식 목록 불러오기"""
-        config = _get_active_config()
+        config = get_active_config()
         service = ConditionService(config)
         result = service.load_condition_list()
 
@@ -100,7 +115,7 @@ class ConditionSearchViewSet(viewsets.ModelViewSet):
     def start(self, request, pk=None):
         """조건검색 실행"""
         is_realtime = request.data.get('is_realtime', True)
-        config = _get_active_config()
+        config = get_active_config()
         service = ConditionService(config)
         result = service.start_condition_search(pk, is_realtime=is_realtime)
 
@@ -114,7 +129,7 @@ class ConditionSearchViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def stop(self, request, pk=None):
         """조건검색 중지"""
-        config = _get_active_config()
+        config = get_active_config()
         service = ConditionService(config)
         result = service.stop_condition_search(pk)
 
@@ -126,7 +141,7 @@ class ConditionSearchViewSet(viewsets.ModelViewSet):
     def matches(self, request, pk=None):
         """조건검색 편입/이탈 결과 조회"""
         match_type = request.query_params.get('type')
-        config = _get_active_config()
+        config = get_active_config()
         service = ConditionService(config)
         matches = service.get_condition_matches(pk, match_type=match_type)
         serializer = ConditionMatchSerializer(matches, many=True)
@@ -145,12 +160,26 @@ class ConditionSearchViewSet(viewsets.ModelViewSet):
         })
 
 
+class ConditionJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """조건검색 초기편입 작업 조회 API (조건검색 실행 응답의 job_id로 진행상황 조회, ?condition=ID)"""
+    serializer_class = ConditionJobSerializer
+
+    def get_queryset(self):
+        # 결과 콜백을 받지 못한 대기 작업은 조회 시점에 시간 초과로 정리
+        ConditionService.expire_stale_jobs()
+        queryset = ConditionJob.objects.select_related('condition')
+        condition_id = self.request.query_params.get('condition')
+        if condition_id:
+            queryset = queryset.filter(condition_id=condition_id)
+        return queryset
+
+
 class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     """주문 API"""
     serializer_class = OrderSerializer
 
     def get_queryset(self):
-        config = _get_active_config()
+        config = get_active_config()
         mode = config.trade_mode if config else 'mock'
         return Order.objects.filter(trade_mode=mode).select_related('stock')
 
@@ -168,7 +197,7 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        config = _get_active_config()
+        config = get_active_config()
         service = TradingService(config)
 
         if data['order_type'] == 'buy':
@@ -198,7 +227,7 @@ class BalanceViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = BalanceSerializer
 
     def get_queryset(self):
-        config = _get_active_config()
+        config = get_active_config()
         mode = config.trade_mode if config else 'mock'
         return Balance.objects.filter(
             trade_mode=mode, quantity__gt=0
@@ -207,7 +236,7 @@ class BalanceViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['post'])
     def sync(self, request):
         """키움에서 잔고 동기화"""
-        config = _get_active_config()
+        config = get_active_config()
         service = TradingService(config)
         result = service.sync_balance()
 
@@ -215,56 +244,115 @@ class BalanceViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(result['data'])
         return Response({'error': result['error']}, status=status.HTTP_502_BAD_GATEWAY)
 
+    @action(detail=False, methods=['post'])
+    def revalue(self, request):
+        """보유종목 현재가 일괄 평가"""
+        config = get_active_config()
+        service = TradingService(config)
+        result = service.revalue_balance()
+
+        if result['success']:
+            return Response(result['data'])
+        return Response({'error': result['error']}, status=status.HTTP_502_BAD_GATEWAY)
+
 
 class TradeHistoryViewSet(viewsets.ReadOnlyModelViewSet):
     """체결내역 API"""
     serializer_class = TradeHistorySerializer
 
     def get_queryset(self):
-        config = _get_active_config()
+        config = get_active_config()
         mode = config.trade_mode if config else 'mock'
         return TradeHistory.objects.filter(
             trade_mode=mode
         ).select_related('stock')
 
 
-# ===== 브릿지 콜백 API =====
+# ===== 비동기 조회 API (ASGI) =====
+# 여러 브릿지 호출을 동시에 보내는 조회용 뷰 (DRF 뷰는 동기라 Django 비동기 뷰로 작성)
 
-@api_view(['POST'])
-def condition_match_callback(request):
-    """브릿지에서 조건검색 편입/이탈 알림 수신"""
-    serializer = ConditionMatchCallbackSerializer(data=request.data)
-    serializer.is_valid(raise_exception=True)
-    data = serializer.validated_data
-
-    config = _get_active_config()
-    service = ConditionService(config)
-    result = service.process_condition_match(
-        condition_id=data['condition_id'],
-        stock_code=data['stock_code'],
-        match_type=data['match_type'],
+def _json_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+@require_GET
+async def stock_quotes(request):
+    """복수종목 현재가 동시 조회 (?codes=005930,000660,...)"""
+    codes = [code.strip() for code in request.GET.get('codes', '').split(',') if code.strip()]
+    if not codes:
+        return _json_response({'error': 'codes 파라미터가 필요합니다.'}, status=400)
+
+    config = await sync_to_async(get_active_config)()
+    result = await AsyncKiwoomService(config).get_stock_prices(codes)
+
+    if result['success']:
+        return _json_response(result['data'])
+    return _json_response({'error': result['error']}, status=502)
+
+
+@require_GET
+async def bridge_overview(request):
+    """접속상태/잔고/미체결/조건식 목록 동시 조회 - 항목별 결과 또는 오류"""
+    config = await sync_to_async(get_active_config)()
+    client = AsyncKiwoomService(config)
+    results = await client.gather(
+        connection=client.get_connect_state(),
+        balance=client.get_balance(),
+        orders=client.get_order_list(),
+        conditions=client.get_condition_list(),
     )
+    return _json_response({
+        name: result['data'] if result['success'] else {'error': result['error']}
+        for name, result in results.items()
+    })
+
 
+# ===== 브릿지 콜백 API =====
+
+def _bridge_event(request, event_type):
+    """
+    브릿지 콜백 1건 처리 (이벤트 스트림과 같은 경로)
+    X-Bridge-Event-Id 헤더의 이벤트ID로 재전송된 콜백은 한 번만 반영합니다.
+    """
+    result = BridgeEventService(get_active_config()).handle(
+        event_type, request.data, event_id=request.headers.get('X-Bridge-Event-Id'),
+    )
     if result['success']:
         return Response(result['data'])
     return Response({'error': result['error']}, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+def condition_match_callback(request):
+    """브릿지에서 조건검색 편입/이탈 알림 수신"""
+    return _bridge_event(request, 'condition-match')
+
+
+@api_view(['POST'])
+def condition_match_bulk_callback(request):
+    """브릿지에서 조건검색 결과 일괄 수신 (한 조건식, 여러 종목)"""
+    return _bridge_event(request, 'condition-match-bulk')
+
+
 @api_view(['POST'])
 def order_filled_callback(request):
     """브릿지에서 체결 알림 수신"""
-    serializer = OrderFilledCallbackSerializer(data=request.data)
-    serializer.is_valid(raise_exception=True)
-    data = serializer.validated_data
-
-    config = _get_active_config()
-    service = TradingService(config)
-    result = service.process_order_filled(
-        order_no=data['order_no'],
-        filled_quantity=data['filled_quantity'],
-        filled_price=data['filled_price'],
-    )
+    return _bridge_event(request, 'order-filled')
 
-    if result['success']:
-        return Response(result['data'])
-    return Response({'error': result['error']}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['POST'])
+def order_status_callback(request):
+    """브릿지에서 주문상태(접수/취소확인/거부) 알림 수신"""
+    return _bridge_event(request, 'order-status')
+
+
+@api_view(['POST'])
+def balance_callback(request):
+    """브릿지에서 잔고변경 알림 수신"""
+    return _bridge_event(request, 'balance')
+
+
+@api_view(['POST'])
+def ticks_callback(request):
+    """브릿지에서 실시간 체결 일괄 수신"""
+    return _bridge_event(request, 'ticks')